@@ -3,20 +3,54 @@
 import eventlet
 eventlet.monkey_patch()
 
+import json
+import uuid
+
 from flask_cors import CORS
-from flask import Flask, request, jsonify, url_for
-from celery_task import run_solver_task
+from flask import Flask, Response, request, jsonify, url_for, stream_with_context
+from celery import chord, group
+# API hanya mengenal nama tugas; definisi tugas & solver (ortools) hanya dimuat worker
+from celery_app import celery, RUN_SOLVER_TASK, RUN_BATCH_SCENARIO_TASK, AGGREGATE_BATCH_TASK, RUN_SENSITIVITY_TASK
+import result_codec
+import schedule_edits
+import schedule_export
+import task_events
+import job_queues
+import batch_jobs
+import demand_sensitivity
+import fairness_ledger
+import rule_plan
+import roster_registry
+import solver_profiles
+import solver_metrics
 
 app = Flask(__name__)
 CORS(app)
 
-@app.route('/generate-schedule', methods=['POST'])
-def start_schedule_generation():
-    """Endpoint untuk memulai proses pembuatan jadwal."""
-    if not request.is_json:
-        return jsonify({"error": "Request harus JSON"}), 400
+FINAL_STATES = {'SUCCESS', 'NO_SOLUTION', 'FAILURE'}
+MAX_RUNS_PER_REQUEST = 10
+MAX_SCENARIOS_PER_BATCH = 24
+MAX_WAIT_SECONDS = 60
+STREAM_TIMEOUT_SECONDS = 30 * 60
+STREAM_HEARTBEAT_SECONDS = 15
 
-    data = request.get_json()
+def wants_compact_result():
+    """Client bisa meminta hasil compact lewat query '?format=compact' atau header Accept."""
+    if request.args.get('format') == 'compact':
+        return True
+    return request.accept_mimetypes.best == result_codec.COMPACT_MIMETYPE
+
+def render_result(payload):
+    """Menyiapkan hasil task sesuai format yang diminta client."""
+    if wants_compact_result():
+        compact = result_codec.encode_runs(payload)
+        if request.args.get('summary') == 'dense':
+            compact = dict(compact, summary=result_codec.dense_summary(compact))
+        return compact
+    return result_codec.decode_runs(payload)
+
+def parse_schedule_payload(data):
+    """Validasi satu payload penjadwalan. Mengembalikan argumen tugas solver atau melempar ValueError."""
     requests_data = data.get('requests')
     year = data.get('year')
     month = data.get('month')
@@ -27,7 +61,7 @@ def start_schedule_generation():
 
     # [MODIFIKASI] Tambahkan 'demand_data' ke dalam validasi parameter
     if not all([requests_data, year, month, public_holidays, demand_data]):
-        return jsonify({"error": "Parameter 'requests', 'year', 'month', 'public_holidays', dan 'demand' dibutuhkan"}), 400
+        raise ValueError("Parameter 'requests', 'year', 'month', 'public_holidays', dan 'demand' dibutuhkan")
 
     # =================================================================
     # --- Mengubah 'Cuti Lainnya' menjadi 'Cuti' ---
@@ -37,23 +71,285 @@ def start_schedule_generation():
             req['jenis'] = 'Cuti'
     # =================================================================
 
+    return requests_data, year, month, public_holidays, demand_data
+
+def parse_solver_options(data):
+    """Opsi solver dari payload (mis. profil CP-SAT). Melempar ValueError jika tidak valid."""
+    options = {}
+    profile = solver_profiles.validate_profile_name(data.get('solver_profile'))
+    if profile:
+        options['profile'] = profile
+    quality = solver_profiles.validate_quality(data.get('quality'))
+    if quality:
+        options['quality'] = quality
+    seed = data.get('seed')
+    if seed is not None:
+        if not isinstance(seed, int) or isinstance(seed, bool) or seed < 0:
+            raise ValueError("Parameter 'seed' harus bilangan bulat >= 0")
+        options['seed'] = seed
+    trace = data.get('trace', False)
+    if not isinstance(trace, bool):
+        raise ValueError("Parameter 'trace' harus boolean")
+    if trace:
+        options['trace'] = True
+    lns = data.get('lns', False)
+    if not isinstance(lns, bool):
+        raise ValueError("Parameter 'lns' harus boolean")
+    if lns:
+        options['lns'] = True
+    deterministic = data.get('deterministic', False)
+    if not isinstance(deterministic, bool):
+        raise ValueError("Parameter 'deterministic' harus boolean")
+    if deterministic:
+        options['deterministic'] = True
+        options.setdefault('seed', 0)
+    fairness = data.get('fairness_ledger', True)
+    if not isinstance(fairness, bool):
+        raise ValueError("Parameter 'fairness_ledger' harus boolean")
+    if not fairness:
+        options['fairness_ledger'] = False
+    dedupe = data.get('dedupe_constraints', False)
+    if not isinstance(dedupe, bool):
+        raise ValueError("Parameter 'dedupe_constraints' harus boolean")
+    if dedupe:
+        options['dedupe_constraints'] = True
+    return options
+
+def parse_num_runs(data):
+    num_runs = data.get('num_runs', 1)
+    if not isinstance(num_runs, int) or not 1 <= num_runs <= MAX_RUNS_PER_REQUEST:
+        raise ValueError(f"Parameter 'num_runs' harus bilangan bulat 1-{MAX_RUNS_PER_REQUEST}")
+    return num_runs
+
+@app.route('/generate-schedule', methods=['POST'])
+def start_schedule_generation():
+    """Endpoint untuk memulai proses pembuatan jadwal."""
+    if not request.is_json:
+        return jsonify({"error": "Request harus JSON"}), 400
+
+    data = request.get_json()
+    try:
+        solver_args = parse_schedule_payload(data)
+        # =================================================================
+        # --- Kelas tugas & admission control ---
+        # =================================================================
+        num_runs = parse_num_runs(data)
+        job_class = job_queues.classify_job(data, num_runs)
+        solver_options = parse_solver_options(data)
+        roster = roster_registry.resolve_roster(data.get('roster'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    # Offset ledger keadilan dibaca sekali di sini agar solve & edit manual memakai offset yang sama
+    fairness_offsets = fairness_ledger.task_offsets(solver_options, roster, solver_args[1], solver_args[2])
+
+    task_id = str(uuid.uuid4())
+    try:
+        queue_position = job_queues.admit_job(job_class, task_id)
+    except job_queues.QueueFullError as e:
+        return jsonify({"error": str(e), "job_class": job_class}), 429, {"Retry-After": "60"}
+
+    soft_time_limit, time_limit = job_queues.task_time_limits(job_class, num_runs)
     # [MODIFIKASI] Kirim 'demand_data' sebagai argumen baru ke Celery task
-    task = run_solver_task.delay(requests_data, year, month, public_holidays, demand_data)
+    try:
+        task = celery.send_task(
+            RUN_SOLVER_TASK,
+            args=solver_args,
+            kwargs={"num_runs": num_runs, "job_class": job_class, "solver_options": solver_options, "roster": roster,
+                    "fairness_offsets": fairness_offsets},
+            task_id=task_id,
+            soft_time_limit=soft_time_limit,
+            time_limit=time_limit,
+            **job_queues.routing_options(job_class)
+        )
+    except Exception:
+        job_queues.release_job(job_class, task_id)
+        raise
+    # Input solve disimpan agar hasilnya bisa diedit manual (POST /schedules/<task_id>/edit)
+    schedule_edits.save_context(task.id, solver_args, roster, fairness_offsets)
 
     return jsonify({
         "message": "Proses pembuatan jadwal dimulai.",
         "task_id": task.id,
-        "status_check_url": url_for('check_task_status', task_id=task.id, _external=True)
+        "job_class": job_class,
+        "queue_position": queue_position,
+        "status_check_url": url_for('check_task_status', task_id=task.id, _external=True),
+        "status_stream_url": url_for('stream_task_status', task_id=task.id, _external=True)
     }), 202
 
-@app.route('/check-status/<task_id>', methods=['GET'])
-def check_task_status(task_id):
-    """Endpoint untuk mengecek status dan mengambil hasil dengan lebih detail."""
-    task = run_solver_task.AsyncResult(task_id)
+@app.route('/generate-schedule/batch', methods=['POST'])
+def start_batch_schedule_generation():
+    """
+    Endpoint untuk menjalankan banyak skenario (bulan / demand berbeda) sekaligus.
+    Semua skenario dijalankan paralel oleh worker; client cukup memantau satu task_id agregat.
+    """
+    if not request.is_json:
+        return jsonify({"error": "Request harus JSON"}), 400
+
+    data = request.get_json()
+    scenarios = data.get('scenarios')
+    if not isinstance(scenarios, list) or not scenarios:
+        return jsonify({"error": "Parameter 'scenarios' harus berupa list yang tidak kosong"}), 400
+    if len(scenarios) > MAX_SCENARIOS_PER_BATCH:
+        return jsonify({"error": f"Maksimal {MAX_SCENARIOS_PER_BATCH} skenario per batch"}), 400
+
+    scenario_args = []
+    scenario_options = []
+    scenario_rosters = []
+    for index, scenario in enumerate(scenarios):
+        try:
+            scenario_args.append(parse_schedule_payload(scenario))
+            # Opsi solver & roster per skenario, default mengikuti level batch
+            scenario_options.append(parse_solver_options(dict(data, **scenario)))
+            scenario_rosters.append(roster_registry.resolve_roster(scenario.get('roster', data.get('roster'))))
+        except ValueError as e:
+            return jsonify({"error": f"Skenario #{index + 1}: {e}"}), 400
+    try:
+        num_runs = parse_num_runs(data)
+        job_class = job_queues.classify_job({"job_class": data.get('job_class', 'batch')})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    batch_id = str(uuid.uuid4())
+    scenario_task_ids = [str(uuid.uuid4()) for _ in scenarios]
+    labels = [batch_jobs.scenario_label(i, scenario) for i, scenario in enumerate(scenarios)]
+    try:
+        queue_positions = job_queues.admit_jobs(job_class, scenario_task_ids)
+    except job_queues.QueueFullError as e:
+        return jsonify({"error": str(e), "job_class": job_class}), 429, {"Retry-After": "60"}
+
+    scenario_offsets = [fairness_ledger.task_offsets(options, roster, args[1], args[2])
+                        for args, options, roster in zip(scenario_args, scenario_options, scenario_rosters)]
+    soft_time_limit, time_limit = job_queues.task_time_limits(job_class, num_runs)
+    header = group(
+        celery.signature(
+            RUN_BATCH_SCENARIO_TASK,
+            args=(batch_id, index) + args,
+            kwargs={"num_runs": num_runs, "job_class": job_class, "solver_options": options, "roster": roster,
+                    "fairness_offsets": offsets},
+            task_id=scenario_task_id,
+            soft_time_limit=soft_time_limit,
+            time_limit=time_limit,
+            **job_queues.routing_options(job_class)
+        )
+        for index, (args, options, roster, offsets, scenario_task_id)
+        in enumerate(zip(scenario_args, scenario_options, scenario_rosters, scenario_offsets, scenario_task_ids))
+    )
+    # Agregasi sangat ringan, jadi dijalankan di queue interactive agar tidak antri di belakang solve lain
+    callback = celery.signature(AGGREGATE_BATCH_TASK, args=(labels,), task_id=batch_id, **job_queues.routing_options('interactive'))
+    try:
+        batch_jobs.register_batch(batch_id, scenario_task_ids, labels)
+        chord(header)(callback)
+    except Exception:
+        for scenario_task_id in scenario_task_ids:
+            job_queues.release_job(job_class, scenario_task_id)
+        raise
+    for args, roster, offsets, scenario_task_id in zip(scenario_args, scenario_rosters, scenario_offsets, scenario_task_ids):
+        schedule_edits.save_context(scenario_task_id, args, roster, offsets)
+
+    return jsonify({
+        "message": f"Proses batch untuk {len(scenarios)} skenario dimulai.",
+        "task_id": batch_id,
+        "job_class": job_class,
+        "scenarios": [
+            {"index": i, "label": label, "task_id": scenario_task_id, "queue_position": position}
+            for i, (label, scenario_task_id, position) in enumerate(zip(labels, scenario_task_ids, queue_positions))
+        ],
+        "status_check_url": url_for('check_task_status', task_id=batch_id, _external=True),
+        "status_stream_url": url_for('stream_task_status', task_id=batch_id, _external=True)
+    }), 202
+
+@app.route('/generate-schedule/sensitivity', methods=['POST'])
+def start_sensitivity_analysis():
+    """
+    Analisis sensitivitas demand: payload skenario dasar (sama seperti /generate-schedule) ditambah
+    'perturbations', mis. [{"shift": "P8", "day_type": "Weekday", "min": 4, "max": 5}]. Model dasar
+    dibangun sekali; setiap perturbasi hanya mengubah batas demand terkait dan diselesaikan paralel.
+    """
+    if not request.is_json:
+        return jsonify({"error": "Request harus JSON"}), 400
+
+    data = request.get_json()
+    try:
+        solver_args = parse_schedule_payload(data)
+        perturbations = demand_sensitivity.parse_perturbations(data.get('perturbations'), rule_plan.compile_rule_plan().shift_map)
+        job_class = job_queues.classify_job({"job_class": data.get('job_class', 'batch')})
+        solver_options = parse_solver_options(data)
+        roster = roster_registry.resolve_roster(data.get('roster'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    # Skenario dasar & perturbasi memakai offset ledger yang sama dengan /generate-schedule, agar
+    # objective_delta sebanding dengan objective solve biasa. Hasilnya bukan jadwal yang bisa diedit,
+    # jadi input solve tidak disimpan (save_context).
+    fairness_offsets = fairness_ledger.task_offsets(solver_options, roster, solver_args[1], solver_args[2])
+
+    task_id = str(uuid.uuid4())
+    try:
+        queue_position = job_queues.admit_job(job_class, task_id)
+    except job_queues.QueueFullError as e:
+        return jsonify({"error": str(e), "job_class": job_class}), 429, {"Retry-After": "60"}
+
+    soft_time_limit, time_limit = job_queues.task_time_limits(job_class)
+    try:
+        task = celery.send_task(
+            RUN_SENSITIVITY_TASK,
+            args=solver_args + (perturbations,),
+            kwargs={"job_class": job_class, "solver_options": solver_options, "roster": roster,
+                    "fairness_offsets": fairness_offsets},
+            task_id=task_id,
+            soft_time_limit=soft_time_limit,
+            time_limit=time_limit,
+            **job_queues.routing_options(job_class)
+        )
+    except Exception:
+        job_queues.release_job(job_class, task_id)
+        raise
+
+    return jsonify({
+        "message": f"Analisis sensitivitas untuk {len(perturbations)} perturbasi dimulai.",
+        "task_id": task.id,
+        "job_class": job_class,
+        "queue_position": queue_position,
+        "status_check_url": url_for('check_task_status', task_id=task.id, _external=True),
+        "status_stream_url": url_for('stream_task_status', task_id=task.id, _external=True)
+    }), 202
+
+def build_batch_response(payload):
+    """Respons untuk hasil batch: status & hasil per skenario plus perbandingan objective."""
+    scenarios = []
+    for scenario in payload["scenarios"]:
+        entry = dict(scenario)
+        if "result" in entry:
+            entry["result"] = render_result(entry["result"]) if entry["status"] == 'SUCCESS' else []
+        scenarios.append(entry)
+    num_success = batch_jobs.count_successful_scenarios(payload)
+    return {
+        "state": "SUCCESS" if num_success > 0 else "NO_SOLUTION",
+        "status": f"Proses batch selesai, {num_success} dari {len(scenarios)} skenario menghasilkan jadwal.",
+        "result": {"scenarios": scenarios, "comparison": payload["comparison"]}
+    }
+
+def build_status_response(task_id):
+    """Menyusun respons status tugas (dipakai oleh polling, long-poll, dan SSE)."""
+    task = celery.AsyncResult(task_id)
+    result = task.result if task.state == 'SUCCESS' else None
+
+    # Tugas skenario dalam batch membungkus hasilnya bersama status skenario
+    if batch_jobs.is_scenario_outcome(result):
+        if result["status"] == 'FAILURE':
+            return {"state": "FAILURE", "status": f"Terjadi error pada server: {result.get('error')}", "result": []}
+        result = result.get("result")
 
     # 1. Jika tugas masih dalam antrian
     if task.state == 'PENDING':
         response = {"state": task.state, "status": "Proses masih dalam antrian..."}
+        queue_info = job_queues.get_queue_position(task_id)
+        if queue_info:
+            response["queue"] = queue_info
+        batch = batch_jobs.get_registered_batch(task_id)
+        if batch:
+            for scenario in batch:
+                scenario["state"] = celery.AsyncResult(scenario["task_id"]).state
+            response["scenarios"] = batch
     
     # 2. Jika tugas gagal (terjadi error di dalam Celery)
     elif task.state == 'FAILURE':
@@ -61,13 +357,22 @@ def check_task_status(task_id):
     
     # 3. Jika tugas sudah selesai dengan SUKSES
     elif task.state == 'SUCCESS':
-        # Periksa isi dari hasilnya
-        if task.result and isinstance(task.result, list) and len(task.result) > 0:
+        if batch_jobs.is_batch_result(result):
+            response = build_batch_response(result)
+        elif demand_sensitivity.is_sensitivity_result(result):
+            num_feasible = sum(scenario["feasible"] for scenario in result["scenarios"])
+            response = {
+                "state": "SUCCESS",
+                "status": f"Analisis sensitivitas selesai, {num_feasible} dari {len(result['scenarios'])} perturbasi layak.",
+                "result": result
+            }
+        # Periksa isi dari hasilnya (bisa compact maupun verbose)
+        elif result_codec.count_runs(result) > 0:
             # Jika ada hasil (ditemukan jadwal)
             response = {
                 "state": "SUCCESS",
                 "status": "Proses selesai, jadwal ditemukan.",
-                "result": task.result
+                "result": render_result(result)
             }
         else:
             # Jika hasilnya kosong (tidak ditemukan jadwal)
@@ -81,8 +386,213 @@ def check_task_status(task_id):
     else:
         response = {"state": task.state, "status": "Proses sedang berjalan..."}
 
-    return jsonify(response)
+    # Jadwal sementara (heuristik greedy) tersedia sejak worker mulai sampai solver selesai
+    if response["state"] not in FINAL_STATES:
+        provisional = task_events.get_provisional(task_id)
+        if provisional:
+            response["provisional"] = provisional
+
+    return response
+
+def status_json(response):
+    resp = jsonify(response)
+    if wants_compact_result():
+        resp.mimetype = result_codec.COMPACT_MIMETYPE
+    return resp
+
+@app.route('/check-status/<task_id>', methods=['GET'])
+def check_task_status(task_id):
+    """
+    Endpoint untuk mengecek status dan mengambil hasil dengan lebih detail.
+    Dengan '?wait=<detik>' endpoint ini menjadi long-poll: respons ditahan sampai
+    ada event baru dari worker (progres/selesai) atau waktu tunggu habis.
+    """
+    response = build_status_response(task_id)
+    wait = min(request.args.get('wait', 0, type=float), MAX_WAIT_SECONDS)
+    if wait <= 0 or response["state"] in FINAL_STATES:
+        return status_json(response)
+
+    last_event = task_events.get_last_event(task_id)
+    events = task_events.iter_events(task_id, timeout=wait)
+    try:
+        for event in events:
+            # Event terakhir yang sudah pernah terkirim tidak dihitung sebagai perubahan
+            if last_event and event["timestamp"] <= last_event["timestamp"]:
+                continue
+            last_event = event
+            break
+    finally:
+        events.close()
+
+    response = build_status_response(task_id)
+    if last_event and last_event["event"] == 'PROGRESS' and response["state"] not in FINAL_STATES:
+        response["progress"] = last_event["data"]
+    return status_json(response)
+
+@app.route('/export/<task_id>.<any(xlsx, csv):file_format>', methods=['GET'])
+def export_schedule(task_id, file_format):
+    """Mengunduh hasil jadwal sebagai Excel (satu sheet per run) atau CSV, di-stream baris demi baris."""
+    task = celery.AsyncResult(task_id)
+    if task.state != 'SUCCESS':
+        return jsonify({"error": "Hasil belum tersedia untuk diekspor.", "state": task.state}), 409
+
+    payload = task.result
+    if batch_jobs.is_scenario_outcome(payload):
+        payload = payload.get('result') or []
+    if batch_jobs.is_batch_result(payload):
+        has_schedule = batch_jobs.count_successful_scenarios(payload) > 0
+    else:
+        has_schedule = result_codec.count_runs(payload) > 0
+    if not has_schedule:
+        return jsonify({"error": "Tidak ada jadwal valid untuk diekspor."}), 404
+
+    if file_format == 'xlsx':
+        body = schedule_export.iter_xlsx_chunks(payload)
+        mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    else:
+        body = schedule_export.iter_csv_lines(payload)
+        mimetype = 'text/csv'
+    return Response(
+        body,
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="jadwal_{task_id}.{file_format}"'}
+    )
+
+def load_task_runs(task_id):
+    """Hasil run (format verbose) dari tugas jadwal atau tugas skenario batch yang sudah selesai."""
+    payload = celery.AsyncResult(task_id).result
+    if batch_jobs.is_scenario_outcome(payload):
+        payload = payload.get('result') or []
+    if batch_jobs.is_batch_result(payload):
+        raise schedule_edits.ScheduleNotFoundError("Hasil batch tidak bisa diedit langsung; gunakan task_id skenario.")
+    if demand_sensitivity.is_sensitivity_result(payload):
+        raise schedule_edits.ScheduleNotFoundError("Hasil analisis sensitivitas tidak berisi jadwal.")
+    return result_codec.decode_runs(payload)
+
+def parse_run_number(value):
+    if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+        raise ValueError("Parameter 'run' harus bilangan bulat >= 1")
+    return value
+
+@app.route('/schedules/<task_id>/edit', methods=['POST'])
+def edit_schedule(task_id):
+    """
+    Mengubah sel jadwal hasil solver, mis. {"run": 1, "changes": [{"nip": "400192", "day": 3, "shift": "Libur"}]}
+    (tukar shift = dua perubahan). Hanya aturan pada baris karyawan & kolom hari yang berubah
+    dihitung ulang; respons berisi pelanggaran di cakupan itu dan selisih objective.
+    """
+    if not request.is_json:
+        return jsonify({"error": "Request harus JSON"}), 400
+    task = celery.AsyncResult(task_id)
+    if task.state != 'SUCCESS':
+        return jsonify({"error": "Hasil belum tersedia untuk diedit.", "state": task.state}), 409
+
+    data = request.get_json()
+    try:
+        run = parse_run_number(data.get('run', 1))
+        result = schedule_edits.apply_edit(task_id, run, data.get('changes'), lambda: load_task_runs(task_id))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except schedule_edits.ScheduleNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except schedule_edits.EditConflictError as e:
+        return jsonify({"error": str(e)}), 409
+    return jsonify(dict(result, task_id=task_id, run=run))
+
+@app.route('/schedules/<task_id>', methods=['GET'])
+def get_schedule(task_id):
+    """Jadwal terkini (termasuk hasil edit manual) untuk '?run=<n>' beserta ringkasan validasinya."""
+    task = celery.AsyncResult(task_id)
+    if task.state != 'SUCCESS':
+        return jsonify({"error": "Hasil belum tersedia.", "state": task.state}), 409
+    try:
+        run = parse_run_number(request.args.get('run', 1, type=int))
+        schedule = schedule_edits.get_edited_schedule(task_id, run, lambda: load_task_runs(task_id))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except schedule_edits.ScheduleNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    return jsonify(dict(schedule, task_id=task_id, run=run))
+
+@app.route('/schedules/<task_id>/accept', methods=['POST'])
+def accept_schedule(task_id):
+    """
+    Menerima jadwal {"run": n} (versi terkini, termasuk edit manual) sebagai jadwal final bulan
+    tersebut dan mencatatnya ke ledger keadilan lintas bulan (lihat fairness_ledger.py).
+    """
+    task = celery.AsyncResult(task_id)
+    if task.state != 'SUCCESS':
+        return jsonify({"error": "Hasil belum tersedia.", "state": task.state}), 409
+    data = request.get_json(silent=True) or {}
+    try:
+        run = parse_run_number(data.get('run', 1))
+        accepted = schedule_edits.accept_schedule(task_id, run, lambda: load_task_runs(task_id))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except schedule_edits.ScheduleNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    return jsonify(dict(accepted, task_id=task_id, run=run))
+
+def format_sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/stream-status/<task_id>', methods=['GET'])
+def stream_task_status(task_id):
+    """Endpoint Server-Sent Events: mendorong perubahan state & solusi yang membaik ke client."""
+    def generate():
+        response = build_status_response(task_id)
+        yield format_sse('status', response)
+        if response["state"] in FINAL_STATES:
+            return
+
+        for event in task_events.iter_events(task_id, timeout=STREAM_TIMEOUT_SECONDS, heartbeat=STREAM_HEARTBEAT_SECONDS):
+            if event is None:
+                yield ": keep-alive\n\n"
+            elif event["event"] in task_events.TERMINAL_EVENTS:
+                yield format_sse('status', build_status_response(task_id))
+                return
+            else:
+                yield format_sse(event["event"].lower(), event["data"])
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.route('/roster', methods=['GET'])
+def get_active_roster():
+    """Roster aktif: roster registry jika ada, selain itu roster default dari konfigurasi aturan."""
+    current = roster_registry.get_roster()
+    if current:
+        return jsonify(dict(current, source='registry'))
+    config = rule_plan.get_rule_config()
+    return jsonify({"source": 'config', "roster": config['roster']})
+
+@app.route('/roster', methods=['PUT'])
+def put_active_roster():
+    """
+    Mengganti roster aktif, mis. {"roster": [{"nip": "400192", "group": "FB"}, {"nip": "401136",
+    "group": "MB", "banned_shifts": ["P10"]}]}. Berlaku untuk tugas yang dibuat sesudahnya.
+    """
+    if not request.is_json:
+        return jsonify({"error": "Request harus JSON"}), 400
+    try:
+        entry = roster_registry.save_roster(request.get_json().get('roster'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(dict(entry, source='registry'))
+
+@app.route('/roster', methods=['DELETE'])
+def delete_active_roster():
+    """Menghapus roster registry; tugas berikutnya kembali memakai roster default konfigurasi."""
+    roster_registry.clear_roster()
+    return jsonify({"source": 'config', "roster": rule_plan.get_rule_config()['roster']})
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Metrik Prometheus (antrian, waktu build per aturan, waktu solve, status, ukuran model)."""
+    return Response(solver_metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5001)
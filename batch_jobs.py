@@ -0,0 +1,98 @@
+# file: batch_jobs.py
+
+import json
+
+from result_codec import is_compact, count_runs
+from task_events import get_redis
+
+# =================================================================================
+# BATCH SKENARIO (BANYAK BULAN / SKENARIO DEMAND DALAM SATU PANGGILAN)
+# =================================================================================
+# Setiap skenario dijalankan sebagai tugas Celery terpisah (group), lalu satu tugas
+# agregat (chord callback) menggabungkan status per skenario dan membandingkan nilai
+# objective-nya. ID tugas agregat inilah yang dikembalikan ke client.
+
+BATCH_RESULT_TYPE = 'batch'
+BATCH_KEY_PREFIX = 'jadwal:batch:'
+BATCH_TTL_SECONDS = 24 * 60 * 60
+
+
+def is_batch_result(payload):
+    return isinstance(payload, dict) and payload.get('type') == BATCH_RESULT_TYPE
+
+
+def is_scenario_outcome(payload):
+    """Hasil satu tugas skenario: {"status": ..., "result": payload compact} atau {"status": "FAILURE", "error": ...}."""
+    return isinstance(payload, dict) and 'status' in payload and ('result' in payload or 'error' in payload)
+
+
+def scenario_label(index, scenario):
+    """Label yang mudah dibaca untuk satu skenario (default: 'YYYY-MM #index')."""
+    return scenario.get('name') or f"{scenario['year']}-{int(scenario['month']):02d} #{index + 1}"
+
+
+def register_batch(batch_id, scenario_task_ids, labels):
+    """Menyimpan daftar tugas skenario agar status batch bisa dilihat selama masih berjalan."""
+    scenarios = [{"index": i, "label": label, "task_id": task_id}
+                 for i, (task_id, label) in enumerate(zip(scenario_task_ids, labels))]
+    get_redis().set(BATCH_KEY_PREFIX + batch_id, json.dumps(scenarios), ex=BATCH_TTL_SECONDS)
+
+
+def get_registered_batch(batch_id):
+    raw = get_redis().get(BATCH_KEY_PREFIX + batch_id)
+    return json.loads(raw) if raw else None
+
+
+def _best_run(payload):
+    """Run dengan objective tertinggi (model memaksimalkan skor) dari payload compact."""
+    runs = payload.get('runs', []) if is_compact(payload) else []
+    scored = [run for run in runs if run.get('objective') is not None]
+    return max(scored, key=lambda run: run['objective']) if scored else None
+
+
+def build_batch_result(scenario_outcomes, labels):
+    """
+    Menggabungkan hasil semua skenario menjadi satu hasil batch.
+    scenario_outcomes: list {"status": ..., "result": payload compact} atau {"status": "FAILURE", "error": ...}
+    """
+    scenarios = []
+    for index, (outcome, label) in enumerate(zip(scenario_outcomes, labels)):
+        entry = {"index": index, "label": label, "status": outcome.get('status', 'FAILURE')}
+        if outcome.get('error'):
+            entry["error"] = outcome['error']
+        payload = outcome.get('result')
+        if payload is not None:
+            entry["num_schedules"] = count_runs(payload)
+            best = _best_run(payload)
+            if best:
+                entry.update({
+                    "objective": best['objective'],
+                    "best_bound": best.get('best_bound'),
+                    "solver_status": best.get('status'),
+                    "runtime_seconds": best.get('runtime_seconds'),
+                })
+            entry["result"] = payload
+        scenarios.append(entry)
+
+    # Perbandingan objective: skenario terbaik di urutan pertama
+    ranked = sorted((s for s in scenarios if s.get('objective') is not None), key=lambda s: s['objective'], reverse=True)
+    best_objective = ranked[0]['objective'] if ranked else None
+    comparison = [{
+        "index": s['index'],
+        "label": s['label'],
+        "objective": s['objective'],
+        "gap_to_best": best_objective - s['objective'],
+    } for s in ranked]
+
+    return {
+        "type": BATCH_RESULT_TYPE,
+        "scenarios": scenarios,
+        "comparison": {
+            "best_scenario": ranked[0]['index'] if ranked else None,
+            "ranking": comparison,
+        },
+    }
+
+
+def count_successful_scenarios(payload):
+    return sum(1 for s in payload.get('scenarios', []) if s.get('status') == 'SUCCESS')
@@ -0,0 +1,38 @@
+# file: celery_app.py
+
+from celery import Celery
+from kombu import Queue
+
+from task_events import REDIS_URL
+import job_queues
+
+# =================================================================================
+# APLIKASI CELERY (DIPAKAI BERSAMA API & WORKER)
+# =================================================================================
+# Modul ini sengaja tidak mengimpor solver (ortools) sehingga proses API tetap ringan.
+# API mengirim tugas berdasarkan NAMA (send_task / signature); definisi tugasnya
+# hanya dimuat oleh worker lewat celery_task.py.
+
+RUN_SOLVER_TASK = 'celery_task.run_solver_task'
+RUN_BATCH_SCENARIO_TASK = 'celery_task.run_batch_scenario_task'
+AGGREGATE_BATCH_TASK = 'celery_task.aggregate_batch_task'
+RUN_SENSITIVITY_TASK = 'celery_task.run_sensitivity_task'
+
+# Konfigurasi Celery untuk terhubung ke Redis
+celery = Celery(
+    'tasks',
+    broker=REDIS_URL,
+    backend=REDIS_URL
+)
+
+# Satu queue per kelas tugas (interactive / monthly / batch), lihat job_queues.JOB_CLASSES
+celery.conf.update(
+    task_queues=[Queue(config['queue']) for config in job_queues.JOB_CLASSES.values()],
+    task_default_queue=job_queues.JOB_CLASSES[job_queues.DEFAULT_JOB_CLASS]['queue'],
+    # Prioritas pesan di broker Redis: 0..9, angka lebih besar diambil lebih dulu
+    broker_transport_options={'priority_steps': list(range(10)), 'queue_order_strategy': 'priority'},
+    task_inherit_parent_priority=True,
+    # Tugas solver berat: jangan prefetch tugas lain selama slot CPU masih terpakai
+    worker_prefetch_multiplier=1,
+    task_acks_late=True,
+)
@@ -1,20 +1,121 @@
-import eventlet
-eventlet.monkey_patch()
+# file: celery_task.py
+# Entry point worker: celery -A celery_task.celery worker ...
 
-from celery import Celery
-from solver_2 import run_simulation_for_api
+from celery.signals import task_success, task_failure, worker_init, worker_process_init
+from celery_app import celery, RUN_SOLVER_TASK, RUN_BATCH_SCENARIO_TASK, AGGREGATE_BATCH_TASK, RUN_SENSITIVITY_TASK
+from result_codec import encode_runs, count_runs
+from task_events import publish_event, publish_provisional
+import job_queues
+import rule_plan
+import batch_jobs
+import demand_sensitivity
+import solver_metrics
 
-# Konfigurasi Celery untuk terhubung ke Redis
-celery = Celery(
-    'tasks',
-    broker='redis://redis:6379/0',
-    backend='redis://redis:6379/0'
-)
+def solve_and_encode(task_id, pre_assignment_requests, target_year, target_month, public_holidays, demand, num_runs, job_class, on_progress=None, solver_options=None, roster=None, fairness_offsets=None):
+    """
+    Menjalankan simulasi untuk satu tugas dan mengembalikan hasil dalam format compact.
+    fairness_offsets dibaca API dari ledger saat tugas dibuat (lihat fairness_ledger.task_offsets).
+    """
+    queue_latency = job_queues.release_job(job_class, task_id)
+    if queue_latency is not None:
+        solver_metrics.record_queue_latency(job_class, queue_latency)
+    print(f"Menerima tugas '{job_class}' untuk {target_month}/{target_year}...")
+    publish_event(task_id, 'STARTED', {"job_class": job_class})
+    # Solver (ortools) dimuat saat dipakai; proses anak worker sudah memuatnya lebih dulu
+    from solver_2 import run_simulation_for_api
+    result = run_simulation_for_api(
+        pre_assignment_requests, target_year, target_month, public_holidays, demand, num_runs=num_runs,
+        on_progress=on_progress or (lambda info: publish_event(task_id, 'PROGRESS', info)),
+        time_limit_seconds=job_queues.JOB_CLASSES[job_class]['solver_time_limit'],
+        solver_options=dict(solver_options or {}, memory_limit_mb=job_queues.task_memory_limit_mb(job_class)),
+        on_metrics=lambda info: solver_metrics.record_solve(job_class, info),
+        on_provisional=lambda info: publish_provisional(task_id, info),
+        fairness_offsets=fairness_offsets,
+        employees_data=roster
+    )
+    print("Tugas selesai.")
+    # Hasil disimpan di Redis dalam format compact (kamus shift + matrix uint8)
+    return encode_runs(result)
 
-@celery.task
-def run_solver_task(pre_assignment_requests, target_year, target_month,public_holidays):
+@celery.task(bind=True, name=RUN_SOLVER_TASK)
+def run_solver_task(self, pre_assignment_requests, target_year, target_month, public_holidays, demand, num_runs=1, job_class=job_queues.DEFAULT_JOB_CLASS, solver_options=None, roster=None, fairness_offsets=None):
     """Tugas yang akan dijalankan oleh Celery di latar belakang."""
-    print(f"Menerima tugas untuk {target_month}/{target_year}...")
-    result = run_simulation_for_api(pre_assignment_requests, target_year, target_month,public_holidays,num_runs=1)
-    print("Tugas selesai.")
-    return result
\ No newline at end of file
+    return solve_and_encode(self.request.id, pre_assignment_requests, target_year, target_month, public_holidays, demand, num_runs, job_class, solver_options=solver_options, roster=roster, fairness_offsets=fairness_offsets)
+
+@celery.task(bind=True, name=RUN_BATCH_SCENARIO_TASK)
+def run_batch_scenario_task(self, batch_id, scenario_index, pre_assignment_requests, target_year, target_month, public_holidays, demand, num_runs=1, job_class='batch', solver_options=None, roster=None, fairness_offsets=None):
+    """Satu skenario dalam batch. Error ditangkap agar skenario lain tetap ikut diagregasi."""
+    task_id = self.request.id
+
+    def on_progress(info):
+        publish_event(task_id, 'PROGRESS', info)
+        publish_event(batch_id, 'PROGRESS', dict(info, scenario=scenario_index))
+
+    try:
+        encoded = solve_and_encode(task_id, pre_assignment_requests, target_year, target_month, public_holidays, demand, num_runs, job_class, on_progress, solver_options, roster, fairness_offsets)
+    except Exception as e:
+        print(f"Skenario #{scenario_index + 1} pada batch {batch_id} gagal: {e}")
+        outcome = {"status": 'FAILURE', "error": str(e)}
+    else:
+        outcome = {"status": 'SUCCESS' if count_runs(encoded) > 0 else 'NO_SOLUTION', "result": encoded}
+    publish_event(batch_id, 'SCENARIO_COMPLETED', {"scenario": scenario_index, "status": outcome["status"]})
+    return outcome
+
+@celery.task(bind=True, name=RUN_SENSITIVITY_TASK)
+def run_sensitivity_task(self, pre_assignment_requests, target_year, target_month, public_holidays, demand, perturbations, job_class='batch', solver_options=None, roster=None, fairness_offsets=None):
+    """Analisis sensitivitas demand: skenario dasar + perturbasi batas demand (lihat demand_sensitivity.py)."""
+    task_id = self.request.id
+    queue_latency = job_queues.release_job(job_class, task_id)
+    if queue_latency is not None:
+        solver_metrics.record_queue_latency(job_class, queue_latency)
+    print(f"Menerima analisis sensitivitas ({len(perturbations)} perturbasi) untuk {target_month}/{target_year}...")
+    publish_event(task_id, 'STARTED', {"job_class": job_class})
+    return demand_sensitivity.run_sensitivity(
+        roster or rule_plan.roster_employees_data(), target_year, target_month, pre_assignment_requests, public_holidays, demand,
+        perturbations,
+        time_limit_seconds=job_queues.JOB_CLASSES[job_class]['solver_time_limit'],
+        solver_options=dict(solver_options or {}, memory_limit_mb=job_queues.task_memory_limit_mb(job_class)),
+        on_progress=lambda info: publish_event(task_id, 'PROGRESS', info),
+        fairness_offsets=fairness_offsets
+    )
+
+@celery.task(name=AGGREGATE_BATCH_TASK)
+def aggregate_batch_task(scenario_outcomes, labels):
+    """Chord callback: menggabungkan hasil semua skenario dan membandingkan objective-nya."""
+    return batch_jobs.build_batch_result(scenario_outcomes, labels)
+
+# Konfigurasi aturan dibaca & divalidasi sekali saat worker start (gagal cepat jika
+# file tidak valid), lalu solver dimuat dan plan roster default dikompilasi di setiap
+# proses anak sehingga tugas pertama tidak menanggung biaya import ortools.
+@worker_init.connect
+def validate_rule_config(**kwargs):
+    rule_plan.get_rule_config()
+
+@worker_process_init.connect
+def preload_rule_plan(**kwargs):
+    import solver_2  # noqa: F401
+    rule_plan.compile_rule_plan()
+
+# Event terminal dikirim lewat signal karena signal ini dipanggil SETELAH hasil
+# tersimpan di backend, sehingga API bisa langsung membaca hasilnya.
+@task_success.connect(sender=run_solver_task)
+def publish_task_success(sender=None, result=None, **kwargs):
+    publish_event(sender.request.id, 'SUCCESS' if count_runs(result) > 0 else 'NO_SOLUTION')
+
+@task_success.connect(sender=run_batch_scenario_task)
+def publish_scenario_success(sender=None, result=None, **kwargs):
+    publish_event(sender.request.id, result["status"], {"error": result["error"]} if result.get("error") else None)
+
+@task_success.connect(sender=aggregate_batch_task)
+def publish_batch_success(sender=None, result=None, **kwargs):
+    publish_event(sender.request.id, 'SUCCESS' if batch_jobs.count_successful_scenarios(result) > 0 else 'NO_SOLUTION')
+
+@task_success.connect(sender=run_sensitivity_task)
+def publish_sensitivity_success(sender=None, result=None, **kwargs):
+    publish_event(sender.request.id, 'SUCCESS', {"base_feasible": result["base"]["feasible"]})
+
+@task_failure.connect(sender=run_solver_task)
+@task_failure.connect(sender=run_sensitivity_task)
+@task_failure.connect(sender=aggregate_batch_task)
+def publish_task_failure(sender=None, task_id=None, exception=None, **kwargs):
+    publish_event(task_id, 'FAILURE', {"error": str(exception)})
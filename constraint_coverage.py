@@ -0,0 +1,298 @@
+# file: constraint_coverage.py
+
+import argparse
+import ast
+import glob
+import json
+import math
+import os
+
+# =================================================================================
+# ANALISIS CAKUPAN CONSTRAINT (AKTIF, REDUNDAN, MATI)
+# =================================================================================
+# Membangun model satu bulan, memberi sidik jari (fingerprint) setiap constraint di proto
+# CP-SAT, lalu melaporkan per sumber (fungsi apply_* di build_schedule_model):
+#   - duplicate : constraint identik dengan constraint lain (mis. batas hari kerja & Libur
+#                 yang ditambahkan apply_employee_monthly_rules DAN apply_*_monthly_rules),
+#   - subsumed  : constraint linear yang sudah tersirat oleh constraint lain dengan ekspresi
+#                 & enforcement yang sama (irisan domainnya lebih ketat),
+#   - trivial   : constraint linear yang selalu terpenuhi oleh domain variabelnya (mati).
+# Fingerprint linear dinormalisasi (suku diurutkan, dibagi FPB koefisien, tanda koefisien
+# pertama positif) sehingga `x <= 5`, `-x >= -5` dan `2x <= 11` dianggap sama.
+#
+# Selain model, file .py di repo dipindai untuk definisi fungsi/kelas tingkat atas yang
+# didefinisikan ulang (definisi terakhir menimpa yang sebelumnya).
+#
+# Constraint redundan juga bisa dibuang saat build (opsi solver "dedupe_constraints",
+# lihat remove_redundant_constraints): constraint dikosongkan di tempat, bukan dihapus,
+# agar indeks constraint yang disimpan (demand_rows) tetap valid.
+#
+# Contoh: python constraint_coverage.py benchmarks/2025-09.json --output cakupan.json
+
+DEFAULT_BENCHMARK_GLOB = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks', '*.json')
+# Constraint yang ditambahkan build_schedule_model sebelum fungsi aturan pertama (Cuti tanpa request)
+PRE_RULE_SOURCE = 'build_schedule_model'
+
+_INT_MIN, _INT_MAX = -2 ** 63, 2 ** 63 - 1
+_BOOL_KINDS = ('bool_or', 'bool_and', 'at_most_one', 'exactly_one', 'bool_xor')
+_OTHER_KINDS = ('automaton', 'table', 'lin_max', 'element', 'int_prod', 'int_div', 'int_mod',
+                'all_diff', 'interval', 'no_overlap', 'no_overlap_2d', 'cumulative', 'circuit',
+                'routes', 'reservoir', 'inverse', 'dummy_constraint')
+
+
+def _constraint_kind(ct):
+    if ct.has_linear():
+        return 'linear'
+    for kind in _BOOL_KINDS + _OTHER_KINDS:
+        if getattr(ct, 'has_' + kind)():
+            return kind
+    return None
+
+
+def _domain(flat):
+    """Domain proto [lo, hi, lo, hi, ...] -> ((lo, hi), ...) dengan batas int64 sebagai ±inf."""
+    return tuple((-math.inf if lo <= _INT_MIN + 1 else lo, math.inf if hi >= _INT_MAX - 1 else hi)
+                 for lo, hi in zip(flat[::2], flat[1::2]))
+
+
+def _scale_domain(domain, divisor):
+    """Domain untuk ekspresi yang dibagi `divisor` (bilangan bulat, boleh negatif)."""
+    scaled = []
+    for lo, hi in domain:
+        if divisor < 0:
+            lo, hi = -hi, -lo
+        step = abs(divisor)
+        lo = lo if math.isinf(lo) else -(-lo // step)
+        hi = hi if math.isinf(hi) else hi // step
+        if lo <= hi:
+            scaled.append((lo, hi))
+    return tuple(sorted(scaled))
+
+
+def _contains(outer, inner):
+    """True jika setiap interval `inner` berada di dalam salah satu interval `outer`."""
+    return all(any(o_lo <= lo and hi <= o_hi for o_lo, o_hi in outer) for lo, hi in inner)
+
+
+def _intersect(first, second):
+    result = []
+    for lo_a, hi_a in first:
+        for lo_b, hi_b in second:
+            lo, hi = max(lo_a, lo_b), min(hi_a, hi_b)
+            if lo <= hi:
+                result.append((lo, hi))
+    return tuple(sorted(result))
+
+
+def _domain_size(domain):
+    return sum(hi - lo + 1 for lo, hi in domain)
+
+
+def linear_fingerprint(ct):
+    """(enforcement, suku ternormalisasi, domain ternormalisasi) constraint linear."""
+    linear = ct.linear
+    terms = sorted(zip(linear.vars, linear.coeffs))
+    divisor = math.gcd(*(coeff for _, coeff in terms)) or 1
+    if terms and terms[0][1] < 0:
+        divisor = -divisor
+    normalized_terms = tuple((var, coeff // divisor) for var, coeff in terms)
+    return tuple(sorted(ct.enforcement_literal)), normalized_terms, _scale_domain(_domain(list(linear.domain)), divisor)
+
+
+def constraint_fingerprint(ct):
+    """Sidik jari yang sama untuk constraint yang identik secara semantik (kecuali nama)."""
+    kind = _constraint_kind(ct)
+    if kind == 'linear':
+        return ('linear',) + linear_fingerprint(ct)
+    if kind in _BOOL_KINDS:
+        literals = getattr(ct, kind).literals
+        return kind, tuple(sorted(ct.enforcement_literal)), tuple(sorted(literals))
+    text = str(ct)
+    if ct.name:
+        text = '\n'.join(line for line in text.splitlines() if not line.startswith('name:'))
+    return kind, text
+
+
+def _always_true(proto, terms, domain):
+    """Ekspresi linear selalu berada di domain karena domain variabelnya (constraint mati)."""
+    low = high = 0
+    for var, coeff in terms:
+        if var < 0:
+            return False
+        var_domain = proto.variables[var].domain
+        bounds = (coeff * var_domain[0], coeff * var_domain[len(var_domain) - 1])
+        low, high = low + min(bounds), high + max(bounds)
+    return _contains(domain, ((low, high),))
+
+
+def find_redundant_constraints(proto, protected=()):
+    """
+    Constraint yang bisa dibuang tanpa mengubah himpunan solusi:
+    [{"index", "kind": 'duplicate' / 'subsumed' / 'trivial', "by": [indeks penyebab]}].
+    Constraint di `protected` (mis. baris demand yang batasnya diubah analisis sensitivitas)
+    tidak pernah ditandai. Dari constraint yang identik, yang pertama dibangun dipertahankan.
+    """
+    protected = set(protected)
+    findings = []
+    linear_groups, seen = {}, {}
+    for idx, ct in enumerate(proto.constraints):
+        kind = _constraint_kind(ct)
+        if kind is None:
+            continue
+        if kind == 'linear':
+            enforcement, terms, domain = linear_fingerprint(ct)
+            if idx not in protected and _always_true(proto, terms, domain):
+                findings.append({"index": idx, "kind": 'trivial', "by": []})
+                continue
+            linear_groups.setdefault((enforcement, terms), []).append((idx, domain))
+            continue
+        fingerprint = constraint_fingerprint(ct)
+        if fingerprint in seen and idx not in protected:
+            findings.append({"index": idx, "kind": 'duplicate', "by": [seen[fingerprint]]})
+        else:
+            seen.setdefault(fingerprint, idx)
+
+    for members in linear_groups.values():
+        if len(members) < 2:
+            continue
+        # Yang dilindungi dulu, lalu domain paling ketat; sisanya dicek terhadap irisan yang dipertahankan
+        members.sort(key=lambda item: (item[0] not in protected, _domain_size(item[1]), item[0]))
+        kept, effective = [], None
+        for idx, domain in members:
+            if kept and idx not in protected and _contains(domain, effective):
+                same = [k_idx for k_idx, k_domain in kept if k_domain == domain]
+                findings.append({"index": idx, "kind": 'duplicate' if same else 'subsumed',
+                                 "by": same[:1] or [k_idx for k_idx, _ in kept]})
+                continue
+            kept.append((idx, domain))
+            effective = domain if effective is None else _intersect(effective, domain)
+    return sorted(findings, key=lambda finding: finding['index'])
+
+
+def remove_redundant_constraints(proto, protected=()):
+    """Mengosongkan constraint redundan di tempat (indeks constraint lain tidak bergeser). Mengembalikan temuan."""
+    findings = find_redundant_constraints(proto, protected)
+    for finding in findings:
+        ct = proto.constraints[finding['index']]
+        kind = _constraint_kind(ct)
+        getattr(ct, 'clear_' + kind)()
+        ct.enforcement_literal.clear()
+    return findings
+
+
+def constraint_sources(num_constraints, rule_ranges):
+    """Nama sumber (fungsi apply_*) untuk setiap indeks constraint."""
+    sources = [PRE_RULE_SOURCE] * num_constraints
+    for rule, (start, end) in rule_ranges.items():
+        for idx in range(start, min(end, num_constraints)):
+            sources[idx] = rule
+    return sources
+
+
+def coverage_report(built, protected=None):
+    """
+    Laporan per sumber untuk ScheduleModel hasil build_schedule_model:
+    {rule: {"constraints", "duplicate", "subsumed", "trivial", "redundant_share", "overlaps": {sumber lain: jumlah}}}
+    plus daftar aturan yang tidak menambah constraint efektif sama sekali.
+    """
+    proto = built.model.Proto()
+    if protected is None:
+        protected = built.demand_rows.values()
+    sources = constraint_sources(len(proto.constraints), built.rule_ranges)
+    findings = find_redundant_constraints(proto, protected)
+
+    rules = {}
+    for source in [PRE_RULE_SOURCE] + list(built.rule_ranges):
+        rules[source] = {"constraints": sources.count(source), "duplicate": 0, "subsumed": 0, "trivial": 0, "overlaps": {}}
+    for finding in findings:
+        entry = rules[sources[finding['index']]]
+        entry[finding['kind']] += 1
+        for other in {sources[idx] for idx in finding['by']}:
+            entry['overlaps'][other] = entry['overlaps'].get(other, 0) + 1
+    for entry in rules.values():
+        redundant = entry['duplicate'] + entry['subsumed'] + entry['trivial']
+        entry['redundant_share'] = round(redundant / entry['constraints'], 3) if entry['constraints'] else None
+
+    return {
+        "num_constraints": len(proto.constraints),
+        "redundant_constraints": len(findings),
+        "rules": rules,
+        # Aturan tanpa constraint, atau yang semua constraint-nya sudah dicakup aturan lain
+        "dead_rules": [rule for rule, entry in rules.items()
+                       if entry['constraints'] == 0 or entry['redundant_share'] == 1.0],
+    }
+
+
+def shadowed_definitions(paths):
+    """Fungsi/kelas tingkat atas yang didefinisikan lebih dari sekali: {file: {nama: [baris, ...]}}."""
+    report = {}
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            try:
+                tree = ast.parse(f.read(), filename=path)
+            except SyntaxError as e:
+                print(f"Warning: Gagal mengurai {path}: {e}")
+                continue
+        lines = {}
+        for node in tree.body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                lines.setdefault(node.name, []).append(node.lineno)
+        shadowed = {name: linenos for name, linenos in lines.items() if len(linenos) > 1}
+        if shadowed:
+            report[os.path.basename(path)] = shadowed
+    return report
+
+
+def analyze_instance(path):
+    from rule_plan import roster_employees_data
+    from solver_2 import build_schedule_model
+
+    with open(path, encoding='utf-8') as f:
+        instance = json.load(f)
+    built = build_schedule_model(roster_employees_data(), instance['year'], instance['month'], instance['requests'],
+                                 instance['public_holidays'], instance['demand'])
+    report = coverage_report(built)
+    report['instance'] = instance.get('name', os.path.splitext(os.path.basename(path))[0])
+    return report
+
+
+def print_report(report):
+    print(f"[{report['instance']}] {report['num_constraints']} constraint, {report['redundant_constraints']} redundan")
+    for rule, entry in report['rules'].items():
+        overlaps = ', '.join(f"{other}: {count}" for other, count in sorted(entry['overlaps'].items()))
+        print(f"  {rule:<32} {entry['constraints']:>6}  duplikat {entry['duplicate']:>5}  tersirat {entry['subsumed']:>5}"
+              f"  mati {entry['trivial']:>5}" + (f"  (dicakup {overlaps})" if overlaps else ''))
+    if report['dead_rules']:
+        print(f"  Aturan tanpa constraint efektif: {', '.join(report['dead_rules'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Laporan constraint aktif, redundan & mati per fungsi aturan apply_*.")
+    parser.add_argument('instances', nargs='*', help="File instance benchmark (default: benchmarks/*.json)")
+    parser.add_argument('--source-dir', default=os.path.dirname(os.path.abspath(__file__)),
+                        help="Direktori yang dipindai untuk definisi fungsi ganda")
+    parser.add_argument('--output', help="Simpan laporan lengkap sebagai JSON")
+    args = parser.parse_args()
+
+    paths = args.instances or sorted(glob.glob(DEFAULT_BENCHMARK_GLOB))
+    if not paths:
+        parser.error("Tidak ada instance benchmark.")
+    reports = []
+    for path in paths:
+        reports.append(analyze_instance(path))
+        print_report(reports[-1])
+
+    shadowed = shadowed_definitions(sorted(glob.glob(os.path.join(args.source_dir, '*.py'))))
+    for file_name, names in shadowed.items():
+        for name, linenos in names.items():
+            print(f"⚠️ {file_name}: '{name}' didefinisikan {len(linenos)}x (baris {', '.join(map(str, linenos))}); "
+                  f"hanya definisi terakhir yang dipakai.")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"instances": reports, "shadowed_definitions": shadowed}, f, ensure_ascii=False, indent=2)
+        print(f"✅ Laporan disimpan ke {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+# file: demand_sensitivity.py
+
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from rule_plan import DAY_TYPES
+
+# =================================================================================
+# ANALISIS SENSITIVITAS DEMAND ("BAGAIMANA JIKA P8 WEEKDAY JADI [4, 5]?")
+# =================================================================================
+# Model skenario dasar dibangun & diselesaikan sekali. Setiap perturbasi memakai salinan
+# model tersebut dan hanya mengubah batas (domain) baris AddLinearConstraint demand yang
+# terdampak (lihat ScheduleModel.demand_rows), diberi hint jadwal dasar, lalu semua
+# perturbasi diselesaikan paralel. Hasilnya tabel kelayakan & objective per perturbasi.
+#
+# Modul ini juga dipakai API untuk validasi payload, jadi ortools dan solver hanya
+# dimuat di dalam fungsi yang menjalankan solve (di worker).
+
+SENSITIVITY_RESULT_TYPE = 'sensitivity'
+MAX_PERTURBATIONS = 16
+# Porsi budget waktu untuk solve skenario dasar; sisanya untuk solve perturbasi
+SENSITIVITY_BASE_FRACTION = 0.4
+SENSITIVITY_MAX_PARALLEL = 4
+# Dengan 1 worker CP-SAT model bulanan jarang menemukan solusi layak; portofolio minimal 4 worker
+SENSITIVITY_MIN_WORKERS_PER_SOLVE = 4
+SENSITIVITY_MIN_SOLVE_SECONDS = 5.0
+
+
+def is_sensitivity_result(payload):
+    return isinstance(payload, dict) and payload.get('type') == SENSITIVITY_RESULT_TYPE
+
+
+def _change_label(change):
+    return f"{change['shift']} {'/'.join(change['day_types'])} [{change['min']}, {change['max']}]"
+
+
+def _parse_change(change, shift_names):
+    if not isinstance(change, dict):
+        raise ValueError("Perubahan demand harus berupa objek {shift, day_type, min, max}")
+    shift_name = change.get('shift')
+    if shift_name not in shift_names:
+        raise ValueError(f"Shift '{shift_name}' tidak dikenal")
+    day_types = change.get('day_type', list(DAY_TYPES))
+    if isinstance(day_types, str):
+        day_types = [day_types]
+    if not isinstance(day_types, list) or not day_types or any(day_type not in DAY_TYPES for day_type in day_types):
+        raise ValueError(f"'day_type' harus salah satu / list dari {', '.join(DAY_TYPES)}")
+    min_req, max_req = change.get('min'), change.get('max')
+    if not all(isinstance(value, int) and not isinstance(value, bool) for value in (min_req, max_req)) or not 0 <= min_req <= max_req:
+        raise ValueError(f"Batas demand {shift_name} harus bilangan bulat 0 <= min <= max")
+    return {"shift": shift_name, "day_types": list(dict.fromkeys(day_types)), "min": min_req, "max": max_req}
+
+
+def parse_perturbations(perturbations, shift_names):
+    """
+    Validasi daftar perturbasi. Setiap perturbasi berupa satu perubahan
+    {shift, day_type (opsional, default semua tipe hari), min, max} atau
+    {name, changes: [perubahan, ...]}. Mengembalikan [{name, changes}] atau melempar ValueError.
+    """
+    if not isinstance(perturbations, list) or not perturbations:
+        raise ValueError("Parameter 'perturbations' harus berupa list yang tidak kosong")
+    if len(perturbations) > MAX_PERTURBATIONS:
+        raise ValueError(f"Maksimal {MAX_PERTURBATIONS} perturbasi per analisis")
+    parsed = []
+    for index, perturbation in enumerate(perturbations):
+        if not isinstance(perturbation, dict):
+            raise ValueError(f"Perturbasi #{index + 1} harus berupa objek")
+        raw_changes = perturbation.get('changes', [perturbation])
+        if not isinstance(raw_changes, list) or not raw_changes:
+            raise ValueError(f"Perturbasi #{index + 1}: 'changes' harus berupa list yang tidak kosong")
+        try:
+            changes = [_parse_change(change, shift_names) for change in raw_changes]
+        except ValueError as e:
+            raise ValueError(f"Perturbasi #{index + 1}: {e}")
+        name = perturbation.get('name') or ', '.join(_change_label(change) for change in changes)
+        parsed.append({"name": str(name), "changes": changes})
+    return parsed
+
+
+def _perturbed_model(built, changes, hint_assignment):
+    """Salinan model dasar dengan batas baris demand yang terdampak diganti (model dasar tidak berubah)."""
+    model = built.model.clone()
+    if hint_assignment is not None:
+        # Hint greedy diganti jadwal hasil skenario dasar
+        model.ClearHints()
+        built.shifts.add_hint(model, hint_assignment)
+    proto = model.Proto()
+    plan, cal = built.plan, built.cal
+    for change in changes:
+        s_idx = plan.shift_map[change['shift']]
+        for day_type in change['day_types']:
+            for d in cal.days_by_type[day_type]:
+                row = built.demand_rows.get((d, s_idx))
+                if row is not None:
+                    domain = proto.constraints[row].linear.domain
+                    domain[0], domain[1] = change['min'], change['max']
+                    continue
+                # Shift tanpa demand di skenario dasar: baris baru hanya di salinan model
+                linear = proto.constraints.add().linear
+                day_vars = built.shifts.day_vars(d, [s_idx])
+                linear.vars.extend(var.Index() for var in day_vars)
+                linear.coeffs.extend([1] * len(day_vars))
+                linear.domain.extend([change['min'], change['max']])
+    return model
+
+
+def _parallel_solves(features, num_perturbations, num_workers, memory_limit_mb):
+    """Jumlah solve paralel & worker CP-SAT per solve, dibatasi jumlah worker dan budget memori."""
+    from solver_profiles import estimate_memory_mb
+
+    parallel = max(1, min(num_perturbations, SENSITIVITY_MAX_PARALLEL, num_workers // SENSITIVITY_MIN_WORKERS_PER_SOLVE))
+    while True:
+        workers_each = max(min(SENSITIVITY_MIN_WORKERS_PER_SOLVE, num_workers), num_workers // parallel)
+        if memory_limit_mb is None or parallel == 1 or parallel * estimate_memory_mb(features, workers_each) <= memory_limit_mb:
+            return parallel, workers_each
+        parallel -= 1
+
+
+def run_sensitivity(employees_data, target_year, target_month, pre_assignment_requests, public_holidays, demand,
+                    perturbations, time_limit_seconds, solver_options=None, on_progress=None, fairness_offsets=None):
+    """
+    Menyelesaikan skenario dasar lalu setiap perturbasi (hasil parse_perturbations) pada
+    salinan model dasar, paralel dan dengan hint jadwal dasar. fairness_offsets: offset ledger
+    keadilan (fairness_ledger.task_offsets), ikut terbawa ke salinan model setiap perturbasi. Mengembalikan
+    {"type": 'sensitivity', "base": {...}, "scenarios": [{name, changes, status, feasible,
+     objective, objective_delta, best_bound, runtime_seconds, cells_changed}], ...}.
+    """
+    from ortools.sat.python import cp_model
+
+    from greedy_schedule import construct_schedule
+    from solver_2 import build_schedule_model
+    from solver_profiles import apply_memory_limit, apply_profile, apply_seed, problem_features, resolve_profile
+
+    solver_options = solver_options or {}
+    started = time.perf_counter()
+    built = build_schedule_model(employees_data, target_year, target_month, pre_assignment_requests, public_holidays, demand,
+                                 fairness_offsets)
+    greedy_assignment, _ = construct_schedule(built)
+    built.shifts.add_hint(built.model, greedy_assignment)
+
+    model_proto = built.model.Proto()
+    features = problem_features(len(built.plan.employees), built.cal.num_days, len(built.pre_assignments),
+                                len(model_proto.variables), len(model_proto.constraints))
+    profile_name, profile_params = resolve_profile(solver_options.get('profile'), features)
+    solver = cp_model.CpSolver()
+    apply_profile(solver, profile_params, time_limit_seconds * SENSITIVITY_BASE_FRACTION)
+    memory = apply_memory_limit(solver, features, solver_options.get('memory_limit_mb'))
+    apply_seed(solver, solver_options.get('seed'))
+    status = solver.Solve(built.model)
+
+    base_feasible = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    base_assignment = built.shifts.assignment(solver) if base_feasible else None
+    base_objective = solver.ObjectiveValue() if base_feasible else None
+    base = {
+        "status": solver.StatusName(status),
+        "feasible": base_feasible,
+        "objective": base_objective,
+        "best_bound": solver.BestObjectiveBound() if base_feasible else None,
+        "runtime_seconds": round(solver.WallTime(), 2),
+    }
+    if on_progress:
+        try:
+            on_progress(dict(base, stage='base'))
+        except Exception as e:
+            print(f"Warning: Gagal melaporkan progres sensitivitas: {e}")
+
+    parallel, workers_each = _parallel_solves(features, len(perturbations), solver.parameters.num_search_workers,
+                                              memory['limit_mb'])
+    waves = math.ceil(len(perturbations) / parallel)
+    remaining = time_limit_seconds - (time.perf_counter() - started)
+    solve_seconds = max(SENSITIVITY_MIN_SOLVE_SECONDS, remaining / waves)
+
+    def solve_perturbation(index):
+        perturbation = perturbations[index]
+        model = _perturbed_model(built, perturbation['changes'], base_assignment)
+        scenario_solver = cp_model.CpSolver()
+        scenario_solver.parameters.max_time_in_seconds = solve_seconds
+        scenario_solver.parameters.num_search_workers = workers_each
+        scenario_solver.parameters.random_seed = solver.parameters.random_seed
+        scenario_status = scenario_solver.Solve(model)
+        feasible = scenario_status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+        row = dict(perturbation, status=scenario_solver.StatusName(scenario_status), feasible=feasible,
+                   objective=None, objective_delta=None, best_bound=None, cells_changed=None,
+                   runtime_seconds=round(scenario_solver.WallTime(), 2))
+        if feasible:
+            row["objective"] = scenario_solver.ObjectiveValue()
+            row["best_bound"] = scenario_solver.BestObjectiveBound()
+            if base_feasible:
+                row["objective_delta"] = row["objective"] - base_objective
+                # Jumlah sel yang berbeda dari jadwal dasar
+                assignment = built.shifts.assignment(scenario_solver)
+                row["cells_changed"] = sum(a != b for base_cells, cells in zip(base_assignment, assignment)
+                                           for a, b in zip(base_cells, cells))
+        if on_progress:
+            try:
+                on_progress({"stage": 'perturbation', "index": index, "name": row["name"], "status": row["status"]})
+            except Exception as e:
+                print(f"Warning: Gagal melaporkan progres sensitivitas: {e}")
+        return row
+
+    # CP-SAT melepas GIL selama Solve, sehingga thread cukup untuk solve paralel
+    with ThreadPoolExecutor(max_workers=parallel) as pool:
+        scenarios = list(pool.map(solve_perturbation, range(len(perturbations))))
+
+    return {
+        "type": SENSITIVITY_RESULT_TYPE,
+        "year": target_year,
+        "month": target_month,
+        "base": base,
+        "scenarios": scenarios,
+        "solver_profile": profile_name,
+        "parallel_solves": parallel,
+        "workers_per_solve": workers_each,
+        "build_seconds": round(sum(built.build_seconds.values()), 3),
+        "elapsed_seconds": round(time.perf_counter() - started, 2),
+    }
@@ -0,0 +1,157 @@
+# file: fairness_ledger.py
+
+import json
+
+import redis
+
+from rule_plan import compile_rule_plan, roster_employees_data
+from task_events import get_redis
+
+# =================================================================================
+# LEDGER KEADILAN LINTAS BULAN (PER NIP, ROLLING SETAHUN)
+# =================================================================================
+# Suku keadilan di apply_soft_constraints (rentang hari kerja akhir pekan per grup,
+# P6+SOC6 FB, total SOC MB, shift malam MB, S12+SOC2 MB) hanya menyeimbangkan satu bulan.
+# Ledger menyimpan total bulanan setiap metrik per NIP untuk jadwal yang sudah diterima
+# (satu hash Redis per NIP, field = 'YYYY-MM'), lalu total 12 bulan sebelum bulan target
+# dipakai sebagai offset pada total per karyawan di suku-suku tersebut, sehingga rentang
+# yang diminimalkan adalah rentang kumulatif setahun.
+#
+# Mencatat satu bulan cukup satu round trip baca + satu round trip tulis (pipeline).
+#
+# Offset dibaca API saat tugas dibuat (seperti roster), dikirim ke worker bersama argumen
+# tugas, dan disimpan bersama input solve agar objective edit manual sama dengan objective
+# yang dioptimalkan solver.
+
+LEDGER_PREFIX = 'jadwal:fairness-ledger:'
+LEDGER_WINDOW_MONTHS = 12
+# Bulan yang lebih lama dari ini dihapus saat ledger diperbarui
+LEDGER_RETENTION_MONTHS = 24
+
+
+def month_key(year, month):
+    return f"{int(year):04d}-{int(month):02d}"
+
+
+def _month_number(key):
+    year, month = key.split('-')
+    return int(year) * 12 + int(month) - 1
+
+
+def metric_shift_indices(plan):
+    """Indeks shift yang dihitung per metrik (sama seperti suku keadilan di apply_soft_constraints)."""
+    shift_map = plan.shift_map
+    metrics = {
+        'weekend_work': plan.work_shift_indices,
+        'p6_soc6': [shift_map[s] for s in ('P6', 'SOC6') if s in shift_map],
+        'soc': [idx for name, idx in shift_map.items() if 'SOC' in name],
+        'night': plan.night_indices,
+        's12_soc2': [shift_map[s] for s in ('S12', 'SOC2') if s in shift_map],
+    }
+    return {metric: indices for metric, indices in metrics.items() if indices}
+
+
+def monthly_totals(schedule, plan, cal):
+    """Jadwal {nip: [shift, ...]} -> {nip: {metric: total}} untuk satu bulan."""
+    metric_shifts = {metric: {plan.all_shifts[idx] for idx in indices} for metric, indices in metric_shift_indices(plan).items()}
+    weekend_days = set(cal.weekend_days)
+    totals = {}
+    for nip, shift_names in schedule.items():
+        totals[str(nip)] = {
+            metric: sum(1 for d, shift_name in enumerate(shift_names)
+                        if shift_name in names and (metric != 'weekend_work' or d in weekend_days))
+            for metric, names in metric_shifts.items()
+        }
+    return totals
+
+
+def record_schedule(year, month, schedule, plan, cal):
+    """
+    Mencatat total bulanan jadwal yang diterima ke ledger. Mencatat ulang bulan yang sama
+    menimpa entri sebelumnya. Mengembalikan total yang dicatat {nip: {metric: total}}.
+    """
+    key = month_key(year, month)
+    totals = monthly_totals(schedule, plan, cal)
+    oldest = _month_number(key) - LEDGER_RETENTION_MONTHS
+    client = get_redis()
+    pipe = client.pipeline()
+    for nip in totals:
+        pipe.hkeys(LEDGER_PREFIX + nip)
+    existing = pipe.execute()
+    pipe = client.pipeline()
+    for (nip, metrics), months in zip(totals.items(), existing):
+        pipe.hset(LEDGER_PREFIX + nip, key, json.dumps(metrics))
+        expired = [m for m in (raw.decode() if isinstance(raw, bytes) else raw for raw in months) if _month_number(m) < oldest]
+        if expired:
+            pipe.hdel(LEDGER_PREFIX + nip, *expired)
+    pipe.execute()
+    return totals
+
+
+def load_history(nips, year, month, window_months=LEDGER_WINDOW_MONTHS):
+    """Total per metrik selama `window_months` bulan sebelum bulan target: {nip: {metric: total}} (hanya NIP yang punya riwayat)."""
+    target = _month_number(month_key(year, month))
+    pipe = get_redis().pipeline()
+    for nip in nips:
+        pipe.hgetall(LEDGER_PREFIX + str(nip))
+    history = {}
+    for nip, entries in zip(nips, pipe.execute()):
+        totals = {}
+        for raw_month, raw_metrics in entries.items():
+            month_str = raw_month.decode() if isinstance(raw_month, bytes) else raw_month
+            if not target - window_months <= _month_number(month_str) < target:
+                continue
+            for metric, value in json.loads(raw_metrics).items():
+                totals[metric] = totals.get(metric, 0) + value
+        if totals:
+            history[str(nip)] = totals
+    return history
+
+
+def compute_offsets(plan, history):
+    """
+    Offset per metrik per karyawan {metric: [offset per e_idx]} dari riwayat ledger. Offset
+    dinormalisasi per grup (dikurangi minimum grup) karena hanya rentang yang dioptimalkan;
+    karyawan tanpa riwayat (mis. baru bergabung) mendapat rata-rata grupnya agar tidak
+    langsung menanggung beban setahun. Mengembalikan None jika tidak ada riwayat sama sekali.
+    """
+    if not history:
+        return None
+    offsets = {}
+    for metric in metric_shift_indices(plan):
+        values = [0] * len(plan.employees)
+        for group_indices in plan.group_indices.values():
+            known = {}
+            for e_idx in group_indices:
+                nip = plan.code_to_nip.get(plan.employees[e_idx], plan.employees[e_idx])
+                if metric in history.get(str(nip), {}):
+                    known[e_idx] = history[str(nip)][metric]
+            if not known:
+                continue
+            average = round(sum(known.values()) / len(known))
+            group_totals = {e_idx: known.get(e_idx, average) for e_idx in group_indices}
+            lowest = min(group_totals.values())
+            for e_idx, total in group_totals.items():
+                values[e_idx] = total - lowest
+        if any(values):
+            offsets[metric] = values
+    return offsets or None
+
+
+def load_offsets(plan, year, month):
+    """Offset keadilan untuk bulan target (atau None jika ledger kosong / Redis tidak tersedia)."""
+    nips = [plan.code_to_nip.get(code, code) for code in plan.employees]
+    try:
+        history = load_history(nips, year, month)
+    except redis.RedisError as e:
+        # Ledger hanya pelengkap; tanpa ledger keadilan dihitung per bulan seperti sebelumnya
+        print(f"Warning: Gagal membaca ledger keadilan: {e}")
+        return None
+    return compute_offsets(plan, history)
+
+
+def task_offsets(solver_options, roster, year, month):
+    """Offset untuk tugas baru, atau None jika ledger dimatikan (opsi solver 'fairness_ledger': false)."""
+    if not (solver_options or {}).get('fairness_ledger', True):
+        return None
+    return load_offsets(compile_rule_plan(roster or roster_employees_data()), year, month)
@@ -0,0 +1,193 @@
+# file: greedy_schedule.py
+
+import time
+
+# =================================================================================
+# HEURISTIK KONSTRUKTIF (JADWAL SEMENTARA & HINT CP-SAT)
+# =================================================================================
+# Mengisi kebutuhan harian (demand per tipe hari) hari demi hari secara greedy dalam
+# hitungan milidetik, dengan menghormati request (pre-assignment), larangan shift per
+# grup / karyawan, dan aturan istirahat dasar: Libur setelah shift malam, perempuan tidak
+# shift malam berturut-turut, SOCM→Libur→bukan P6-P9 untuk laki-laki, dan maksimal 6
+# hari kerja berturut-turut. Tim yang punya tabel komposisi (plan.compositions) diisi lebih
+# dulu dengan salah satu baris tabel, shift malam mendahulukan MB sampai cakupan minimal
+# malam MB per hari terpenuhi, dan M untuk FB dibatasi kuota bulanannya. Hasilnya belum
+# tentu memenuhi semua aturan; dipakai sebagai jadwal sementara untuk user dan sebagai
+# solution hint agar CP-SAT mulai dari titik yang baik.
+
+MAX_CONSECUTIVE_WORK_DAYS = 6
+# Jumlah shift M per bulan untuk FB (lihat apply_employee_monthly_rules)
+FB_M_SHIFTS = 2
+
+
+def construct_schedule(built):
+    """
+    Jadwal greedy untuk ScheduleModel `built`: assignment [e][d] -> s_idx dan laporan
+    {"seconds", "unfilled_demand": jumlah kekurangan (hari × shift) terhadap batas bawah demand}.
+    """
+    started = time.perf_counter()
+    plan, cal = built.plan, built.cal
+    num_employees, num_days, num_shifts = len(plan.employees), cal.num_days, len(plan.all_shifts)
+    libur_idx, cuti_idx = plan.libur_idx, plan.cuti_idx
+    night, work = set(plan.night_indices), set(plan.work_indices)
+    female = {plan.employee_map[code] for code in plan.female_employees}
+    male_bandung = set(plan.group_indices.get('MB', []))
+    female_bandung = set(plan.group_indices.get('FB', []))
+    # Minimal karyawan MB di shift malam setiap hari (lihat apply_additional_constraints)
+    min_mb_nights = plan.daily_night_minimum.get('MB', 0)
+    m_idx, p9_idx, socm_idx = plan.shift_map.get('M'), plan.shift_map.get('P9'), plan.shift_map.get('SOCM')
+    early = {plan.shift_map[name] for name in ('P6', 'P7', 'P8', 'P9') if name in plan.shift_map}
+    weekend_days = set(cal.weekend_days)
+    # Cuti hanya boleh dari request
+    forbidden = [set(plan.forbidden_by_employee.get(e_idx, ())) | {cuti_idx} for e_idx in range(num_employees)]
+    compositions_by_type = {}
+    for _, site_indices, day_types, column_shifts, rows in plan.compositions:
+        for day_type in day_types:
+            compositions_by_type.setdefault(day_type, []).append((site_indices, column_shifts, rows))
+
+    assignment = [[None] * num_days for _ in range(num_employees)]
+    for (e_idx, d), shift_name in built.pre_assignments.items():
+        if shift_name in plan.shift_map:
+            assignment[e_idx][d] = plan.shift_map[shift_name]
+
+    work_days = [0] * num_employees
+    streak = [0] * num_employees
+    shift_counts = [[0] * num_shifts for _ in range(num_employees)]
+    unfilled = 0
+
+    def must_rest(e_idx, d):
+        if streak[e_idx] >= MAX_CONSECUTIVE_WORK_DAYS or work_days[e_idx] >= cal.max_work_days:
+            return True
+        # Setelah shift malam: Libur (dua malam berturut-turut: dua hari Libur)
+        if d >= 1 and assignment[e_idx][d - 1] in night:
+            return True
+        return d >= 2 and assignment[e_idx][d - 2] in night and assignment[e_idx][d - 1] in night
+
+    def allowed(e_idx, s_idx, d):
+        if s_idx in forbidden[e_idx]:
+            return False
+        if s_idx in night and e_idx in female and d >= 1 and assignment[e_idx][d - 1] in night:
+            return False
+        # Laki-laki: SOCM lalu Libur, hari berikutnya bukan P6-P9
+        if (s_idx in early and e_idx not in female and d >= 2
+                and assignment[e_idx][d - 2] == socm_idx and assignment[e_idx][d - 1] == libur_idx):
+            return False
+        if s_idx == m_idx and e_idx in female_bandung and shift_counts[e_idx][m_idx] >= FB_M_SHIFTS:
+            return False
+        return not (s_idx == p9_idx and d in weekend_days and male_bandung and e_idx not in male_bandung)
+
+    def behind(e_idx, d):
+        """Kekurangan hari kerja karyawan terhadap laju target bulanan (positif = tertinggal)."""
+        return cal.min_work_days * (d + 1) / num_days - work_days[e_idx]
+
+    def fill_composition(d, free, site_indices, column_shifts, rows):
+        """
+        Memilih satu baris komposisi untuk tim site pada hari d: anggota yang sudah terisi
+        (request / wajib istirahat) mengisi kolomnya, sisanya dibagi ke kolom tersisa dengan
+        mendahulukan anggota yang tertinggal hari kerjanya. Mengembalikan {e_idx: s_idx} atau None.
+        """
+        column_of = {s_idx: c for c, (_, s_indices) in enumerate(column_shifts) for s_idx in s_indices}
+        members = [e_idx for e_idx in site_indices if e_idx in free]
+        fixed = [column_of.get(assignment[e_idx][d]) for e_idx in site_indices if e_idx not in free]
+        if None in fixed:
+            return None
+        members.sort(key=lambda e_idx: (-behind(e_idx, d), e_idx))
+        best, best_cost = None, None
+        for row in rows:
+            remaining = list(row)
+            for c in fixed:
+                remaining[c] -= 1
+            if min(remaining) < 0:
+                continue
+            # Kolom off = Libur; kolom shift = shift pertama kolom tersebut
+            slots = [(c, libur_idx if s_indices[0] in (libur_idx, cuti_idx) else s_indices[0])
+                     for c, (_, s_indices) in enumerate(column_shifts)]
+            chosen = {}
+
+            def place(i):
+                if i == len(members):
+                    return True
+                e_idx = members[i]
+                # Anggota yang tertinggal mencoba kolom kerja lebih dulu, yang lain kolom off
+                for c, s_idx in sorted(slots, key=lambda slot: (slot[1] == libur_idx) == (behind(e_idx, d) > 0)):
+                    if remaining[c] and (s_idx == libur_idx or allowed(e_idx, s_idx, d)):
+                        remaining[c] -= 1
+                        chosen[e_idx] = s_idx
+                        if place(i + 1):
+                            return True
+                        remaining[c] += 1
+                        del chosen[e_idx]
+                return False
+
+            if place(0):
+                cost = sum(behind(e_idx, d) * (1 if s_idx == libur_idx else -1) for e_idx, s_idx in chosen.items())
+                if best_cost is None or cost < best_cost:
+                    best, best_cost = dict(chosen), cost
+        return best
+
+    for d in cal.days:
+        counts = [0] * num_shifts
+        free = []
+        for e_idx in range(num_employees):
+            s_idx = assignment[e_idx][d]
+            if s_idx is not None:
+                counts[s_idx] += 1
+            elif must_rest(e_idx, d):
+                assignment[e_idx][d] = libur_idx
+            else:
+                free.append(e_idx)
+
+        for site_indices, column_shifts, rows in compositions_by_type.get(cal.day_types[d], []):
+            chosen = fill_composition(d, set(free), site_indices, column_shifts, rows)
+            for e_idx, s_idx in (chosen or {}).items():
+                assignment[e_idx][d] = s_idx
+                counts[s_idx] += 1
+                free.remove(e_idx)
+
+        demand = built.daily_demand[cal.day_types[d]]
+        night_slots = sum(max(0, min_req - counts[s_idx]) for s_idx, min_req, _ in demand if s_idx in night)
+        mb_nights = sum(assignment[e_idx][d] in night for e_idx in male_bandung)
+        # Karyawan dengan pilihan shift paling sedikit hari ini (mis. FB) didahulukan
+        num_options = {e_idx: sum(max_req > 0 and allowed(e_idx, s_idx, d) for s_idx, _, max_req in demand) for e_idx in free}
+        # Shift malam lebih dulu (kandidatnya paling sedikit), lalu shift dengan rentang tersempit
+        for s_idx, min_req, max_req in sorted(demand, key=lambda item: (item[0] not in night, item[2] - item[1])):
+            needed = min_req - counts[s_idx]
+            for _ in range(max(0, needed)):
+                candidates = [e_idx for e_idx in free if allowed(e_idx, s_idx, d)]
+                if s_idx in night:
+                    # Slot malam tersisa harus untuk MB jika cakupan MB belum terpenuhi
+                    mb_only = night_slots <= min_mb_nights - mb_nights
+                    candidates = [e_idx for e_idx in candidates if e_idx in male_bandung or not mb_only]
+                    # FB yang belum memenuhi kuota M didahulukan di slot non-MB
+                    key = lambda e_idx: (not (s_idx == m_idx and e_idx in female_bandung), e_idx not in male_bandung,
+                                         sum(shift_counts[e_idx][n] for n in night), work_days[e_idx], e_idx)
+                    night_slots -= 1
+                else:
+                    key = lambda e_idx: (num_options[e_idx], shift_counts[e_idx][s_idx], work_days[e_idx], streak[e_idx], e_idx)
+                if not candidates:
+                    break
+                e_idx = min(candidates, key=key)
+                assignment[e_idx][d] = s_idx
+                counts[s_idx] += 1
+                mb_nights += e_idx in male_bandung and s_idx in night
+                free.remove(e_idx)
+            unfilled += max(0, min_req - counts[s_idx])
+
+        # Sisa karyawan: bekerja jika tertinggal dari target hari kerja bulanan dan masih ada slot
+        spare = [(s_idx, max_req) for s_idx, _, max_req in demand if s_idx not in night]
+        for e_idx in sorted(free, key=lambda e_idx: (behind(e_idx, d) <= 0, num_options[e_idx], -behind(e_idx, d), e_idx)):
+            options = [s_idx for s_idx, max_req in spare if counts[s_idx] < max_req and allowed(e_idx, s_idx, d)]
+            if behind(e_idx, d) > 0 and options:
+                s_idx = min(options, key=lambda s: (shift_counts[e_idx][s], counts[s]))
+                assignment[e_idx][d] = s_idx
+                counts[s_idx] += 1
+            else:
+                assignment[e_idx][d] = libur_idx
+
+        for e_idx in range(num_employees):
+            s_idx = assignment[e_idx][d]
+            shift_counts[e_idx][s_idx] += 1
+            streak[e_idx] = 0 if s_idx in (libur_idx, cuti_idx) else streak[e_idx] + 1
+            work_days[e_idx] += s_idx in work
+
+    return assignment, {"seconds": round(time.perf_counter() - started, 4), "unfilled_demand": unfilled}
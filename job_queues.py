@@ -0,0 +1,148 @@
+# file: job_queues.py
+
+import os
+import time
+
+from task_events import get_redis
+
+# =================================================================================
+# KELAS TUGAS, PRIORITAS & ADMISSION CONTROL
+# =================================================================================
+# Setiap kelas tugas punya queue Celery sendiri sehingga simulasi massal tidak
+# menahan re-plan interaktif. Jumlah slot CPU per kelas diatur lewat --concurrency
+# worker yang mendengarkan queue tersebut (lihat docker-compose.yml).
+#   - priority            : prioritas pesan di broker (0 rendah .. 9 tinggi)
+#   - max_concurrency     : slot CPU (jumlah solve bersamaan) untuk kelas ini
+#   - max_queued          : batas antrian; request baru ditolak (429) jika penuh
+#   - solver_time_limit   : batas waktu CP-SAT per run (detik)
+JOB_CLASSES = {
+    'interactive': {'queue': 'interactive', 'priority': 9, 'max_concurrency': 2, 'max_queued': 20, 'solver_time_limit': 60.0},
+    'monthly': {'queue': 'monthly', 'priority': 5, 'max_concurrency': 2, 'max_queued': 50, 'solver_time_limit': 400.0},
+    'batch': {'queue': 'batch', 'priority': 1, 'max_concurrency': 1, 'max_queued': 100, 'solver_time_limit': 400.0},
+}
+DEFAULT_JOB_CLASS = 'monthly'
+
+# Cadangan waktu di atas total budget solver sebelum Celery menghentikan tugas
+TASK_TIME_LIMIT_MARGIN_SECONDS = 60
+
+QUEUE_KEY_PREFIX = 'jadwal:queue:'
+TASK_CLASS_KEY_PREFIX = 'jadwal:task-class:'
+TASK_ENQUEUED_KEY_PREFIX = 'jadwal:task-enqueued:'
+TASK_CLASS_TTL_SECONDS = 24 * 60 * 60
+
+# Batas memori per solve: SOLVER_MEMORY_LIMIT_MB jika diisi, selain itu batas memori
+# container (cgroup v2 / v1, atau total RAM) dikali cadangan lalu dibagi slot kelas tugas.
+SOLVER_MEMORY_LIMIT_ENV = 'SOLVER_MEMORY_LIMIT_MB'
+CGROUP_MEMORY_LIMIT_FILES = ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes')
+MEMORY_HEADROOM_FRACTION = 0.85
+
+
+class QueueFullError(Exception):
+    """Antrian untuk kelas tugas tertentu sudah penuh."""
+
+
+def classify_job(data, num_runs=1):
+    """Menentukan kelas tugas dari payload request."""
+    job_class = data.get('job_class')
+    if job_class:
+        if job_class not in JOB_CLASSES:
+            raise ValueError(f"job_class '{job_class}' tidak dikenal. Pilihan: {', '.join(JOB_CLASSES)}")
+        return job_class
+    if num_runs > 1:
+        return 'batch'
+    if data.get('replan'):
+        return 'interactive'
+    return DEFAULT_JOB_CLASS
+
+
+def task_time_limits(job_class, num_runs=1):
+    """Mengembalikan (soft_time_limit, time_limit) Celery untuk satu tugas."""
+    solver_budget = JOB_CLASSES[job_class]['solver_time_limit'] * num_runs
+    return solver_budget + TASK_TIME_LIMIT_MARGIN_SECONDS, solver_budget + 2 * TASK_TIME_LIMIT_MARGIN_SECONDS
+
+
+def admit_job(job_class, task_id):
+    """
+    Mendaftarkan task_id ke antrian kelasnya dan mengembalikan posisi antrian (mulai dari 1).
+    Melempar QueueFullError jika antrian kelas ini sudah mencapai batas.
+    """
+    return admit_jobs(job_class, [task_id])[0]
+
+
+def admit_jobs(job_class, task_ids):
+    """Seperti admit_job, tetapi untuk beberapa tugas sekaligus (semua diterima atau semua ditolak)."""
+    config = JOB_CLASSES[job_class]
+    client = get_redis()
+    queue_key = QUEUE_KEY_PREFIX + job_class
+    if client.llen(queue_key) + len(task_ids) > config['max_queued']:
+        raise QueueFullError(f"Antrian '{job_class}' penuh ({config['max_queued']} tugas). Coba lagi nanti.")
+    positions = []
+    enqueued_at = time.time()
+    for task_id in task_ids:
+        positions.append(client.rpush(queue_key, task_id))
+        client.set(TASK_CLASS_KEY_PREFIX + task_id, job_class, ex=TASK_CLASS_TTL_SECONDS)
+        client.set(TASK_ENQUEUED_KEY_PREFIX + task_id, enqueued_at, ex=TASK_CLASS_TTL_SECONDS)
+    return positions
+
+
+def release_job(job_class, task_id):
+    """
+    Menghapus task_id dari antrian (dipanggil worker saat tugas mulai dikerjakan).
+    Mengembalikan lama tugas menunggu di antrian (detik), atau None jika tidak tercatat.
+    """
+    client = get_redis()
+    client.lrem(QUEUE_KEY_PREFIX + job_class, 1, task_id)
+    enqueued_at = client.get(TASK_ENQUEUED_KEY_PREFIX + task_id)
+    return max(0.0, time.time() - float(enqueued_at)) if enqueued_at else None
+
+
+def get_queue_position(task_id):
+    """Posisi task_id di antriannya (mulai dari 1), atau None jika sudah tidak mengantri."""
+    client = get_redis()
+    job_class = client.get(TASK_CLASS_KEY_PREFIX + task_id)
+    if not job_class:
+        return None
+    job_class = job_class.decode()
+    index = client.lpos(QUEUE_KEY_PREFIX + job_class, task_id)
+    if index is None:
+        return None
+    return {"job_class": job_class, "position": index + 1, "ahead": index,
+            "slots": JOB_CLASSES[job_class]['max_concurrency']}
+
+
+def _read_first_line(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return f.readline().strip()
+    except OSError:
+        return None
+
+
+def container_memory_limit_mb():
+    """Batas memori container dalam MB (cgroup, dibatasi total RAM); None jika tidak diketahui."""
+    limits = []
+    for path in CGROUP_MEMORY_LIMIT_FILES:
+        value = _read_first_line(path)
+        if value and value.isdigit():
+            limits.append(int(value) / (1024 * 1024))
+    meminfo = _read_first_line('/proc/meminfo')
+    if meminfo and meminfo.startswith('MemTotal:'):
+        limits.append(int(meminfo.split()[1]) / 1024)
+    return min(limits) if limits else None
+
+
+def task_memory_limit_mb(job_class):
+    """Batas memori (MB) untuk satu solve kelas tugas `job_class`; None = tanpa batas."""
+    configured = os.environ.get(SOLVER_MEMORY_LIMIT_ENV)
+    if configured:
+        return float(configured)
+    container_limit = container_memory_limit_mb()
+    if container_limit is None:
+        return None
+    return round(container_limit * MEMORY_HEADROOM_FRACTION / JOB_CLASSES[job_class]['max_concurrency'])
+
+
+def routing_options(job_class):
+    """Opsi apply_async (queue & prioritas) untuk kelas tugas."""
+    config = JOB_CLASSES[job_class]
+    return {'queue': config['queue'], 'priority': config['priority']}
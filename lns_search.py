@@ -0,0 +1,152 @@
+# file: lns_search.py
+
+import random
+import time
+
+from ortools.sat.python import cp_model
+
+# =================================================================================
+# LARGE NEIGHBOURHOOD SEARCH (LNS) DI ATAS MODEL CP-SAT
+# =================================================================================
+# Berangkat dari jadwal layak, setiap iterasi "membebaskan" satu lingkungan terstruktur
+# (satu minggu, satu grup, semua shift malam beserta hari liburnya, atau sekumpulan
+# karyawan acak). Sel di luar lingkungan dikunci ke nilai jadwal saat ini dengan
+# mempersempit domain variabel pada salinan model, sel bebas diberi hint, lalu
+# sub-masalah diselesaikan dengan batas waktu pendek. Jadwal diganti hanya jika objective
+# membaik, sehingga kualitas bisa dilaporkan kapan saja (anytime).
+
+NEIGHBOURHOODS = ('week', 'group', 'night', 'employees')
+LNS_SUB_SOLVE_SECONDS = 5.0
+# Porsi budget waktu untuk solve awal (mencari jadwal layak pertama)
+LNS_INITIAL_FRACTION = 0.25
+LNS_WEEK_LENGTH = 7
+LNS_EMPLOYEE_FRACTION = 0.2
+# Sisa waktu minimum agar satu iterasi LNS masih layak dijalankan
+LNS_MIN_ITERATION_SECONDS = 0.5
+
+
+def _week_cells(built, assignment, rng):
+    num_days = built.cal.num_days
+    start = rng.randrange(max(1, num_days - LNS_WEEK_LENGTH + 1))
+    days = range(start, min(num_days, start + LNS_WEEK_LENGTH))
+    return {(e_idx, d) for e_idx in range(len(assignment)) for d in days}, f"hari {start + 1}-{days[-1] + 1}"
+
+
+def _group_cells(built, assignment, rng):
+    groups = [group for group, members in built.plan.group_indices.items() if members]
+    group = rng.choice(groups)
+    return {(e_idx, d) for e_idx in built.plan.group_indices[group] for d in built.cal.days}, group
+
+
+def _night_cells(built, assignment, rng):
+    """Semua shift malam beserta hari Libur/Cuti karyawan yang bisa dijadwalkan malam."""
+    plan = built.plan
+    night, off = set(plan.night_indices), {plan.libur_idx, plan.cuti_idx}
+    cells = set()
+    for e_idx, row in enumerate(assignment):
+        if night.issubset(plan.forbidden_by_employee.get(e_idx, ())):
+            continue
+        cells.update((e_idx, d) for d, s_idx in enumerate(row) if s_idx in night or s_idx in off)
+    return cells, f"{len(cells)} sel"
+
+
+def _employee_cells(built, assignment, rng):
+    num_employees = len(assignment)
+    chosen = rng.sample(range(num_employees), max(2, round(num_employees * LNS_EMPLOYEE_FRACTION)))
+    return {(e_idx, d) for e_idx in chosen for d in built.cal.days}, f"{len(chosen)} karyawan"
+
+
+NEIGHBOURHOOD_BUILDERS = {
+    'week': _week_cells,
+    'group': _group_cells,
+    'night': _night_cells,
+    'employees': _employee_cells,
+}
+
+
+def _sub_model(built, assignment, free_cells):
+    """Salinan model dengan sel di luar free_cells dikunci & sel bebas diberi hint jadwal saat ini."""
+    sub_model = built.model.clone()
+    # Hint model dasar (mis. jadwal greedy) diganti hint jadwal saat ini
+    sub_model.ClearHints()
+    proto = sub_model.Proto()
+    shifts = built.shifts
+    for e_idx, row in enumerate(assignment):
+        for d, s_idx in enumerate(row):
+            var_index = shifts[e_idx, d, s_idx].Index()
+            if (e_idx, d) in free_cells:
+                proto.solution_hint.vars.append(var_index)
+                proto.solution_hint.values.append(1)
+            else:
+                domain = proto.variables[var_index].domain
+                domain[0], domain[1] = 1, 1
+    return sub_model
+
+
+def improve_schedule(built, assignment, objective, time_limit_seconds, best_bound=None, seed=0,
+                     num_workers=4, sub_solve_seconds=LNS_SUB_SOLVE_SECONDS, neighbourhoods=NEIGHBOURHOODS,
+                     max_iterations=None, deterministic=False, on_progress=None):
+    """
+    Memperbaiki jadwal `assignment` ([e][d] -> s_idx) dari model `built` (ScheduleModel)
+    dengan LNS selama time_limit_seconds. Lingkungan dipakai bergiliran. Dalam mode
+    deterministik setiap sub-solve dibatasi deterministic time dan jumlah iterasi tetap.
+    Mengembalikan (assignment, objective, laporan).
+    """
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    initial_objective = objective
+    if deterministic and max_iterations is None:
+        max_iterations = max(1, int(time_limit_seconds // sub_solve_seconds))
+
+    def gap(value):
+        return round(abs(best_bound - value) / max(1.0, abs(value)), 5) if best_bound is not None else None
+
+    stats = {name: {"attempts": 0, "improvements": 0} for name in neighbourhoods}
+    timeline = [{"iteration": 0, "neighbourhood": 'initial', "elapsed_seconds": 0.0, "objective": objective, "gap": gap(objective)}]
+    iteration = 0
+    while max_iterations is None or iteration < max_iterations:
+        remaining = time_limit_seconds - (time.perf_counter() - started)
+        if remaining < LNS_MIN_ITERATION_SECONDS:
+            break
+        name = neighbourhoods[iteration % len(neighbourhoods)]
+        iteration += 1
+        free_cells, detail = NEIGHBOURHOOD_BUILDERS[name](built, assignment, rng)
+
+        solver = cp_model.CpSolver()
+        solver.parameters.num_search_workers = num_workers
+        solver.parameters.random_seed = seed + iteration
+        if deterministic:
+            solver.parameters.interleave_search = True
+            solver.parameters.max_deterministic_time = sub_solve_seconds
+            solver.parameters.max_time_in_seconds = max(remaining, sub_solve_seconds)
+        else:
+            solver.parameters.max_time_in_seconds = min(sub_solve_seconds, remaining)
+        status = solver.Solve(_sub_model(built, assignment, free_cells))
+
+        stats[name]["attempts"] += 1
+        improved = status in (cp_model.OPTIMAL, cp_model.FEASIBLE) and solver.ObjectiveValue() > objective + 1e-6
+        if improved:
+            stats[name]["improvements"] += 1
+            assignment = built.shifts.assignment(solver)
+            objective = solver.ObjectiveValue()
+            timeline.append({"iteration": iteration, "neighbourhood": name, "detail": detail,
+                             "elapsed_seconds": round(time.perf_counter() - started, 3),
+                             "objective": objective, "gap": gap(objective)})
+            if on_progress:
+                try:
+                    on_progress({"objective": objective, "best_bound": best_bound, "lns_iteration": iteration,
+                                 "neighbourhood": name, "wall_time": timeline[-1]["elapsed_seconds"]})
+                except Exception as e:
+                    print(f"Warning: Gagal melaporkan progres LNS: {e}")
+
+    report = {
+        "initial_objective": initial_objective,
+        "final_objective": objective,
+        "improvement": objective - initial_objective,
+        "iterations": iteration,
+        "elapsed_seconds": round(time.perf_counter() - started, 2),
+        "gap": gap(objective),
+        "neighbourhoods": stats,
+        "timeline": timeline,
+    }
+    return assignment, objective, report
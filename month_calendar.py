@@ -0,0 +1,85 @@
+# file: month_calendar.py
+
+import calendar
+from functools import lru_cache
+
+from rule_plan import DAY_TYPES, WEEKEND_DAY_TYPES
+
+# =================================================================================
+# KALENDER BULAN (TIPE HARI & INDEKS HARI YANG SUDAH DIHITUNG)
+# =================================================================================
+# Tipe hari (Weekday / Sabtu / Minggu, tanggal merah dihitung 'Minggu'), daftar hari
+# akhir pekan, H-1 tanggal merah, blok Sabtu–Minggu, dan jumlah hari libur dihitung
+# sekali per (tahun, bulan, tanggal merah) lalu di-cache. Semua fungsi apply_* mengambil
+# himpunan hari dari sini alih-alih memindai day_types di dalam loop karyawan × hari.
+
+
+class MonthCalendar:
+    """Indeks hari (0-based) untuk satu bulan. Semua koleksi berupa tuple (tidak diubah)."""
+
+    def __init__(self, year, month, holiday_days):
+        self.year = year
+        self.month = month
+        _, self.num_days = calendar.monthrange(year, month)
+        self.days = range(self.num_days)
+        # Tanggal merah di bulan ini sebagai indeks hari
+        self.holidays = tuple(sorted(holiday_days))
+
+        day_types = []
+        for d in self.days:
+            day_of_week = calendar.weekday(year, month, d + 1)
+            if d in holiday_days:
+                day_types.append('Minggu')
+            elif day_of_week == 5:
+                day_types.append('Sabtu')
+            elif day_of_week == 6:
+                day_types.append('Minggu')
+            else:
+                day_types.append('Weekday')
+        self.day_types = tuple(day_types)
+
+        self.days_by_type = {day_type: tuple(d for d in self.days if self.day_types[d] == day_type) for day_type in DAY_TYPES}
+        self.weekdays = self.days_by_type['Weekday']
+        self.weekend_days = tuple(d for d in self.days if self.day_types[d] in WEEKEND_DAY_TYPES)
+        self.is_weekend = tuple(day_type in WEEKEND_DAY_TYPES for day_type in self.day_types)
+        # H-1 tanggal merah (hari sebelum tanggal merah, jika masih di bulan ini)
+        self.holiday_eves = tuple(d - 1 for d in self.holidays if d > 0)
+        # Blok akhir pekan penuh: Sabtu diikuti Minggu
+        self.weekend_blocks = tuple((d, d + 1) for d in range(self.num_days - 1)
+                                    if self.day_types[d] == 'Sabtu' and self.day_types[d + 1] == 'Minggu')
+
+        self.num_weekends = len(self.weekend_days)
+        self.num_holidays = len(self.holidays)
+        # Batas bulanan per karyawan (hari kerja & jumlah Libur)
+        self.max_work_days = self.num_days - self.num_weekends + self.num_holidays
+        self.min_work_days = self.num_days - self.num_weekends
+        self.min_libur = self.num_weekends - self.num_holidays
+
+    def date_str(self, d):
+        return f"{self.year}-{self.month:02d}-{d + 1:02d}"
+
+
+@lru_cache(maxsize=64)
+def _calendar_cached(year, month, holiday_days):
+    return MonthCalendar(year, month, holiday_days)
+
+
+def get_month_calendar(year, month, public_holidays=()):
+    """
+    MonthCalendar untuk (tahun, bulan, tanggal merah). public_holidays berisi string
+    'YYYY-MM-DD' (boleh mencakup bulan lain); hasilnya di-cache sehingga tiap run simulasi
+    dan setiap fungsi aturan memakai objek yang sama.
+    """
+    month_prefix = f"{year}-{month:02d}-"
+    _, num_days = calendar.monthrange(year, month)
+    holiday_days = set()
+    for date_str in public_holidays or ():
+        if not date_str.startswith(month_prefix):
+            continue
+        try:
+            day_num = int(date_str[len(month_prefix):])
+        except ValueError:
+            continue
+        if 1 <= day_num <= num_days:
+            holiday_days.add(day_num - 1)
+    return _calendar_cached(year, month, frozenset(holiday_days))
@@ -0,0 +1,143 @@
+# file: result_codec.py
+
+import base64
+
+# =================================================================================
+# ENCODING HASIL JADWAL (VERBOSE <-> COMPACT)
+# =================================================================================
+# Format verbose (dipakai frontend sejak awal):
+#   [{"simulation_run": 1, "result": {"schedule": {nip: [shift, ...]}, "summary": {hari: {shift: jumlah}}}}]
+#
+# Format compact (disimpan di backend Redis & bisa diminta oleh client):
+#   {"encoding": "compact", "version": 1, "shifts": [...], "runs": [
+#       {"simulation_run": 1, "nips": [...], "num_days": 30, "matrix": "<base64 uint8 karyawan x hari>"}]}
+#
+# Setiap sel matrix berisi indeks shift pada kamus "shifts". Summary harian tidak
+# ikut dikirim karena bisa diturunkan dari matrix (lihat summarize_matrix / dense_summary).
+
+COMPACT_ENCODING = "compact"
+COMPACT_VERSION = 1
+COMPACT_MIMETYPE = "application/vnd.jadwal.compact+json"
+
+
+def is_compact(payload):
+    """Mengecek apakah payload hasil task sudah dalam format compact."""
+    return isinstance(payload, dict) and payload.get("encoding") == COMPACT_ENCODING
+
+
+def _encode_matrix(rows):
+    return base64.b64encode(bytes(cell for row in rows for cell in row)).decode("ascii")
+
+
+def _decode_matrix(encoded, num_employees, num_days):
+    raw = base64.b64decode(encoded)
+    if len(raw) != num_employees * num_days:
+        raise ValueError("Ukuran matrix tidak sesuai dengan jumlah karyawan x hari.")
+    return [list(raw[e * num_days:(e + 1) * num_days]) for e in range(num_employees)]
+
+
+def _as_shift_list(daily_schedule):
+    if isinstance(daily_schedule, dict):
+        return [daily_schedule[day] for day in sorted(daily_schedule, key=int)]
+    return list(daily_schedule)
+
+
+def encode_runs(runs):
+    """Mengubah list hasil simulasi (format verbose) menjadi payload compact."""
+    if is_compact(runs):
+        return runs
+
+    shift_names = []
+    shift_index = {}
+    encoded_runs = []
+    for run in runs or []:
+        result = run.get("result", {})
+        schedule = result.get("schedule", {})
+        nips = list(schedule.keys())
+        # Format lama menyimpan jadwal per karyawan sebagai {hari: shift}
+        shift_lists = [_as_shift_list(schedule[nip]) for nip in nips]
+        num_days = len(shift_lists[0]) if shift_lists else 0
+
+        rows = []
+        for shift_list in shift_lists:
+            row = []
+            for shift_name in shift_list:
+                if shift_name not in shift_index:
+                    if len(shift_names) >= 256:
+                        raise ValueError("Jumlah jenis shift melebihi kapasitas uint8.")
+                    shift_index[shift_name] = len(shift_names)
+                    shift_names.append(shift_name)
+                row.append(shift_index[shift_name])
+            rows.append(row)
+
+        encoded_run = {key: value for key, value in run.items() if key != "result"}
+        # Metadata tambahan pada hasil (selain schedule & summary) tetap dibawa apa adanya
+        encoded_run.update({key: value for key, value in result.items() if key not in ("schedule", "summary")})
+        encoded_run.update({"nips": nips, "num_days": num_days, "matrix": _encode_matrix(rows)})
+        encoded_runs.append(encoded_run)
+
+    return {
+        "encoding": COMPACT_ENCODING,
+        "version": COMPACT_VERSION,
+        "shifts": shift_names,
+        "runs": encoded_runs,
+    }
+
+
+def decode_matrix(run):
+    """Mengembalikan matrix (list of list indeks shift) untuk satu run compact."""
+    return _decode_matrix(run["matrix"], len(run["nips"]), run["num_days"])
+
+
+def summarize_matrix(matrix, shift_names):
+    """Menurunkan summary harian {hari: {shift: jumlah}} dari matrix karyawan x hari."""
+    num_days = len(matrix[0]) if matrix else 0
+    summary = {}
+    for d in range(num_days):
+        counts = [0] * len(shift_names)
+        for row in matrix:
+            counts[row[d]] += 1
+        summary[str(d + 1)] = {shift_names[s]: c for s, c in enumerate(counts) if c}
+    return summary
+
+
+def dense_summary(payload):
+    """Summary harian sebagai array padat [run][hari][indeks shift] untuk payload compact."""
+    shift_names = payload["shifts"]
+    summaries = []
+    for run in payload["runs"]:
+        matrix = decode_matrix(run)
+        per_day = []
+        for d in range(run["num_days"]):
+            counts = [0] * len(shift_names)
+            for row in matrix:
+                counts[row[d]] += 1
+            per_day.append(counts)
+        summaries.append(per_day)
+    return summaries
+
+
+def decode_runs(payload):
+    """Mengubah payload compact kembali ke format verbose (list hasil simulasi)."""
+    if not is_compact(payload):
+        return payload or []
+
+    shift_names = payload["shifts"]
+    decoded = []
+    for run in payload["runs"]:
+        matrix = decode_matrix(run)
+        schedule = {nip: [shift_names[s] for s in row] for nip, row in zip(run["nips"], matrix)}
+        result = {key: value for key, value in run.items()
+                  if key not in ("simulation_run", "nips", "num_days", "matrix")}
+        result.update({"schedule": schedule, "summary": summarize_matrix(matrix, shift_names)})
+        decoded.append({"simulation_run": run.get("simulation_run"), "result": result})
+    return decoded
+
+
+def count_runs(payload):
+    """Jumlah jadwal valid di dalam payload (compact maupun verbose)."""
+    if is_compact(payload):
+        return len(payload["runs"])
+    if isinstance(payload, list):
+        return len(payload)
+    return 0
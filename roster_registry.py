@@ -0,0 +1,51 @@
+# file: roster_registry.py
+
+import json
+import time
+
+from rule_plan import normalize_roster
+from task_events import get_redis
+
+# =================================================================================
+# REGISTRY ROSTER (ROSTER DINAMIS TANPA REDEPLOY)
+# =================================================================================
+# Roster aktif (NIP, grup, kode, larangan shift individual) disimpan di Redis lewat
+# PUT /roster, sehingga menambah / mengurangi karyawan tidak perlu mengubah
+# rules_config.json. Urutan prioritas saat tugas dibuat: 'roster' di payload, roster
+# di registry, lalu roster default di konfigurasi. API mengirim roster yang dipakai
+# ke worker bersama argumen tugas, jadi perubahan registry tidak memengaruhi tugas
+# yang sudah berjalan.
+
+ROSTER_KEY = 'jadwal:roster'
+
+
+def save_roster(roster):
+    """Validasi lalu simpan roster sebagai roster aktif. Mengembalikan entri registry {version, updated_at, roster}."""
+    normalized = normalize_roster(roster)
+    client = get_redis()
+    current = get_roster()
+    entry = {"version": (current["version"] + 1) if current else 1, "updated_at": time.time(), "roster": normalized}
+    client.set(ROSTER_KEY, json.dumps(entry))
+    return entry
+
+
+def get_roster():
+    """Entri registry {version, updated_at, roster} atau None jika belum pernah diisi."""
+    raw = get_redis().get(ROSTER_KEY)
+    return json.loads(raw) if raw else None
+
+
+def clear_roster():
+    """Menghapus roster registry (kembali ke roster default konfigurasi)."""
+    get_redis().delete(ROSTER_KEY)
+
+
+def resolve_roster(payload_roster=None):
+    """
+    Roster untuk satu tugas: roster payload (divalidasi), roster registry, atau None
+    (roster default konfigurasi). Melempar ValueError jika roster payload tidak valid.
+    """
+    if payload_roster is not None:
+        return normalize_roster(payload_roster)
+    current = get_roster()
+    return current["roster"] if current else None
@@ -0,0 +1,403 @@
+# file: rule_plan.py
+
+import json
+import os
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+from itertools import combinations_with_replacement
+
+# =================================================================================
+# KONFIGURASI ATURAN & ROSTER (DEKLARATIF)
+# =================================================================================
+# Roster, larangan shift per grup / per karyawan, batas hari kerja akhir pekan & shift malam
+# per grup, preferensi jumlah shift, dan tabel komposisi tim harian per site (lihat
+# expand_composition) dibaca
+# dari rules_config.json, divalidasi sekali saat worker start, lalu dikompilasi menjadi
+# RulePlan yang sudah ter-indeks (per grup, per karyawan, per tipe hari) sehingga
+# fungsi apply_* tidak perlu lagi mencari ulang daftar & map di setiap pemanggilan.
+#
+# Roster di file konfigurasi hanya default: roster dinamis (payload API atau registry,
+# lihat roster_registry.py) berupa list {nip, group, code?, banned_shifts?} dan
+# menggantikan bagian 'roster' konfigurasi saat plan dikompilasi (lihat compile_rule_plan).
+
+RULES_CONFIG_PATH = os.environ.get(
+    'RULES_CONFIG_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rules_config.json'))
+
+DAY_TYPES = ('Weekday', 'Sabtu', 'Minggu')
+WEEKEND_DAY_TYPES = ('Sabtu', 'Minggu')
+# Kolom komposisi untuk Libur + Cuti
+OFF_COLUMN = 'off'
+
+
+class RuleConfigError(ValueError):
+    """File konfigurasi aturan tidak valid."""
+
+
+def _require(condition, message):
+    if not condition:
+        raise RuleConfigError(message)
+
+
+def validate_rule_config(config):
+    """Memeriksa struktur & referensi silang konfigurasi. Melempar RuleConfigError jika tidak valid."""
+    _require(isinstance(config, dict), "Konfigurasi aturan harus berupa object JSON")
+    for key in ('shifts', 'groups', 'roster'):
+        _require(key in config, f"Konfigurasi aturan tidak memiliki bagian '{key}'")
+
+    shifts = config['shifts']
+    assignable = shifts.get('assignable') or []
+    off = shifts.get('off') or []
+    _require(assignable, "shifts.assignable tidak boleh kosong")
+    _require('Libur' in off and 'Cuti' in off, "shifts.off harus memuat 'Libur' dan 'Cuti'")
+    all_shifts = list(assignable) + list(off)
+    _require(len(set(all_shifts)) == len(all_shifts), "Nama shift tidak boleh duplikat")
+    for s in shifts.get('night', []):
+        _require(s in assignable, f"Shift malam '{s}' tidak ada di shifts.assignable")
+
+    groups = config['groups']
+    for group, spec in groups.items():
+        _require(spec.get('gender') in ('F', 'M'), f"Grup '{group}': gender harus 'F' atau 'M'")
+        _require(spec.get('site'), f"Grup '{group}': site wajib diisi")
+        for s in spec.get('forbidden_shifts', []):
+            _require(s in all_shifts, f"Grup '{group}': shift terlarang '{s}' tidak dikenal")
+        weekend_work = spec.get('weekend_work')
+        if weekend_work is not None:
+            low, high = weekend_work.get('preferred', (weekend_work.get('min', 0), weekend_work.get('max', 0)))
+            _require(0 <= weekend_work.get('min', 0) <= low <= high <= weekend_work.get('max', 0),
+                     f"Grup '{group}': weekend_work harus memenuhi 0 <= min <= preferred <= max")
+        night_shifts = spec.get('night_shifts')
+        if night_shifts is not None:
+            _require(shifts.get('night'), f"Grup '{group}': night_shifts butuh shifts.night")
+            _require(night_shifts.get('daily_minimum', 0) >= 0, f"Grup '{group}': night_shifts.daily_minimum tidak valid")
+            monthly = night_shifts.get('monthly')
+            _require(monthly is None or 0 <= monthly[0] <= monthly[1], f"Grup '{group}': night_shifts.monthly tidak valid")
+
+    codes, nips = set(), set()
+    for entry in config['roster']:
+        code, nip, group = entry.get('code'), str(entry.get('nip', '')), entry.get('group')
+        _require(code and nip, f"Entri roster tidak lengkap: {entry}")
+        _require(code not in codes, f"Kode karyawan '{code}' duplikat")
+        _require(nip not in nips, f"NIP '{nip}' duplikat")
+        _require(group in groups, f"Karyawan '{code}': grup '{group}' tidak dikenal")
+        codes.add(code)
+        nips.add(nip)
+
+    for ban in config.get('employee_bans', []):
+        _require(ban.get('code') or ban.get('nip'), f"Larangan karyawan harus memiliki 'code' atau 'nip': {ban}")
+        for s in ban.get('shifts', []):
+            _require(s in all_shifts, f"Larangan karyawan {ban}: shift '{s}' tidak dikenal")
+
+    for pref in config.get('preferences', []):
+        _require(pref.get('shift') in all_shifts, f"Preferensi {pref}: shift tidak dikenal")
+        _require(pref.get('group') in groups, f"Preferensi {pref}: grup tidak dikenal")
+        _require(0 <= pref.get('min', 0) <= pref.get('max', 0), f"Preferensi {pref}: rentang min/max tidak valid")
+
+    sites = {spec['site'] for spec in groups.values()}
+    team_sizes = Counter(groups[entry['group']]['site'] for entry in config['roster'])
+    columns = set(all_shifts) | {OFF_COLUMN}
+    for spec in config.get('compositions', []):
+        _require(spec.get('site') in sites, f"Komposisi {spec}: site tidak dikenal")
+        _require(spec.get('day_types') and all(t in DAY_TYPES for t in spec['day_types']),
+                 f"Komposisi {spec}: day_types harus berisi {', '.join(DAY_TYPES)}")
+        _require(spec.get('allowed'), f"Komposisi {spec}: 'allowed' tidak boleh kosong")
+        for row in spec['allowed']:
+            _require(isinstance(row, dict) and all(name in columns and isinstance(n, int) and n >= 0 for name, n in row.items()),
+                     f"Komposisi {spec}: baris {row} harus berupa {{shift / '{OFF_COLUMN}': jumlah}}")
+        _require(all(name in columns for name in spec.get('fill', [])), f"Komposisi {spec}: kolom 'fill' tidak dikenal")
+        team_size = team_sizes.get(spec['site'], 0)
+        _require(team_size == 0 or expand_composition(spec, team_size)[1],
+                 f"Komposisi site {spec['site']} ({'/'.join(spec['day_types'])}) tidak punya baris untuk tim {team_size} orang")
+    _check_composition_capacity(config, team_sizes)
+    return config
+
+
+def _month_shapes():
+    """Jumlah hari per tipe hari untuk setiap bentuk bulan tanpa libur nasional (28-31 hari, mulai hari apa pun)."""
+    shapes = set()
+    for num_days in range(28, 32):
+        for first_weekday in range(7):
+            counts = Counter(DAY_TYPES[max(0, (first_weekday + d) % 7 - 4)] for d in range(num_days))
+            shapes.add((num_days,) + tuple(counts[t] for t in DAY_TYPES))
+    return sorted(shapes)
+
+
+def _check_composition_capacity(config, team_sizes):
+    """
+    Jumlah anggota yang wajib bekerja menurut komposisi (baris dengan 'off' terbanyak) selama
+    sebulan tidak boleh melebihi batas hari kerja tim: tanpa libur nasional setiap karyawan paling
+    banyak bekerja sebanyak hari Weekday (lihat MonthCalendar.max_work_days). Roster yang gagal di
+    salah satu bentuk bulan pasti INFEASIBLE untuk bulan itu, jadi ditolak sebelum solve.
+    """
+    off_names = set(config['shifts']['off']) | {OFF_COLUMN}
+    for site, team_size in team_sizes.items():
+        min_workers = {}
+        for spec in config.get('compositions', []):
+            if spec['site'] != site:
+                continue
+            columns, rows = expand_composition(spec, team_size)
+            workers = min(sum(n for name, n in zip(columns, row) if name not in off_names) for row in rows)
+            for day_type in spec['day_types']:
+                min_workers[day_type] = max(min_workers.get(day_type, 0), workers)
+        if not min_workers:
+            continue
+        for num_days, *counts in _month_shapes():
+            days = dict(zip(DAY_TYPES, counts))
+            needed = sum(days[t] * min_workers.get(t, 0) for t in DAY_TYPES)
+            capacity = team_size * days['Weekday']
+            _require(needed <= capacity,
+                     f"Komposisi site {site} butuh {needed} hari kerja pada bulan {num_days} hari dengan "
+                     f"{days['Weekday']} hari Weekday, melebihi batas {capacity} hari kerja tim {team_size} orang "
+                     f"(maksimal {days['Weekday']} hari kerja per orang)")
+
+
+def expand_composition(spec, team_size):
+    """
+    Tabel komposisi harian untuk tim berukuran team_size: (kolom, [tuple jumlah per kolom]).
+    Setiap baris 'allowed' berupa multiset {shift: jumlah}; sisa anggota tim dibagi ke kolom
+    'fill' dengan semua kemungkinan. Baris yang jumlahnya tidak sama dengan ukuran tim dibuang,
+    sehingga satu tabel bisa berlaku untuk beberapa ukuran tim.
+    """
+    fill = list(dict.fromkeys(spec.get('fill', [])))
+    names = {name for row in spec['allowed'] for name in row} | set(fill)
+    columns = sorted(names - {OFF_COLUMN}) + ([OFF_COLUMN] if OFF_COLUMN in names else [])
+    rows = set()
+    for row in spec['allowed']:
+        remaining = team_size - sum(row.values())
+        if remaining < 0 or (remaining and not fill):
+            continue
+        for extra in combinations_with_replacement(fill, remaining):
+            counts = Counter(row) + Counter(extra)
+            rows.add(tuple(counts.get(name, 0) for name in columns))
+    return columns, sorted(rows)
+
+
+def load_rule_config(path=None):
+    """Membaca & memvalidasi file konfigurasi aturan."""
+    path = path or RULES_CONFIG_PATH
+    try:
+        with open(path, encoding='utf-8') as f:
+            config = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise RuleConfigError(f"Gagal membaca konfigurasi aturan '{path}': {e}") from e
+    return validate_rule_config(config)
+
+
+@lru_cache(maxsize=None)
+def get_rule_config():
+    """Konfigurasi aturan aktif (dibaca sekali per proses)."""
+    return load_rule_config()
+
+
+def roster_employees_data(config=None):
+    """Daftar (kode, grup) karyawan sesuai urutan roster."""
+    config = config or get_rule_config()
+    return [(entry['code'], entry['group']) for entry in config['roster']]
+
+
+def code_to_nip_map(config=None):
+    config = config or get_rule_config()
+    return {entry['code']: str(entry['nip']) for entry in config['roster']}
+
+
+def normalize_roster(roster, config=None):
+    """
+    Validasi roster dinamis [{nip, group, code (opsional, default NIP), banned_shifts (opsional)}].
+    Gender & site mengikuti definisi grup di konfigurasi. Mengembalikan list entri yang sudah
+    dinormalisasi atau melempar RuleConfigError.
+    """
+    config = config or get_rule_config()
+    _require(isinstance(roster, list) and roster, "Roster harus berupa list karyawan yang tidak kosong")
+    all_shifts = set(config['shifts']['assignable']) | set(config['shifts']['off'])
+    normalized = []
+    for index, entry in enumerate(roster):
+        _require(isinstance(entry, dict), f"Roster #{index + 1} harus berupa objek {{nip, group}}")
+        nip, group = str(entry.get('nip') or ''), entry.get('group')
+        banned = entry.get('banned_shifts', [])
+        _require(nip, f"Roster #{index + 1}: 'nip' wajib diisi")
+        _require(group in config['groups'], f"Roster #{index + 1}: grup '{group}' tidak dikenal")
+        _require(isinstance(banned, list) and all(s in all_shifts for s in banned),
+                 f"Roster #{index + 1}: 'banned_shifts' harus berupa list nama shift yang dikenal")
+        normalized.append({"code": str(entry.get('code') or nip), "nip": nip, "group": group,
+                           "banned_shifts": list(dict.fromkeys(banned))})
+    # Duplikat kode / NIP diperiksa oleh validate_rule_config
+    validate_rule_config(roster_config(normalized, config))
+    return normalized
+
+
+def roster_config(roster, config=None):
+    """
+    Konfigurasi dengan bagian 'roster' diganti roster dinamis (hasil normalize_roster). Larangan
+    per karyawan di konfigurasi hanya berlaku untuk roster konfigurasi (kode seperti B31 bisa
+    dipakai orang lain di roster dinamis), jadi larangan roster dinamis hanya dari 'banned_shifts'.
+    """
+    config = config or get_rule_config()
+    bans = [{"code": entry['code'], "shifts": entry['banned_shifts']} for entry in roster if entry.get('banned_shifts')]
+    return dict(config, roster=[{"code": entry['code'], "nip": entry['nip'], "group": entry['group']} for entry in roster],
+                employee_bans=bans)
+
+
+def forbidden_shifts_by_group(config=None):
+    config = config or get_rule_config()
+    return {group: list(spec['forbidden_shifts'])
+            for group, spec in config['groups'].items() if spec.get('forbidden_shifts')}
+
+
+class RulePlan:
+    """Hasil kompilasi konfigurasi aturan untuk satu roster (semua daftar sudah dalam bentuk indeks)."""
+
+    def __init__(self, config, employees_data):
+        shifts_config = config['shifts']
+        self.employees_data = list(employees_data)
+        self.employees = [e[0] for e in self.employees_data]
+        self.employee_map = {name: i for i, name in enumerate(self.employees)}
+
+        self.assignable_roles = list(shifts_config['assignable'])
+        self.count_as_work_roles = self.assignable_roles + ['Cuti']
+        self.all_shifts = self.assignable_roles + list(shifts_config['off'])
+        self.shift_map = {name: i for i, name in enumerate(self.all_shifts)}
+        self.night_shifts = list(shifts_config.get('night', []))
+        self.night_indices = [self.shift_map[s] for s in self.night_shifts]
+        self.work_indices = [self.shift_map[s] for s in self.count_as_work_roles]
+        self.work_shift_indices = [idx for name, idx in self.shift_map.items() if name not in ['Libur', 'Cuti']]
+        self.libur_idx = self.shift_map['Libur']
+        self.cuti_idx = self.shift_map['Cuti']
+
+        # --- Identitas karyawan ---
+        self.code_to_nip = code_to_nip_map(config)
+        self.nip_to_code = {v: k for k, v in self.code_to_nip.items()}
+
+        # --- Indeks per grup / site / gender ---
+        groups = config['groups']
+        self.group_indices = {group: [] for group in groups}
+        self.site_indices = {}
+        self.employee_groups = []
+        for e_idx, (_, group) in enumerate(self.employees_data):
+            self.group_indices.setdefault(group, []).append(e_idx)
+            self.site_indices.setdefault(groups.get(group, {}).get('site'), []).append(e_idx)
+            self.employee_groups.append(group)
+        self.female_employees = [e for e, g in self.employees_data if groups.get(g, {}).get('gender') == 'F']
+        self.male_employees = [e for e, g in self.employees_data if groups.get(g, {}).get('gender') == 'M']
+
+        # --- Batas per grup: hari kerja akhir pekan {grup: (min, max)} (wajib) & rentang preferensinya
+        # (skor), minimal anggota grup di shift malam per hari, rentang shift malam per bulan ---
+        self.weekend_work_limits, self.weekend_work_preferred = {}, {}
+        self.daily_night_minimum, self.monthly_night_limits = {}, {}
+        for group, spec in groups.items():
+            weekend_work = spec.get('weekend_work')
+            if weekend_work is not None:
+                self.weekend_work_limits[group] = (weekend_work.get('min', 0), weekend_work.get('max', 0))
+                self.weekend_work_preferred[group] = tuple(weekend_work.get('preferred', self.weekend_work_limits[group]))
+            night_shifts = spec.get('night_shifts') or {}
+            if night_shifts.get('daily_minimum'):
+                self.daily_night_minimum[group] = night_shifts['daily_minimum']
+            if night_shifts.get('monthly'):
+                self.monthly_night_limits[group] = tuple(night_shifts['monthly'])
+
+        # --- Larangan shift: per grup, per karyawan, dan gabungannya ---
+        self.forbidden_by_group = {
+            group: [self.shift_map[s] for s in spec.get('forbidden_shifts', [])]
+            for group, spec in groups.items()
+        }
+        self.individual_bans = {}
+        for ban in config.get('employee_bans', []):
+            code = ban.get('code') or self.nip_to_code.get(str(ban.get('nip')))
+            e_idx = self.employee_map.get(code)
+            if e_idx is None:
+                continue  # Karyawan tidak ada di roster bulan ini
+            banned = self.individual_bans.setdefault(e_idx, [])
+            banned.extend(self.shift_map[s] for s in ban['shifts'] if self.shift_map[s] not in banned)
+        self.forbidden_by_employee = {}
+        for e_idx, group in enumerate(self.employee_groups):
+            combined = list(self.individual_bans.get(e_idx, []))
+            combined += [s for s in self.forbidden_by_group.get(group, []) if s not in combined]
+            if combined:
+                self.forbidden_by_employee[e_idx] = combined
+
+        # --- Preferensi jumlah shift per karyawan: (nama_shift, s_idx, [e_idx], min, max, bobot) ---
+        self.preferences = [
+            (p['shift'], self.shift_map[p['shift']], self.group_indices.get(p['group'], []),
+             p['min'], p['max'], p.get('weight', 10))
+            for p in config.get('preferences', [])
+        ]
+
+        # --- Komposisi tim harian per site: (site, [e_idx], tipe_hari, [(kolom, [s_idx])], [baris]) ---
+        self.compositions = []
+        for spec in config.get('compositions', []):
+            site_indices = self.site_indices.get(spec['site'], [])
+            if not site_indices:
+                continue
+            columns, rows = expand_composition(spec, len(site_indices))
+            column_shifts = [(name, [self.libur_idx, self.cuti_idx] if name == OFF_COLUMN else [self.shift_map[name]])
+                             for name in columns]
+            self.compositions.append((spec['site'], site_indices, tuple(spec['day_types']), column_shifts, rows))
+
+    def compile_demand(self, demand):
+        """
+        Kebutuhan harian per tipe hari: {tipe_hari: [(s_idx, min, max), ...]}.
+        Format demand sama dengan payload API ([min, max], angka tunggal, atau 0).
+        """
+        compiled = {day_type: [] for day_type in DAY_TYPES}
+        for role_name, requirements in demand.items():
+            if role_name not in self.shift_map:
+                continue
+            s_idx = self.shift_map[role_name]
+            for day_type in DAY_TYPES:
+                required_count = requirements.get(day_type, 0)
+                if isinstance(required_count, (list, tuple)) and len(required_count) == 2:
+                    bounds = tuple(required_count)
+                elif isinstance(required_count, int) and required_count > 0:
+                    bounds = (required_count, required_count)
+                else:  # Termasuk jika 0 atau format tidak dikenali
+                    bounds = (0, 0)
+                compiled[day_type].append((s_idx, bounds[0], bounds[1]))
+        return compiled
+
+
+@lru_cache(maxsize=32)
+def _compile_cached(employees_key):
+    return RulePlan(get_rule_config(), employees_key)
+
+
+@lru_cache(maxsize=32)
+def _compile_roster_cached(roster_key):
+    config = roster_config(json.loads(roster_key))
+    return RulePlan(config, roster_employees_data(config))
+
+
+def compile_rule_plan(employees_data=None, config=None):
+    """
+    Mengompilasi konfigurasi menjadi RulePlan. employees_data berupa list (kode, grup) dari
+    roster konfigurasi atau roster dinamis (list entri hasil normalize_roster). Dengan
+    konfigurasi default, hasilnya di-cache per roster sehingga tiap run simulasi memakai
+    plan yang sama.
+    """
+    if employees_data and isinstance(employees_data[0], dict):
+        if config is not None:
+            config = roster_config(employees_data, config)
+            return RulePlan(config, roster_employees_data(config))
+        return _compile_roster_cached(json.dumps(employees_data, sort_keys=True))
+    if employees_data is None:
+        employees_data = roster_employees_data(config)
+    if config is not None:
+        return RulePlan(config, employees_data)
+    return _compile_cached(tuple(tuple(e) for e in employees_data))
+
+
+def parse_pre_assignments(plan, pre_assignment_requests, target_year, target_month):
+    """Request {nip, jenis, tanggal} -> {(e_idx, hari): shift} untuk bulan target."""
+    pre_assignments = {}
+    for req in pre_assignment_requests:
+        real_nip, jenis, tanggal_str = str(req.get('nip')), req.get('jenis'), req.get('tanggal')
+        if not (real_nip and jenis and tanggal_str): continue
+        try:
+            internal_code = plan.nip_to_code.get(real_nip)
+            if internal_code:
+                e_idx = plan.employee_map.get(internal_code)
+                parsed_date = datetime.strptime(tanggal_str, '%Y-%m-%d')
+                if parsed_date.year == target_year and parsed_date.month == target_month and e_idx is not None:
+                    day_idx = parsed_date.day - 1
+                    pre_assignments[(e_idx, day_idx)] = jenis
+        except (ValueError, TypeError):
+            continue
+    return pre_assignments
@@ -0,0 +1,187 @@
+# file: schedule_edits.py
+
+import json
+import threading
+from collections import OrderedDict
+
+import redis
+
+import fairness_ledger
+from schedule_validator import schedule_evaluator
+from task_events import get_redis
+
+# =================================================================================
+# EDIT MANUAL JADWAL HASIL SOLVER (EVALUASI INKREMENTAL)
+# =================================================================================
+# Planner bisa mengubah sel jadwal (mis. menukar shift dua orang pada satu hari) tanpa
+# menjalankan ulang solver. Input solve (request, bulan, tanggal merah, demand) disimpan
+# saat tugas dibuat; jadwal hasil editan disimpan per (task, run) dengan nomor versi.
+# Proses API menyimpan ScheduleEvaluator terakhir di memori, sehingga setiap edit hanya
+# menghitung ulang baris karyawan dan kolom hari yang berubah (lihat
+# ScheduleEvaluator.apply_changes). Jika versi di Redis berbeda (edit dari proses lain),
+# evaluator dibangun ulang dari jadwal tersimpan.
+
+CONTEXT_PREFIX = 'jadwal:edit-context:'
+SESSION_PREFIX = 'jadwal:edit-session:'
+EDIT_TTL_SECONDS = 7 * 24 * 60 * 60
+MAX_CHANGES_PER_EDIT = 50
+MAX_CACHED_EVALUATORS = 32
+
+_evaluators = OrderedDict()
+# Edit di satu proses dijalankan bergantian (evaluasi inkremental hanya ~1 ms)
+_edit_lock = threading.Lock()
+
+
+class ScheduleNotFoundError(LookupError):
+    """Jadwal / input solve untuk task & run tersebut tidak ditemukan."""
+
+
+class EditConflictError(RuntimeError):
+    """Jadwal diubah oleh request lain di tengah proses edit."""
+
+
+def save_context(task_id, solver_args, roster=None, fairness_offsets=None):
+    """
+    Menyimpan input solve (requests, year, month, public_holidays, demand), roster dinamis
+    (None = roster konfigurasi) dan offset ledger keadilan yang dipakai solver agar hasilnya
+    bisa diedit dengan objective yang sama.
+    """
+    try:
+        get_redis().set(CONTEXT_PREFIX + task_id, json.dumps(list(solver_args) + [roster, fairness_offsets]), ex=EDIT_TTL_SECONDS)
+    except redis.RedisError as e:
+        # Edit manual hanya pelengkap; kegagalan menyimpan tidak boleh menggagalkan pembuatan tugas
+        print(f"Warning: Gagal menyimpan input solve untuk task {task_id}: {e}")
+
+
+def _load_context(task_id):
+    raw = get_redis().get(CONTEXT_PREFIX + task_id)
+    if not raw:
+        raise ScheduleNotFoundError("Input solve untuk tugas ini tidak ditemukan (kedaluwarsa atau bukan tugas jadwal).")
+    context = json.loads(raw)
+    # Konteks lama belum menyimpan roster (roster konfigurasi) dan/atau offset keadilan
+    return context + [None] * (7 - len(context))
+
+
+def _session_key(task_id, run):
+    return f"{SESSION_PREFIX}{task_id}:{run}"
+
+
+def _evaluator_for(task_id, run, session):
+    """Evaluator dari cache proses jika versinya sama dengan sesi di Redis; selain itu dibangun ulang."""
+    cached = _evaluators.get((task_id, run))
+    if cached and cached[0] == session["version"]:
+        _evaluators.move_to_end((task_id, run))
+        return cached[1]
+    requests_data, year, month, public_holidays, demand, roster, fairness_offsets = _load_context(task_id)
+    evaluator = schedule_evaluator(session["schedule"], year, month, public_holidays, demand, requests_data, roster,
+                                   fairness_offsets)
+    _remember(task_id, run, session["version"], evaluator)
+    return evaluator
+
+
+def _remember(task_id, run, version, evaluator):
+    _evaluators[(task_id, run)] = (version, evaluator)
+    _evaluators.move_to_end((task_id, run))
+    while len(_evaluators) > MAX_CACHED_EVALUATORS:
+        _evaluators.popitem(last=False)
+
+
+def _initial_session(task_id, run, load_runs):
+    """Sesi versi 0 dari hasil solver (list run format verbose)."""
+    for entry in load_runs() or []:
+        if entry.get("simulation_run") == run:
+            return {"version": 0, "schedule": entry["result"]["schedule"]}
+    raise ScheduleNotFoundError(f"Run #{run} tidak ditemukan pada hasil tugas ini.")
+
+
+def _load_session(client, task_id, run, load_runs):
+    raw = client.get(_session_key(task_id, run))
+    return json.loads(raw) if raw else _initial_session(task_id, run, load_runs)
+
+
+def _parse_changes(evaluator, changes):
+    """[{nip, day, shift}] -> [(e_idx, hari, s_idx)]. Melempar ValueError jika tidak valid."""
+    if not isinstance(changes, list) or not changes:
+        raise ValueError("Parameter 'changes' harus berupa list perubahan {nip, day, shift} yang tidak kosong")
+    if len(changes) > MAX_CHANGES_PER_EDIT:
+        raise ValueError(f"Maksimal {MAX_CHANGES_PER_EDIT} perubahan per edit")
+    plan, num_days = evaluator.plan, evaluator.cal.num_days
+    cell_changes = []
+    for index, change in enumerate(changes):
+        if not isinstance(change, dict):
+            raise ValueError(f"Perubahan #{index + 1} harus berupa objek {{nip, day, shift}}")
+        code = plan.nip_to_code.get(str(change.get('nip')))
+        e_idx = plan.employee_map.get(code)
+        day = change.get('day')
+        shift_name = change.get('shift')
+        if e_idx is None:
+            raise ValueError(f"Perubahan #{index + 1}: NIP '{change.get('nip')}' tidak ada di roster")
+        if not isinstance(day, int) or isinstance(day, bool) or not 1 <= day <= num_days:
+            raise ValueError(f"Perubahan #{index + 1}: 'day' harus bilangan bulat 1-{num_days}")
+        if shift_name not in plan.shift_map:
+            raise ValueError(f"Perubahan #{index + 1}: shift '{shift_name}' tidak dikenal")
+        cell_changes.append((e_idx, day - 1, plan.shift_map[shift_name]))
+    return cell_changes
+
+
+def _schedule_of(evaluator):
+    plan, shift_names = evaluator.plan, evaluator.plan.all_shifts
+    return {plan.code_to_nip.get(code, code): [shift_names[s_idx] if s_idx >= 0 else None for s_idx in evaluator.matrix[e_idx]]
+            for e_idx, code in enumerate(plan.employees)}
+
+
+def apply_edit(task_id, run, changes, load_runs):
+    """
+    Menerapkan perubahan sel ke jadwal (task, run) lalu mengevaluasi ulang secara inkremental.
+    load_runs: fungsi tanpa argumen yang mengembalikan hasil solver (list run format verbose),
+    hanya dipanggil untuk edit pertama. Mengembalikan hasil ScheduleEvaluator.apply_changes
+    ditambah versi baru dan daftar perubahan (beserta shift sebelumnya).
+    """
+    client = get_redis()
+    key = _session_key(task_id, run)
+    with _edit_lock, client.pipeline() as pipe:
+        try:
+            pipe.watch(key)
+            session = _load_session(pipe, task_id, run, load_runs)
+            evaluator = _evaluator_for(task_id, run, session)
+            cell_changes = _parse_changes(evaluator, changes)
+            shift_names = evaluator.plan.all_shifts
+            applied = [{"nip": change.get('nip'), "day": d + 1, "shift": shift_names[s_idx],
+                        "previous": shift_names[evaluator.matrix[e_idx, d]] if evaluator.matrix[e_idx, d] >= 0 else None}
+                       for change, (e_idx, d, s_idx) in zip(changes, cell_changes)]
+            result = evaluator.apply_changes(cell_changes)
+            version = session["version"] + 1
+            pipe.multi()
+            pipe.set(key, json.dumps({"version": version, "schedule": _schedule_of(evaluator)}), ex=EDIT_TTL_SECONDS)
+            pipe.execute()
+        except redis.WatchError:
+            _evaluators.pop((task_id, run), None)
+            raise EditConflictError("Jadwal sedang diubah oleh request lain, silakan ulangi.")
+        except Exception:
+            # Evaluator di memori mungkin sudah berubah tanpa tersimpan
+            _evaluators.pop((task_id, run), None)
+            raise
+    _remember(task_id, run, version, evaluator)
+    return dict(result, version=version, changes=applied)
+
+
+def get_edited_schedule(task_id, run, load_runs):
+    """Jadwal (task, run) terkini beserta versi edit dan ringkasan validasinya."""
+    session = _load_session(get_redis(), task_id, run, load_runs)
+    evaluator = _evaluator_for(task_id, run, session)
+    report = evaluator.report(with_details=False)
+    return {"version": session["version"], "schedule": _schedule_of(evaluator), **report}
+
+
+def accept_schedule(task_id, run, load_runs):
+    """
+    Menandai jadwal (task, run) terkini (termasuk hasil edit) sebagai jadwal yang dipakai:
+    total bulanannya dicatat ke ledger keadilan sehingga solve bulan berikutnya
+    menyeimbangkan beban kumulatif. Menerima ulang bulan yang sama menimpa catatan sebelumnya.
+    """
+    session = _load_session(get_redis(), task_id, run, load_runs)
+    evaluator = _evaluator_for(task_id, run, session)
+    _, year, month, _, _, _, _ = _load_context(task_id)
+    totals = fairness_ledger.record_schedule(year, month, _schedule_of(evaluator), evaluator.plan, evaluator.cal)
+    return {"version": session["version"], "year": year, "month": month,
+            "feasible": evaluator.report(with_details=False)["feasible"], "ledger": totals}
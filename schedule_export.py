@@ -0,0 +1,107 @@
+# file: schedule_export.py
+
+import csv
+import io
+import tempfile
+
+from result_codec import decode_matrix, encode_runs
+
+# =================================================================================
+# EKSPOR JADWAL KE EXCEL / CSV
+# =================================================================================
+# Ekspor dibaca langsung dari payload compact (kamus shift + matrix), baris demi baris,
+# tanpa pandas. Excel ditulis dengan openpyxl mode write-only (satu sheet per run),
+# CSV di-stream per baris.
+
+EXPORT_CHUNK_SIZE = 64 * 1024
+SUMMARY_TITLE = 'Ringkasan Harian'
+
+
+def iter_export_runs(payload, label=None):
+    """Menghasilkan (judul, nama_shift, run compact) untuk setiap run di payload (biasa maupun batch)."""
+    if isinstance(payload, dict) and payload.get('type') == 'batch':
+        for scenario in payload.get('scenarios', []):
+            if scenario.get('result') is not None:
+                yield from iter_export_runs(scenario['result'], label=scenario.get('label'))
+        return
+
+    compact = encode_runs(payload)
+    for run in compact['runs']:
+        title = f"Jadwal Run {run.get('simulation_run', 1)}"
+        if label:
+            title = f"{label} - {title}"
+        yield title, compact['shifts'], run
+
+
+def iter_schedule_rows(shift_names, run):
+    """Baris tabel jadwal: header hari, satu baris per NIP, lalu ringkasan harian per shift."""
+    num_days = run['num_days']
+    matrix = decode_matrix(run)
+    yield ['NIP'] + [d + 1 for d in range(num_days)]
+    counts = [[0] * num_days for _ in shift_names]
+    for nip, row in zip(run['nips'], matrix):
+        for d, s_idx in enumerate(row):
+            counts[s_idx][d] += 1
+        yield [nip] + [shift_names[s_idx] for s_idx in row]
+
+    yield []
+    yield [SUMMARY_TITLE]
+    for s_idx, shift_name in enumerate(shift_names):
+        yield [shift_name] + counts[s_idx]
+
+
+def _sheet_title(title, used_titles):
+    # Nama sheet Excel maksimal 31 karakter, tanpa karakter khusus, dan harus unik
+    cleaned = ''.join('-' if ch in '[]:*?/\\' else ch for ch in title)[:31]
+    candidate, n = cleaned, 2
+    while candidate in used_titles:
+        suffix = f" ({n})"
+        candidate, n = cleaned[:31 - len(suffix)] + suffix, n + 1
+    used_titles.add(candidate)
+    return candidate
+
+
+def write_xlsx(payload, fileobj):
+    """Menulis semua run ke workbook Excel (satu sheet per run) pada fileobj."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    used_titles = set()
+    for title, shift_names, run in iter_export_runs(payload):
+        sheet = workbook.create_sheet(title=_sheet_title(title, used_titles))
+        for row in iter_schedule_rows(shift_names, run):
+            sheet.append(row)
+    if not used_titles:
+        workbook.create_sheet(title='Jadwal')
+    workbook.save(fileobj)
+
+
+def iter_xlsx_chunks(payload):
+    """Stream file Excel per potongan byte (workbook ditulis ke file sementara, bukan ke memori)."""
+    with tempfile.TemporaryFile() as tmp:
+        write_xlsx(payload, tmp)
+        tmp.seek(0)
+        while True:
+            chunk = tmp.read(EXPORT_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+def iter_csv_lines(payload):
+    """Stream CSV baris demi baris. Setiap run diawali baris judul dan diakhiri baris kosong."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def render(row):
+        writer.writerow(row)
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return line
+
+    for title, shift_names, run in iter_export_runs(payload):
+        yield render([title])
+        for row in iter_schedule_rows(shift_names, run):
+            yield render(row)
+        yield render([])
@@ -0,0 +1,466 @@
+# file: schedule_validator.py
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from month_calendar import get_month_calendar
+from rule_plan import compile_rule_plan, parse_pre_assignments, roster_employees_data
+
+# =================================================================================
+# VALIDATOR & PENILAI JADWAL (TANPA CP-SAT)
+# =================================================================================
+# Mengevaluasi jadwal yang sudah ada (hasil upload, editan manual, atau resp.json)
+# langsung pada matrix karyawan × hari (indeks shift) dengan NumPy: setiap aturan wajib
+# di solver_2 diperiksa dan setiap suku objective apply_soft_constraints dihitung dalam
+# hitungan milidetik. Skor sama dengan objective CP-SAT untuk jadwal yang sama, sehingga
+# bisa dipakai sebagai fitness heuristik dan sebagai oracle regresi.
+#
+# Aturan dibagi dua cakupan: aturan per karyawan (satu baris: hitungan bulanan, jendela
+# 8 hari, shift malam & hari sesudahnya, pola SOCM) dan aturan per hari (satu kolom:
+# demand harian, cakupan malam MB, komposisi tim per site). Hasil & skor disimpan per baris /
+# per kolom, sehingga perubahan satu sel cukup menghitung ulang satu baris dan satu kolom
+# (lihat ScheduleEvaluator.apply_changes).
+#
+# Contoh: python schedule_validator.py resp.json --instance benchmarks/2025-09.json
+
+MISSING = -1
+
+
+def schedule_to_matrix(schedule, plan, num_days):
+    """
+    Jadwal {nip/kode: [shift, ...] atau {"1": shift, ...}} -> matrix int (karyawan × hari)
+    berurutan sesuai roster. Sel kosong / shift tak dikenal bernilai MISSING.
+    """
+    matrix = np.full((len(plan.employees), num_days), MISSING, dtype=np.int16)
+    for key, days in schedule.items():
+        code = plan.nip_to_code.get(str(key), key)
+        e_idx = plan.employee_map.get(code)
+        if e_idx is None:
+            continue
+        items = days.items() if isinstance(days, dict) else enumerate(days, start=1)
+        for day, shift_name in items:
+            d = int(day) - 1
+            if 0 <= d < num_days and shift_name in plan.shift_map:
+                matrix[e_idx, d] = plan.shift_map[shift_name]
+    return matrix
+
+
+def assignment_to_matrix(assignment):
+    """Assignment [e][d] -> s_idx (mis. dari ShiftTensor.assignment) -> matrix int."""
+    return np.array([[MISSING if s_idx is None else s_idx for s_idx in row] for row in assignment], dtype=np.int16)
+
+
+def _spread(totals):
+    return int(totals.max() - totals.min()) if len(totals) > 1 else 0
+
+
+class ScheduleEvaluator:
+    """
+    Pelanggaran & skor satu jadwal, disimpan per karyawan dan per hari.
+    pre_assignments: {(e_idx, hari): nama_shift}.
+    fairness_offsets: offset ledger keadilan {metric: [offset per e_idx]} seperti di apply_soft_constraints.
+    """
+
+    def __init__(self, matrix, plan, cal, daily_demand, pre_assignments=None, fairness_offsets=None):
+        self.plan, self.cal = plan, cal
+        self.matrix = np.array(matrix, dtype=np.int16)
+        self.pre_assignments = pre_assignments or {}
+        self.fairness_offsets = {metric: np.array(values) for metric, values in (fairness_offsets or {}).items()}
+        num_employees, num_days, num_shifts = len(plan.employees), cal.num_days, len(plan.all_shifts)
+        self.shift_range = np.arange(num_shifts)
+
+        groups = np.array(plan.employee_groups)
+        self.fb, self.mb = groups == 'FB', groups == 'MB'
+        self.male = np.isin(plan.employees, plan.male_employees)
+        self.female = np.isin(plan.employees, plan.female_employees)
+        self.groups = groups
+        self.weekend = np.array(cal.is_weekend, dtype=bool)
+        self.weekend_blocks = np.array(cal.weekend_blocks, dtype=np.int64).reshape(-1, 2)
+        # Batas hari kerja akhir pekan per karyawan dari grupnya (grup tanpa batas: tidak dibatasi /
+        # rentang kosong sehingga tidak pernah mendapat skor)
+        self.weekend_limits = np.array([plan.weekend_work_limits.get(g, (0, num_days)) for g in plan.employee_groups],
+                                       dtype=np.int32).reshape(-1, 2)
+        self.weekend_preferred = np.array([plan.weekend_work_preferred.get(g, (1, 0)) for g in plan.employee_groups],
+                                          dtype=np.int32).reshape(-1, 2)
+
+        self.requested = np.full((num_employees, num_days), MISSING, dtype=np.int16)
+        for (e_idx, d), shift_name in self.pre_assignments.items():
+            if shift_name in plan.shift_map:
+                self.requested[e_idx, d] = plan.shift_map[shift_name]
+        self.requested_cuti = self.requested == plan.cuti_idx
+        self.forbidden = np.zeros((num_employees, num_shifts), dtype=bool)
+        for e_idx, banned in plan.forbidden_by_employee.items():
+            self.forbidden[e_idx, banned] = True
+
+        # Batas demand per hari × shift (shift tanpa demand: tidak dibatasi)
+        self.demand_min = np.zeros((num_days, num_shifts), dtype=np.int32)
+        self.demand_max = np.full((num_days, num_shifts), num_employees, dtype=np.int32)
+        for d in cal.days:
+            for s_idx, min_req, max_req in daily_demand[cal.day_types[d]]:
+                self.demand_min[d, s_idx], self.demand_max[d, s_idx] = min_req, max_req
+
+        self.s_m_idx = plan.shift_map.get('M')
+        self.s_socm_idx = plan.shift_map.get('SOCM')
+        self.s_p9_idx = plan.shift_map.get('P9')
+        self.forbidden_p = [plan.shift_map[s] for s in ('P6', 'P7', 'P8', 'P9') if s in plan.shift_map]
+        self.jakarta = plan.site_indices.get('Jakarta', [])
+        self.s_p8_idx = plan.shift_map.get('P8')
+        # Komposisi tim harian: (site, [e_idx], mask hari, [(kolom, [s_idx])], {baris yang diizinkan})
+        self.compositions = [(site, site_indices, np.isin(cal.day_types, day_types), column_shifts, set(rows))
+                             for site, site_indices, day_types, column_shifts, rows in plan.compositions]
+
+        # Cache per karyawan / per hari: pelanggaran {aturan: [item]} dan suku skor
+        self.employee_violations = [{} for _ in range(num_employees)]
+        self.day_violations = [{} for _ in range(num_days)]
+        self.shift_totals = np.zeros((num_employees, num_shifts), dtype=np.int32)
+        self.weekend_work = np.zeros(num_employees, dtype=np.int32)
+        self.employee_score = {name: np.zeros(num_employees, dtype=np.int64)
+                               for name in ('preferences', 'weekend_work_in_range', 'weekend_libur')}
+        self.streaks = {length: np.zeros(num_employees, dtype=np.int32) for length in (6, 7)}
+        self.weekend_break_misses = np.zeros(num_employees, dtype=np.int32)
+        self.day_score = {'jakarta_weekend_pattern': np.zeros(num_days, dtype=np.int64)}
+
+        self._evaluate_employees(np.arange(num_employees))
+        self._evaluate_days(np.arange(num_days))
+
+    # --- Pencatatan pelanggaran ---
+
+    def _found(self, rule, cells, detail=None):
+        """cells: (e_idx atau None, hari atau None); detail: str atau fungsi(e_idx, d) -> str."""
+        for e_idx, d in cells:
+            item = {}
+            if e_idx is not None:
+                code = self.plan.employees[e_idx]
+                item["nip"] = self.plan.code_to_nip.get(code, code)
+            if d is not None:
+                item["day"] = d + 1
+            if detail is not None:
+                item["detail"] = detail(e_idx, d) if callable(detail) else detail
+            scope = self.employee_violations[e_idx] if e_idx is not None else self.day_violations[d]
+            scope.setdefault(rule, []).append(item)
+
+    # --- Aturan per karyawan (baris) ---
+
+    def _evaluate_employees(self, rows):
+        plan, cal = self.plan, self.cal
+        num_days, shift_name = cal.num_days, plan.all_shifts
+        matrix = self.matrix[rows]
+        onehot = matrix[:, :, None] == self.shift_range
+        libur, cuti = matrix == plan.libur_idx, matrix == plan.cuti_idx
+        off = libur | cuti
+        night = np.isin(matrix, plan.night_indices)
+        fb, mb, male, female = self.fb[rows], self.mb[rows], self.male[rows], self.female[rows]
+        weekend = self.weekend
+        for e_idx in rows:
+            self.employee_violations[e_idx] = {}
+
+        def cells(mask, day_offset=0):
+            return [(int(rows[i]), int(d) + day_offset) for i, d in zip(*np.nonzero(mask))]
+
+        def employees(mask):
+            return [(int(rows[i]), None) for i in np.flatnonzero(mask)]
+
+        # Sel, request & cuti
+        self._found('missing_cell', cells(matrix == MISSING))
+        requested = self.requested[rows]
+        self._found('pre_assignment', cells((requested != MISSING) & (matrix != requested)),
+                    lambda e_idx, d: f"request {self.pre_assignments[(e_idx, d)]}, dijadwalkan "
+                                     f"{shift_name[self.matrix[e_idx, d]] if self.matrix[e_idx, d] != MISSING else '-'}")
+        self._found('cuti_without_request', cells(cuti & ~self.requested_cuti[rows]))
+        forbidden = np.take_along_axis(self.forbidden[rows], np.maximum(matrix, 0), axis=1) & (matrix != MISSING)
+        self._found('forbidden_shift', cells(forbidden), lambda e_idx, d: shift_name[self.matrix[e_idx, d]])
+
+        # Aturan bulanan (apply_employee_monthly_rules)
+        shift_totals = onehot.sum(axis=1)
+        self.shift_totals[rows] = shift_totals
+        work_days = shift_totals[:, plan.work_indices].sum(axis=1)
+        libur_days = shift_totals[:, plan.libur_idx]
+        self._found('monthly_work_days', employees((work_days < cal.min_work_days) | (work_days > cal.max_work_days)),
+                    lambda e_idx, d: f"{self.shift_totals[e_idx, plan.work_indices].sum()} hari kerja "
+                                     f"(batas {cal.min_work_days}-{cal.max_work_days})")
+        self._found('monthly_libur', employees((libur_days < cal.min_libur) | (libur_days > cal.num_weekends)),
+                    lambda e_idx, d: f"{self.shift_totals[e_idx, plan.libur_idx]} Libur (batas {cal.min_libur}-{cal.num_weekends})")
+        if self.s_m_idx is not None:
+            self._found('fb_m_count', employees(fb & (shift_totals[:, self.s_m_idx] != 2)),
+                        lambda e_idx, d: f"{self.shift_totals[e_idx, self.s_m_idx]} shift M (harus 2)")
+
+        # Aturan urutan (apply_sequence_rules): shift malam & hari sesudahnya
+        if plan.night_indices:
+            self._found('rest_after_night', cells(night[:, :-1] & ~night[:, 1:] & ~libur[:, 1:], day_offset=1))
+            self._found('female_consecutive_nights', cells(female[:, None] & night[:, :-1] & night[:, 1:], day_offset=1))
+            if num_days > 3:
+                two_nights = night[:, :num_days - 3] & night[:, 1:num_days - 2]
+                not_off = ~off[:, 2:num_days - 1] | ~off[:, 3:]
+                self._found('rest_after_two_nights', cells(two_nights & not_off, day_offset=2))
+
+        # Aturan urutan (apply_sequence_rules): jendela 8 hari & pola SOCM→Libur, lalu aturan tambahan
+        if num_days > 7:
+            windows = np.lib.stride_tricks.sliding_window_view(off, 8, axis=1)[:, :num_days - 7]
+            self._found('off_day_every_8_days', cells(~windows.any(axis=2)), lambda e_idx, d: f"hari {d + 1}-{d + 8}")
+        if self.s_socm_idx is not None and self.forbidden_p and num_days > 2:
+            pattern = (male[:, None] & (matrix[:, :-2] == self.s_socm_idx) & libur[:, 1:-1]
+                       & np.isin(matrix[:, 2:], self.forbidden_p))
+            self._found('socm_libur_p_pattern', cells(pattern, day_offset=2))
+        weekend_work = onehot[:, weekend][:, :, plan.work_shift_indices].sum(axis=(1, 2))
+        self.weekend_work[rows] = weekend_work
+        limits = self.weekend_limits[rows]
+        self._found('weekend_work_range', employees((weekend_work < limits[:, 0]) | (weekend_work > limits[:, 1])),
+                    lambda e_idx, d: f"{self.weekend_work[e_idx]} hari kerja akhir pekan "
+                                     f"(batas {self.weekend_limits[e_idx, 0]}-{self.weekend_limits[e_idx, 1]})")
+        if self.s_p9_idx is not None and self.mb.any():
+            self._found('p9_weekend_non_mb', cells(~mb[:, None] & weekend[None, :] & (matrix == self.s_p9_idx)))
+
+        # Bandung (apply_bandung_monthly_rules): rentang shift malam per bulan per grup
+        if plan.night_indices:
+            night_totals = night.sum(axis=1)
+            for group, (low, high) in plan.monthly_night_limits.items():
+                in_group = self.groups[rows] == group
+                self._found(f'{group.lower()}_monthly_nights', employees(in_group & ((night_totals < low) | (night_totals > high))),
+                            lambda e_idx, d, low=low, high=high: (
+                                f"{np.isin(self.matrix[e_idx], plan.night_indices).sum()} shift malam (batas {low}-{high})"))
+
+        # Suku skor per karyawan
+        preferences = np.zeros(len(rows), dtype=np.int64)
+        member = np.zeros(len(plan.employees), dtype=bool)
+        for _, s_idx, group_indices, min_val, max_val, weight in plan.preferences:
+            member[:] = False
+            member[group_indices] = True
+            totals = shift_totals[:, s_idx]
+            preferences += weight * (member[rows] & (totals >= min_val) & (totals <= max_val))
+        self.employee_score['preferences'][rows] = preferences
+        preferred = self.weekend_preferred[rows]
+        self.employee_score['weekend_work_in_range'][rows] = 15 * ((weekend_work >= preferred[:, 0]) & (weekend_work <= preferred[:, 1]))
+        self.employee_score['weekend_libur'][rows] = libur[:, weekend].sum(axis=1)
+        working = ~off
+        for length in self.streaks:
+            if num_days >= length:
+                windows = np.lib.stride_tricks.sliding_window_view(working, length, axis=1)[:, :num_days - length + 1]
+                self.streaks[length][rows] = windows.all(axis=2).sum(axis=1)
+        # Jeda akhir pekan: bekerja di blok Sabtu–Minggu (tidak Libur keduanya) lalu tanpa Libur di blok berikutnya
+        block_libur = libur[:, self.weekend_blocks]
+        worked_block, off_block = ~block_libur.all(axis=2), block_libur.any(axis=2)
+        self.weekend_break_misses[rows] = (worked_block[:, :-1] & ~off_block[:, 1:]).sum(axis=1)
+
+    # --- Aturan per hari (kolom) ---
+
+    def _evaluate_days(self, days):
+        plan, shift_name = self.plan, self.plan.all_shifts
+        columns = self.matrix[:, days]
+        for d in days:
+            self.day_violations[d] = {}
+
+        # Kebutuhan harian (apply_core_constraints)
+        day_counts = (columns[:, :, None] == self.shift_range).sum(axis=0)
+        out_of_range = (day_counts < self.demand_min[days]) | (day_counts > self.demand_max[days])
+        for i, s_idx in zip(*np.nonzero(out_of_range)):
+            d = int(days[i])
+            self._found('daily_demand', [(None, d)], f"{shift_name[s_idx]}: {day_counts[i, s_idx]} "
+                                                     f"(batas {self.demand_min[d, s_idx]}-{self.demand_max[d, s_idx]})")
+
+        # Minimal anggota grup di shift malam per hari (apply_additional_constraints)
+        for group, minimum in plan.daily_night_minimum.items():
+            in_group = self.groups == group
+            if not (in_group.any() and plan.night_indices):
+                continue
+            group_nights = np.isin(columns[in_group], plan.night_indices).sum(axis=0)
+            for i in np.flatnonzero(group_nights < minimum):
+                self._found(f'{group.lower()}_night_coverage', [(None, int(days[i]))],
+                            f"{group_nights[i]} {group} shift malam (minimal {minimum})")
+
+        # Komposisi tim harian per site (apply_site_compositions)
+        for site, site_indices, day_mask, column_shifts, rows in self.compositions:
+            site_columns = columns[site_indices]
+            counts = np.stack([np.isin(site_columns, s_indices).sum(axis=0) for _, s_indices in column_shifts], axis=1)
+            bad = [(None, int(days[i])) for i in np.flatnonzero(day_mask[days]) if tuple(counts[i]) not in rows]
+            self._found('site_composition', bad, lambda e_idx, d, site=site, site_indices=site_indices: (
+                f"{site}: " + '+'.join(shift_name[s] if s != MISSING else '?' for s in self.matrix[site_indices, d])))
+
+        # Skor pola akhir pekan Jakarta (apply_soft_constraints)
+        jakarta, weekend = self.jakarta, self.weekend[days]
+        if len(jakarta) >= 2 and self.s_p8_idx is not None:
+            jkt_columns = columns[jakarta]
+            p8 = (jkt_columns == self.s_p8_idx).sum(axis=0)
+            jkt_libur = (jkt_columns == plan.libur_idx).sum(axis=0)
+            self.day_score['jakarta_weekend_pattern'][days] = 15 * (weekend & (p8 == 1) & (jkt_libur == len(jakarta) - 1))
+
+    # --- Skor & laporan ---
+
+    def implied_terms(self):
+        """
+        Suku objective yang nilainya ditentukan model, bukan jadwal: penalti 6 / 7 hari kerja
+        berturut-turut dan bonus jeda akhir pekan hanya memakai implikasi satu arah, sehingga
+        CP-SAT selalu bisa memilih 0 untuk penalti dan +20 untuk setiap pasangan blok akhir pekan.
+        {suku: {"objective": nilai di objective CP-SAT, "schedule": nilai jika dihitung dari jadwal}}.
+        """
+        num_pairs = len(self.plan.employees) * max(0, len(self.cal.weekend_blocks) - 1)
+        return {
+            'works_6_straight': {"objective": 0, "schedule": -30 * int(self.streaks[6].sum())},
+            'works_7_straight': {"objective": 0, "schedule": -60 * int(self.streaks[7].sum())},
+            'weekend_break': {"objective": 20 * num_pairs,
+                              "schedule": 20 * (num_pairs - int(self.weekend_break_misses.sum()))},
+        }
+
+    def objective_breakdown(self):
+        """
+        Suku objective apply_soft_constraints. Variabel bantu di model hanya berupa implikasi,
+        jadi nilainya di sini adalah nilai terbaik yang akan dipilih CP-SAT untuk jadwal ini.
+        """
+        plan, cal, shift_map = self.plan, self.cal, self.plan.shift_map
+        fb_indices, mb_indices = np.flatnonzero(self.fb), np.flatnonzero(self.mb)
+
+        def with_offsets(metric, indices, totals):
+            offsets = self.fairness_offsets.get(metric)
+            return totals if offsets is None else totals + offsets[indices]
+
+        def pair_spread(metric, indices, shift_names, weight):
+            s_indices = [shift_map.get(s) for s in shift_names]
+            if len(indices) <= 1 or not s_indices or any(s is None for s in s_indices):
+                return 0
+            return weight * _spread(with_offsets(metric, indices, self.shift_totals[indices][:, s_indices].sum(axis=1)))
+
+        implied = self.implied_terms()
+        breakdown = {'preferences': int(self.employee_score['preferences'].sum())}
+        # Nilai model (lihat implied_terms); nilai dari jadwal dilaporkan terpisah di report
+        breakdown['works_6_straight'] = implied['works_6_straight']['objective']
+        breakdown['works_7_straight'] = implied['works_7_straight']['objective']
+        breakdown['weekend_work_in_range'] = int(self.employee_score['weekend_work_in_range'].sum())
+        breakdown['weekend_libur'] = int(self.employee_score['weekend_libur'].sum())
+        breakdown['weekend_work_spread'] = sum(-20 * _spread(with_offsets('weekend_work', group_indices, self.weekend_work[group_indices]))
+                                               for group_indices in plan.group_indices.values() if len(group_indices) > 1)
+        breakdown['fb_p6_soc6_spread'] = pair_spread('p6_soc6', fb_indices, ('P6', 'SOC6'), -5)
+        breakdown['mb_soc_spread'] = pair_spread('soc', mb_indices, [name for name in shift_map if 'SOC' in name], -10)
+        breakdown['mb_night_spread'] = (pair_spread('night', mb_indices, plan.night_shifts, -30)
+                                        if len(plan.night_indices) == 2 else 0)
+        breakdown['jakarta_weekend_pattern'] = int(self.day_score['jakarta_weekend_pattern'].sum())
+        breakdown['weekend_break'] = implied['weekend_break']['objective']
+        breakdown['mb_s12_soc2_spread'] = pair_spread('s12_soc2', mb_indices, ('S12', 'SOC2'), -10)
+        return breakdown
+
+    def objective(self):
+        return sum(self.objective_breakdown().values())
+
+    def violations(self, employees=None, days=None):
+        """Pelanggaran {aturan: [item]} untuk karyawan & hari tertentu (default: semua)."""
+        if employees is None:
+            employees = range(len(self.employee_violations))
+        if days is None:
+            days = range(len(self.day_violations))
+        merged = {}
+        for scope in [self.employee_violations[e_idx] for e_idx in employees] + [self.day_violations[d] for d in days]:
+            for rule, items in scope.items():
+                merged.setdefault(rule, []).extend(items)
+        return merged
+
+    def violation_counts(self):
+        counts = {}
+        for scope in self.employee_violations + self.day_violations:
+            for rule, items in scope.items():
+                counts[rule] = counts.get(rule, 0) + len(items)
+        return counts
+
+    def report(self, with_details=True):
+        """
+        {"feasible", "violation_counts": {aturan: n}, "violations": {aturan: [{nip, day, detail}]},
+         "objective", "objective_breakdown": {suku: nilai}, "implied_terms", "diagnostics"}.
+        """
+        breakdown = self.objective_breakdown()
+        violation_counts = self.violation_counts()
+        result = {
+            "feasible": not violation_counts,
+            "violation_counts": violation_counts,
+            "objective": sum(breakdown.values()),
+            "objective_breakdown": breakdown,
+            "implied_terms": self.implied_terms(),
+            "diagnostics": dict({f'{length}_day_work_streaks': int(totals.sum()) for length, totals in self.streaks.items()},
+                                weekend_break_misses=int(self.weekend_break_misses.sum())),
+        }
+        if with_details:
+            result["violations"] = self.violations()
+        return result
+
+    def apply_changes(self, changes):
+        """
+        Mengubah sel jadwal [(e_idx, hari, s_idx), ...] lalu menghitung ulang hanya baris
+        karyawan dan kolom hari yang tersentuh. Mengembalikan pelanggaran di cakupan tersebut,
+        jumlah pelanggaran seluruh jadwal, objective baru & selisihnya.
+        """
+        started = time.perf_counter()
+        objective_before = self.objective()
+        for e_idx, d, s_idx in changes:
+            self.matrix[e_idx, d] = s_idx
+        employees = np.array(sorted({e_idx for e_idx, _, _ in changes}), dtype=np.int64)
+        days = np.array(sorted({d for _, d, _ in changes}), dtype=np.int64)
+        self._evaluate_employees(employees)
+        self._evaluate_days(days)
+        objective = self.objective()
+        violation_counts = self.violation_counts()
+        return {
+            "feasible": not violation_counts,
+            "violation_counts": violation_counts,
+            "violations": self.violations(employees, days),
+            "objective": objective,
+            "objective_delta": objective - objective_before,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+
+
+def evaluate_schedule(matrix, plan, cal, daily_demand, pre_assignments=None, with_details=True):
+    """Memeriksa matrix jadwal terhadap semua aturan wajib dan menghitung objective (lihat ScheduleEvaluator.report)."""
+    return ScheduleEvaluator(matrix, plan, cal, daily_demand, pre_assignments).report(with_details)
+
+
+def schedule_evaluator(schedule, target_year, target_month, public_holidays, demand, pre_assignment_requests=(),
+                       employees_data=None, fairness_offsets=None):
+    """ScheduleEvaluator untuk jadwal format hasil API ({nip: [shift, ...]}) pada bulan & demand tertentu."""
+    plan = compile_rule_plan(employees_data)
+    cal = get_month_calendar(target_year, target_month, public_holidays)
+    pre_assignments = parse_pre_assignments(plan, pre_assignment_requests, target_year, target_month)
+    matrix = schedule_to_matrix(schedule, plan, cal.num_days)
+    return ScheduleEvaluator(matrix, plan, cal, plan.compile_demand(demand), pre_assignments, fairness_offsets)
+
+
+def validate_schedule(schedule, target_year, target_month, public_holidays, demand, pre_assignment_requests=(),
+                      employees_data=None, with_details=True):
+    """Validasi jadwal format hasil API ({nip: [shift, ...]}) untuk bulan & demand tertentu."""
+    return schedule_evaluator(schedule, target_year, target_month, public_holidays, demand,
+                              pre_assignment_requests, employees_data).report(with_details)
+
+
+def _iter_schedules(payload):
+    """Jadwal dari resp.json / hasil simulasi ([{simulation_run, result: {schedule}}]) atau satu jadwal."""
+    if isinstance(payload, dict) and 'result' in payload:
+        payload = payload['result']
+    if isinstance(payload, dict) and 'schedule' in payload:
+        yield payload.get('run_id', 1), payload['schedule']
+        return
+    for index, run in enumerate(payload, start=1):
+        result = run.get('result', run)
+        yield run.get('simulation_run', index), result['schedule']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memeriksa jadwal terhadap aturan wajib dan menghitung skornya.")
+    parser.add_argument('schedule', help="File JSON jadwal (resp.json, hasil simulasi, atau satu jadwal)")
+    parser.add_argument('--instance', required=True, help="File instance (format benchmarks/*.json)")
+    parser.add_argument('--details', action='store_true', help="Tampilkan detail setiap pelanggaran")
+    args = parser.parse_args()
+
+    with open(args.instance, encoding='utf-8') as f:
+        instance = json.load(f)
+    with open(args.schedule, encoding='utf-8') as f:
+        payload = json.load(f)
+    for run, schedule in _iter_schedules(payload):
+        report = validate_schedule(schedule, instance['year'], instance['month'], instance['public_holidays'],
+                                   instance['demand'], instance.get('requests', []), roster_employees_data(),
+                                   with_details=args.details)
+        status = '✅ valid' if report['feasible'] else f"❌ {sum(report['violation_counts'].values())} pelanggaran"
+        print(f"Run #{run}: {status}, objective {report['objective']}")
+        print(json.dumps({key: report[key] for key in report if key not in ('feasible', 'objective')},
+                         ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
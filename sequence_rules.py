@@ -0,0 +1,124 @@
+# file: sequence_rules.py
+
+from functools import lru_cache
+
+# =================================================================================
+# ATURAN URUTAN SHIFT SEBAGAI AUTOMATON
+# =================================================================================
+# Aturan pola per karyawan (Libur setelah shift malam, dua malam lalu dua hari off, tanpa
+# malam berturut-turut untuk karyawan perempuan, SOCM→Libur→bukan P6–P9 untuk karyawan
+# laki-laki) dulu ditulis sebagai implikasi per hari. Di sini setiap aturan adalah automaton
+# kecil atas kelas shift harian; automaton digabung (product) sekali per varian karyawan lalu
+# dipasang sebagai satu AddAutomaton per karyawan (lihat solver_2.apply_sequence_rules).
+#
+# Minimal satu hari off di setiap OFF_WINDOW_DAYS hari sengaja TIDAK masuk automaton: counter
+# hari kerja melipatgandakan jumlah state (x8) dan ekspansi automaton di presolve CP-SAT ikut
+# membengkak, sedangkan jumlah linear per jendela sudah ketat. Jendela itu tetap satu
+# constraint linear per jendela di apply_sequence_rules.
+#
+# Semua state yang bisa dicapai adalah state akhir: kewajiban yang belum selesai di akhir
+# bulan (mis. dua malam di dua hari terakhir) tidak melanggar, sama seperti aturan lama yang
+# hanya memeriksa jendela yang masih berada di dalam bulan.
+
+# Kelas shift harian (nilai variabel kelas per karyawan per hari)
+LIBUR, CUTI, EARLY, OTHER_WORK, NIGHT, SOCM = range(6)
+SHIFT_CLASS_NAMES = ('Libur', 'Cuti', 'P6-P9', 'kerja lain', 'malam', 'SOCM')
+OFF_CLASSES = frozenset((LIBUR, CUTI))
+NIGHT_CLASSES = frozenset((NIGHT, SOCM))
+
+# Minimal satu Libur/Cuti di setiap jendela sepanjang ini (maks. 7 hari kerja berturut-turut)
+OFF_WINDOW_DAYS = 8
+EARLY_SHIFTS = ('P6', 'P7', 'P8', 'P9')
+
+
+def shift_classes(plan):
+    """Kelas untuk setiap indeks shift (urutan plan.all_shifts)."""
+    classes = []
+    for s_idx, name in enumerate(plan.all_shifts):
+        if s_idx == plan.libur_idx:
+            classes.append(LIBUR)
+        elif s_idx == plan.cuti_idx:
+            classes.append(CUTI)
+        elif name == 'SOCM' and s_idx in plan.night_indices:
+            classes.append(SOCM)
+        elif s_idx in plan.night_indices:
+            classes.append(NIGHT)
+        elif name in EARLY_SHIFTS:
+            classes.append(EARLY)
+        else:
+            classes.append(OTHER_WORK)
+    return classes
+
+
+# --- Aturan: (state awal, fungsi transisi(state, kelas) -> state baru atau None jika dilarang) ---
+
+def _rest_after_night(state, symbol):
+    """Setelah shift malam: malam lagi atau Libur."""
+    if state == 'night' and symbol not in NIGHT_CLASSES and symbol != LIBUR:
+        return None
+    return 'night' if symbol in NIGHT_CLASSES else 'free'
+
+
+def _no_consecutive_nights(state, symbol):
+    if symbol in NIGHT_CLASSES:
+        return None if state == 'night' else 'night'
+    return 'free'
+
+
+def _rest_after_two_nights(state, symbol):
+    """Dua malam berturut-turut lalu dua hari Libur/Cuti. Malam ketiga hanya boleh di hari terakhir."""
+    night, off = symbol in NIGHT_CLASSES, symbol in OFF_CLASSES
+    if state == 'free':
+        return 'one_night' if night else 'free'
+    if state == 'one_night':
+        return 'two_nights' if night else 'free'
+    if state == 'two_nights':
+        return 'rest_1' if off else ('three_nights' if night else None)
+    if state == 'rest_1':
+        return 'free' if off else None
+    return None  # 'three_nights': tidak boleh ada hari berikutnya
+
+
+def _socm_libur_early(state, symbol):
+    """SOCM lalu Libur: hari berikutnya bukan P6–P9."""
+    if state == 'socm_libur' and symbol == EARLY:
+        return None
+    if symbol == SOCM:
+        return 'socm'
+    return 'socm_libur' if state == 'socm' and symbol == LIBUR else 'free'
+
+
+def employee_rules(female, male_socm_pattern):
+    """Daftar aturan (nama, state awal, transisi) untuk satu varian karyawan."""
+    rules = [('rest_after_night', 'free', _rest_after_night),
+             ('rest_after_two_nights', 'free', _rest_after_two_nights)]
+    if female:
+        rules.append(('female_consecutive_nights', 'free', _no_consecutive_nights))
+    if male_socm_pattern:
+        rules.append(('socm_libur_p_pattern', 'free', _socm_libur_early))
+    return rules
+
+
+@lru_cache(maxsize=None)
+def compile_automaton(female, male_socm_pattern, num_classes=len(SHIFT_CLASS_NAMES)):
+    """
+    Product semua aturan varian karyawan menjadi satu automaton deterministik (hanya state
+    yang bisa dicapai). Mengembalikan (state_awal, [state_akhir], [(state, kelas, state_baru)])
+    dalam format AddAutomaton.
+    """
+    rules = employee_rules(female, male_socm_pattern)
+    initial = tuple(start for _, start, _ in rules)
+    state_ids = {initial: 0}
+    transitions = []
+    pending = [initial]
+    while pending:
+        state = pending.pop()
+        for symbol in range(num_classes):
+            next_state = tuple(step(part, symbol) for part, (_, _, step) in zip(state, rules))
+            if None in next_state:
+                continue
+            if next_state not in state_ids:
+                state_ids[next_state] = len(state_ids)
+                pending.append(next_state)
+            transitions.append((state_ids[state], symbol, state_ids[next_state]))
+    return 0, sorted(state_ids.values()), sorted(transitions)
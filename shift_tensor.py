@@ -0,0 +1,84 @@
+# file: shift_tensor.py
+
+from ortools.sat.python import cp_model
+
+# =================================================================================
+# TENSOR VARIABEL SHIFT (KARYAWAN × HARI × SHIFT)
+# =================================================================================
+# Variabel shift disimpan dalam satu list datar dengan indeks (e × hari + d) × shift + s,
+# bukan dict ber-key tuple. Helper row_sum / day_sum / window mengambil potongan list
+# lewat aritmetika indeks lalu membangun ekspresi dengan satu panggilan LinearExpr.Sum,
+# alih-alih rantai objek LinearExpr dari sum(generator) di setiap aturan.
+# shifts[e, d, s] tetap didukung untuk akses satu variabel.
+
+
+class ShiftTensor:
+    """Variabel BoolVar shifts[e, d, s] = 1 jika karyawan e mendapat shift s pada hari d."""
+
+    def __init__(self, model, employees, num_days, all_shifts):
+        self.num_employees = len(employees)
+        self.num_days = num_days
+        self.num_shifts = len(all_shifts)
+        # Urutan pembuatan variabel sama seperti dict sebelumnya (e, d, s)
+        self.vars = [model.NewBoolVar(f's_{e}_{d}_{s}') for e in employees for d in range(num_days) for s in all_shifts]
+
+    def __getitem__(self, key):
+        e_idx, d, s_idx = key
+        return self.vars[(e_idx * self.num_days + d) * self.num_shifts + s_idx]
+
+    def cell(self, e_idx, d):
+        """Semua variabel shift karyawan e pada hari d (urutan indeks shift)."""
+        start = (e_idx * self.num_days + d) * self.num_shifts
+        return self.vars[start:start + self.num_shifts]
+
+    def row_vars(self, e_idx, shift_indices, days=None):
+        """Variabel karyawan e untuk shift `shift_indices` pada `days` (default: sebulan penuh)."""
+        vars_, num_days, num_shifts = self.vars, self.num_days, self.num_shifts
+        base = e_idx * num_days
+        return [vars_[(base + d) * num_shifts + s_idx]
+                for d in (range(num_days) if days is None else days) for s_idx in shift_indices]
+
+    def day_vars(self, d, shift_indices, employees=None):
+        """Variabel hari d untuk shift `shift_indices` dari `employees` (default: semua karyawan)."""
+        vars_, num_days, num_shifts = self.vars, self.num_days, self.num_shifts
+        return [vars_[(e_idx * num_days + d) * num_shifts + s_idx]
+                for e_idx in (range(self.num_employees) if employees is None else employees) for s_idx in shift_indices]
+
+    def row_sum(self, e_idx, shift_indices, days=None):
+        """Jumlah shift `shift_indices` karyawan e pada `days`."""
+        return cp_model.LinearExpr.Sum(self.row_vars(e_idx, shift_indices, days))
+
+    def day_sum(self, d, shift_indices, employees=None):
+        """Jumlah karyawan (dari `employees`) yang mendapat salah satu shift `shift_indices` pada hari d."""
+        return cp_model.LinearExpr.Sum(self.day_vars(d, shift_indices, employees))
+
+    def window(self, e_idx, d, k, shift_indices):
+        """Jumlah shift `shift_indices` karyawan e pada k hari berturut-turut mulai hari d."""
+        return cp_model.LinearExpr.Sum(self.row_vars(e_idx, shift_indices, range(d, d + k)))
+
+    def add_hint(self, model, assignment):
+        """Memasang assignment [e][d] -> s_idx sebagai solution hint untuk semua variabel sel yang terisi."""
+        indices, values = [], []
+        for e_idx, row in enumerate(assignment):
+            for d, chosen in enumerate(row):
+                if chosen is None:
+                    continue
+                start = (e_idx * self.num_days + d) * self.num_shifts
+                for s_idx in range(self.num_shifts):
+                    indices.append(self.vars[start + s_idx].Index())
+                    values.append(int(s_idx == chosen))
+        hint = model.Proto().solution_hint
+        hint.vars.extend(indices)
+        hint.values.extend(values)
+
+    def assignment(self, solver):
+        """Indeks shift terpilih per karyawan per hari dari solusi terakhir solver: [e][d] -> s_idx."""
+        boolean_value, vars_, num_shifts = solver.BooleanValue, self.vars, self.num_shifts
+        result = []
+        for e_idx in range(self.num_employees):
+            row = []
+            for d in range(self.num_days):
+                start = (e_idx * self.num_days + d) * num_shifts
+                row.append(next((s_idx for s_idx in range(num_shifts) if boolean_value(vars_[start + s_idx])), None))
+            result.append(row)
+        return result
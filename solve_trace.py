@@ -0,0 +1,114 @@
+# file: solve_trace.py
+
+import re
+
+# =================================================================================
+# TRACE PENCARIAN CP-SAT (OPT-IN)
+# =================================================================================
+# Dengan opsi "trace", log pencarian CP-SAT ditangkap lewat log_callback (tidak ditulis
+# ke stdout) lalu diurai menjadi event terstruktur: durasi presolve, waktu solusi
+# pertama, dan timeline objective / bound. Trace disimpan bersama hasil tugas untuk
+# profiling offline.
+
+MAX_TRACE_LOG_LINES = 2000
+
+_PRESOLVE_START = re.compile(r'^Starting presolve at ([\d.]+)s')
+_SEARCH_START = re.compile(r'^Starting search at ([\d.]+)s with (\d+) workers')
+_PROGRESS = re.compile(r"^#(\d+|Bound|Done)\s+([\d.]+)s\s+best:(\S+)\s+next:\[([^\]]*)\]\s*(.*)$")
+
+
+def _number(text):
+    """Angka dari log CP-SAT (pemisah ribuan ditulis sebagai apostrof, mis. 1'234)."""
+    text = text.replace("'", '')
+    try:
+        value = float(text)
+    except ValueError:
+        return None
+    return value if value not in (float('inf'), float('-inf')) else None
+
+
+class SearchLogCollector:
+    """Dipasang sebagai solver.log_callback; menyimpan setiap baris log CP-SAT."""
+
+    def __init__(self):
+        self.lines = []
+
+    def __call__(self, message):
+        self.lines.extend(message.splitlines())
+
+
+def enable_search_trace(solver):
+    """Mengaktifkan log pencarian CP-SAT ke collector baru (bukan ke stdout)."""
+    collector = SearchLogCollector()
+    solver.parameters.log_search_progress = True
+    solver.parameters.log_to_stdout = False
+    solver.log_callback = collector
+    return collector
+
+
+def parse_search_log(lines, maximize=True):
+    """
+    Mengurai log CP-SAT menjadi:
+      presolve_seconds, first_solution_seconds, search_workers,
+      timeline: [{"event": "solution"/"bound"/"done", "time", "objective", "bound", "worker"}],
+      summary: isi 'CpSolverResponse summary' (status, walltime, deterministic_time, ...)
+    """
+    presolve_start = search_start = search_workers = first_solution = None
+    timeline, summary = [], {}
+    in_summary = False
+
+    for line in lines:
+        line = line.strip()
+        if in_summary:
+            key, sep, value = line.partition(':')
+            if sep:
+                summary[key.strip()] = value.strip()
+            continue
+        if line.startswith('CpSolverResponse summary'):
+            in_summary = True
+            continue
+
+        match = _PRESOLVE_START.match(line)
+        if match:
+            presolve_start = float(match.group(1))
+            continue
+        match = _SEARCH_START.match(line)
+        if match:
+            search_start, search_workers = float(match.group(1)), int(match.group(2))
+            continue
+        match = _PROGRESS.match(line)
+        if not match:
+            continue
+
+        kind, time_s, best, next_range, worker = match.groups()
+        bounds = [_number(part) for part in next_range.split(',')] if ',' in next_range else [None, None]
+        event = {
+            "event": 'bound' if kind == 'Bound' else 'done' if kind == 'Done' else 'solution',
+            "time": float(time_s),
+            "objective": _number(best),
+            # Model memaksimalkan skor: bound atas ada di ujung kanan rentang 'next'
+            "bound": bounds[-1] if maximize else bounds[0],
+            "worker": worker.split(' ')[0] if worker else None,
+        }
+        if event["event"] == 'solution' and first_solution is None:
+            first_solution = event["time"]
+        timeline.append(event)
+
+    presolve_seconds = None
+    if presolve_start is not None and search_start is not None:
+        presolve_seconds = round(search_start - presolve_start, 3)
+    return {
+        "presolve_seconds": presolve_seconds,
+        "first_solution_seconds": first_solution,
+        "search_workers": search_workers,
+        "timeline": timeline,
+        "summary": summary,
+    }
+
+
+def build_search_trace(collector, maximize=True):
+    """Trace lengkap untuk disimpan bersama hasil: event terurai + log mentah (dipotong)."""
+    trace = parse_search_log(collector.lines, maximize)
+    trace["log"] = collector.lines[-MAX_TRACE_LOG_LINES:]
+    trace["log_truncated"] = len(collector.lines) > MAX_TRACE_LOG_LINES
+    return trace
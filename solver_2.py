@@ -5,635 +5,638 @@ import collections
 from ortools.sat.python import cp_model
 import random
 import json
+import threading
 import time
-import calendar
-from datetime import datetime
+
+from constraint_coverage import remove_redundant_constraints
+from greedy_schedule import construct_schedule
+from lns_search import LNS_INITIAL_FRACTION, improve_schedule
+from month_calendar import get_month_calendar
+from rule_plan import compile_rule_plan, parse_pre_assignments, roster_employees_data
+from sequence_rules import EARLY, OFF_WINDOW_DAYS, SHIFT_CLASS_NAMES, SOCM, compile_automaton, shift_classes
+from shift_tensor import ShiftTensor
+from solve_trace import build_search_trace, enable_search_trace
+from solver_profiles import (apply_memory_limit, apply_profile, apply_quality, apply_seed, compute_time_budget,
+                             problem_features, resolve_profile, time_budget_report)
 
 # =================================================================================
 # FUNGSI-FUNGSI ATURAN (CONSTRAINTS)
 # =================================================================================
-def apply_pre_assignments(model, shifts, pre_assignments, shift_map):
+def apply_pre_assignments(model, shifts, pre_assignments, plan):
     for (e_idx, d), shift_name in pre_assignments.items():
-        s_idx = shift_map[shift_name]
+        s_idx = plan.shift_map[shift_name]
         model.Add(shifts[e_idx, d, s_idx] == 1)
 
-def apply_core_constraints(model, shifts, employees, days, demand, day_types, shift_map):
-    num_employees = len(employees)
+def apply_core_constraints(model, shifts, plan, cal, daily_demand):
+    """Satu shift per sel & kebutuhan harian. Mengembalikan {(hari, s_idx): indeks constraint demand}."""
+    num_employees = len(plan.employees)
     for e_idx in range(num_employees):
-        for d in days:
-            model.AddExactlyOne(shifts[(e_idx, d, s_idx)] for s_idx in range(len(shift_map)))
-    for d in days:
-        day_type = day_types[d]
-        for role_name, requirements in demand.items():
-            if role_name in shift_map:
-                required_count = requirements.get(day_type, 0)
-                s_idx = shift_map[role_name]
-                if isinstance(required_count, (list, tuple)) and len(required_count) == 2:
-                    min_req, max_req = required_count
-                    model.AddLinearConstraint(sum(shifts[e_idx, d, s_idx] for e_idx in range(num_employees)), min_req, max_req)
-                elif isinstance(required_count, int) and required_count > 0:
-                    model.Add(sum(shifts[e_idx, d, s_idx] for e_idx in range(num_employees)) == required_count)
-                else: # Termasuk jika 0 atau format tidak dikenali
-                    model.Add(sum(shifts[e_idx, d, s_idx] for e_idx in range(num_employees)) == 0)
-
-def apply_employee_monthly_rules(model, shifts, employees_data, days, roles, non_work_statuses, employee_map, shift_map, max_work_days, forbidden_shifts_by_group, num_weekends,min_work_days,min_libur,code_to_nip_map):
-    
-    # --- Persiapan untuk aturan spesifik (dilakukan sekali di luar loop) ---
-    forbidden_shifts_for_400201 = ['SOC6', 'SOC2', 'SOCM','M']
-    forbidden_indices_for_400201 = [shift_map.get(s) for s in forbidden_shifts_for_400201]
-
-    target_nip = "400201"
-    target_e_idx = -1
-    for e_code, nip in code_to_nip_map.items():
-        if nip == target_nip:
-            if e_code in employee_map:
-                target_e_idx = employee_map[e_code]
-            break
-
-    # --- Loop utama per karyawan ---
-    for e_idx, (e_name, group) in enumerate(employees_data):
-        
+        for d in cal.days:
+            model.AddExactlyOne(shifts.cell(e_idx, d))
+    demand_rows = {}
+    for d in cal.days:
+        for s_idx, min_req, max_req in daily_demand[cal.day_types[d]]:
+            demand_rows[(d, s_idx)] = model.AddLinearConstraint(shifts.day_sum(d, [s_idx]), min_req, max_req).Index()
+    return demand_rows
+
+def apply_employee_monthly_rules(model, shifts, plan, cal):
+    for e_idx, group in enumerate(plan.employee_groups):
+
         # --- Aturan Hari Kerja ---
-        work_indices = [shift_map[s] for s in roles if s in shift_map]
-        total_work_days = sum(shifts[(e_idx, d, s_idx)] for d in days for s_idx in work_indices)
-        
+        total_work_days = shifts.row_sum(e_idx, plan.work_indices)
+
         # Aturan hari kerja maksimal (dari max_work_days)
-        model.Add(total_work_days <= max_work_days)
+        model.Add(total_work_days <= cal.max_work_days)
         # Aturan hari kerja minimal
-        model.Add(total_work_days >= min_work_days)
-        
+        model.Add(total_work_days >= cal.min_work_days)
+
         # --- Aturan Libur Wajib yang Fleksibel ---
-        total_libur = sum(shifts[(e_idx, d, shift_map.get('Libur'))] for d in days)
-        model.AddLinearConstraint(total_libur, min_libur, num_weekends)
-
-        # --- Aturan Larangan Shift untuk NIP Spesifik ---
-        if e_idx == target_e_idx:
-            for d in days:
-                for s_idx in forbidden_indices_for_400201:
-                    if s_idx is not None:
-                        model.Add(shifts[e_idx, d, s_idx] == 0)
-        
+        total_libur = shifts.row_sum(e_idx, [plan.libur_idx])
+        model.AddLinearConstraint(total_libur, cal.min_libur, cal.num_weekends)
+
         # --- Aturan Spesifik per Grup ---
         if group == 'FB':
-            if 'M' in shift_map:
-                m_shift_idx = shift_map['M']
-                total_m_shifts = sum(shifts[(e_idx, d, m_shift_idx)] for d in days)
+            if 'M' in plan.shift_map:
+                m_shift_idx = plan.shift_map['M']
+                total_m_shifts = shifts.row_sum(e_idx, [m_shift_idx])
                 model.Add(total_m_shifts == 2)
 
-        # --- Aturan larangan shift berdasarkan grup ---
-        forbidden_roles_for_group = forbidden_shifts_by_group.get(group, [])
-        if forbidden_roles_for_group:
-            forbidden_indices = [shift_map[role] for role in forbidden_roles_for_group if role in shift_map]
-            for d in days:
-                for s_idx in forbidden_indices:
-                    if s_idx is not None:
-                        model.Add(shifts[e_idx, d, s_idx] == 0)
-
-def apply_night_shift_rules(model, shifts, employees_data, days, female_employees, night_shifts, employee_map, shift_map):
-    num_days = len(days)
-    s_night_indices = [shift_map[s] for s in night_shifts if s in shift_map]
-    
-    if not s_night_indices:  
-        return
-
-    s_libur_idx = shift_map['Libur']
-    s_cuti_idx = shift_map.get('Cuti', -1)
-    
-    is_night_vars = {}
-    for e_idx, _ in enumerate(employees_data):
-        for d in range(num_days):
-            var = model.NewBoolVar(f'is_night_e{e_idx}_d{d}')
-            night_shifts_on_day = [shifts[e_idx, d, s_idx] for s_idx in s_night_indices]
-            
-            model.Add(sum(night_shifts_on_day) == 1).OnlyEnforceIf(var)
-            model.Add(sum(night_shifts_on_day) == 0).OnlyEnforceIf(var.Not())
-            is_night_vars[(e_idx, d)] = var
-
-    for e_idx, (e_name, group) in enumerate(employees_data):
-        
-        for d in range(num_days - 1):
-            model.Add(shifts[e_idx, d + 1, s_libur_idx] == 1).OnlyEnforceIf([
-                is_night_vars[(e_idx, d)],
-                is_night_vars[(e_idx, d + 1)].Not()
-            ])
-
-        if e_name in female_employees:
-            for d in range(num_days - 1):
-                model.Add(is_night_vars[(e_idx, d)] + is_night_vars[(e_idx, d + 1)] <= 1)
-
-        if s_cuti_idx != -1:
-            for d in range(num_days - 3):
-                trigger = [is_night_vars[(e_idx, d)], is_night_vars[(e_idx, d + 1)]]
-                
-                model.Add(shifts[e_idx, d + 2, s_libur_idx] + shifts[e_idx, d + 2, s_cuti_idx] == 1).OnlyEnforceIf(trigger)
-                model.Add(shifts[e_idx, d + 3, s_libur_idx] + shifts[e_idx, d + 3, s_cuti_idx] == 1).OnlyEnforceIf(trigger)
-
-def apply_additional_constraints(model, shifts, employees_data, days, day_types, employee_map, shift_map, male_employees, male_bandung_indices, night_shift_indices, public_holidays, target_year, target_month):
-    s_socm_idx = shift_map.get('SOCM')
-    s_libur_idx = shift_map.get('Libur')
-    s_cuti_idx = shift_map.get('Cuti')
+        # --- Aturan larangan shift (grup + NIP spesifik dari konfigurasi) ---
+        for d in cal.days:
+            for s_idx in plan.forbidden_by_employee.get(e_idx, []):
+                model.Add(shifts[e_idx, d, s_idx] == 0)
+
+def apply_sequence_rules(model, shifts, plan, cal):
+    """
+    Aturan urutan shift per karyawan (Libur setelah malam, dua malam lalu dua hari off, tanpa
+    malam berturut-turut untuk perempuan, SOCM→Libur→bukan P6–P9 untuk laki-laki) sebagai satu
+    AddAutomaton atas variabel kelas shift harian (lihat sequence_rules.py), ditambah minimal
+    satu hari off per jendela OFF_WINDOW_DAYS hari sebagai jumlah linear.
+    """
+    off_indices = [plan.libur_idx, plan.cuti_idx]
+    classes = shift_classes(plan)
+    female_employees = set(plan.female_employees)
+    male_employees = set(plan.male_employees)
+    has_socm_pattern = SOCM in classes and EARLY in classes
+    for e_idx, e_name in enumerate(plan.employees):
+        initial, finals, transitions = compile_automaton(e_name in female_employees,
+                                                         has_socm_pattern and e_name in male_employees)
+        class_vars = []
+        for d in cal.days:
+            class_var = model.NewIntVar(0, len(SHIFT_CLASS_NAMES) - 1, f'class_e{e_idx}_d{d}')
+            model.Add(class_var == cp_model.LinearExpr.WeightedSum(shifts.cell(e_idx, d), classes))
+            class_vars.append(class_var)
+        model.AddAutomaton(class_vars, initial, finals, transitions)
+        for d in range(cal.num_days - OFF_WINDOW_DAYS + 1):
+            model.Add(shifts.window(e_idx, d, OFF_WINDOW_DAYS, off_indices) >= 1)
+
+def apply_additional_constraints(model, shifts, plan, cal):
+    shift_map = plan.shift_map
     s_p9_idx = shift_map.get('P9')
-    s_p10_idx = shift_map.get('P10')
-    
-    work_shift_indices = [idx for name, idx in shift_map.items() if name not in ['Libur','Cuti']]
-    forbidden_p_indices = [shift_map.get(r) for r in ['P6', 'P7', 'P8', 'P9'] if r in shift_map]
-    
-    e_b33_idx = employee_map.get('B33')
-    e_b31_idx = employee_map.get('B31')
-    e_b32_idx = employee_map.get('B32')
 
-    for e_idx, (e_name, group) in enumerate(employees_data):
-        
-        if s_libur_idx is not None and s_cuti_idx is not None:
-            for d in range(len(days) - 7):
-                off_days_in_window = []
-                for i in range(8):
-                    is_libur = shifts[e_idx, d + i, s_libur_idx]
-                    is_cuti = shifts[e_idx, d + i, s_cuti_idx]
-                    is_off_day = model.NewBoolVar(f'e{e_idx}_d{d+i}_is_off')
-                    model.AddBoolOr([is_libur, is_cuti]).OnlyEnforceIf(is_off_day)
-                    model.AddImplication(is_off_day.Not(), is_libur.Not())
-                    model.AddImplication(is_off_day.Not(), is_cuti.Not())
-                    off_days_in_window.append(is_off_day)
-                model.Add(sum(off_days_in_window) > 0)
-
-        if e_name in male_employees and s_socm_idx is not None and forbidden_p_indices:
-            for d in range(len(days) - 2):
-                trigger = [shifts[e_idx, d, s_socm_idx], shifts[e_idx, d + 1, s_libur_idx]]
-                model.Add(sum(shifts[e_idx, d + 2, s_idx] for s_idx in forbidden_p_indices if s_idx is not None) == 0).OnlyEnforceIf(trigger)
-        
-        weekend_work_days = sum(shifts[e_idx, d, s_idx] for d in range(len(days)) if day_types[d] in ['Sabtu', 'Minggu'] for s_idx in work_shift_indices)
-        if group == 'FB':
-            model.AddLinearConstraint(weekend_work_days, 3, 5)
-        if group == 'MB':
-            model.AddLinearConstraint(weekend_work_days, 4, 6)
+    work_shift_indices = plan.work_shift_indices
+    male_bandung_indices = plan.group_indices.get('MB', [])
+    night_shift_indices = plan.night_indices
+    # Larangan shift per karyawan (mis. B31–B33) kini berasal dari konfigurasi
+    # dan diterapkan di apply_employee_monthly_rules. Jendela 8 hari & pola SOCM→Libur
+    # ada di apply_sequence_rules. Batas akhir pekan & shift malam per grup dari konfigurasi.
 
-        if e_idx == e_b33_idx and s_p9_idx is not None:
-            for d in range(len(days)):
-                model.Add(shifts[e_idx, d, s_p9_idx] == 0)
-        
-        if e_idx in [e_b31_idx, e_b32_idx] and s_p10_idx is not None:
-            for d in range(len(days)):
-                model.Add(shifts[e_idx, d, s_p10_idx] == 0)
+    for e_idx, group in enumerate(plan.employee_groups):
+        limits = plan.weekend_work_limits.get(group)
+        if limits:
+            model.AddLinearConstraint(shifts.row_sum(e_idx, work_shift_indices, cal.weekend_days), *limits)
 
-    if male_bandung_indices and night_shift_indices:
-        for d in range(len(days)):
-            model.Add(sum(shifts[e_idx, d, s_idx] for e_idx in male_bandung_indices for s_idx in night_shift_indices) >= 2)
+    for group, minimum in plan.daily_night_minimum.items():
+        group_indices = plan.group_indices.get(group, [])
+        if group_indices and night_shift_indices:
+            for d in range(cal.num_days):
+                model.Add(shifts.day_sum(d, night_shift_indices, group_indices) >= minimum)
 
     if s_p9_idx is not None and male_bandung_indices:
-        non_mb_indices = [i for i in range(len(employees_data)) if i not in male_bandung_indices]
-        for d in range(len(days)):
-            if day_types[d] in ['Sabtu', 'Minggu']:
-                for e_idx in non_mb_indices:
-                    model.Add(shifts[e_idx, d, s_p9_idx] == 0)
-
-def apply_soft_constraints(model, shifts, employees_data, days, day_types, employee_map, shift_map):
-    num_days = len(days)
+        mb_set = set(male_bandung_indices)
+        non_mb_indices = [i for i in range(len(plan.employees)) if i not in mb_set]
+        for d in cal.weekend_days:
+            for e_idx in non_mb_indices:
+                model.Add(shifts[e_idx, d, s_p9_idx] == 0)
+
+def apply_soft_constraints(model, shifts, plan, cal, fairness_offsets=None):
+    """
+    fairness_offsets: {metric: [offset per e_idx]} dari ledger keadilan (fairness_ledger.py);
+    offset ditambahkan ke total per karyawan pada suku rentang keadilan sehingga yang
+    diseimbangkan adalah total kumulatif, bukan hanya bulan ini.
+    """
+    num_days = cal.num_days
     total_score_vars = []
-    s_libur_idx = shift_map.get('Libur')
-    s_cuti_idx = shift_map.get('Cuti')
+    fairness_offsets = fairness_offsets or {}
+
+    def with_offsets(metric, totals, indices):
+        """Total per karyawan + offset ledger, beserta batas atas variabel min/max/rentang."""
+        offsets = fairness_offsets.get(metric)
+        if not offsets:
+            return totals, num_days
+        return ([total + offsets[e_idx] if offsets[e_idx] else total for total, e_idx in zip(totals, indices)],
+                num_days + max(offsets[e_idx] for e_idx in indices))
+    shift_map = plan.shift_map
+    s_libur_idx = plan.libur_idx
+    s_cuti_idx = plan.cuti_idx
     s_p8_idx = shift_map.get('P8')
-    work_shift_indices = [idx for name, idx in shift_map.items() if name not in ['Libur', 'Cuti']]
-
-    preferences_with_range = [
-        ('P6', 'FB', 2, 6, 10), ('P7', 'FB', 2, 6, 10), ('P8', 'FB', 2, 9, 10), 
-        ('P9', 'FB', 3, 3, 10), ('SOC6', 'FB', 1, 3, 10), ('P6', 'MB', 0, 1, 10), 
-        ('P7', 'MB', 0, 1, 10), ('P8', 'MB', 0, 3, 10), ('P9', 'MB', 0, 4, 10),
-        ('P10', 'MB', 0, 5, 10), ('P11', 'MB', 1, 2, 10), ('S12', 'MB', 1, 9, 10),
-        ('M', 'MB', 1, 3, 10), ('SOCM', 'MB', 1, 3, 10), ('SOC2', 'MB', 1, 3, 10),
-        ('SOC6', 'MB', 0, 1, 10), ('P7', 'MJ', 1, 8, 10), ('P8', 'MJ', 2, 5, 10),
-        ('P9', 'MJ', 1, 7, 10), ('P11', 'MJ', 1, 4, 10), ('M', 'MJ', 1, 2, 10),
-        ('P7', 'CJ', 1, 8, 10), ('P8', 'CJ', 2, 5, 10), ('P10', 'CJ', 1, 9, 10),
-        ('P11', 'CJ', 1, 4, 10), ('M', 'CJ', 1, 2, 10),
-    ]
-    for shift_name, group, min_val, max_val, weight in preferences_with_range:
-        s_idx = shift_map.get(shift_name)
-        if s_idx is None: continue
-        group_indices = [employee_map[e[0]] for e in employees_data if e[1] == group]
+    work_shift_indices = plan.work_shift_indices
+
+    # Preferensi jumlah shift per grup (rentang & bobot dari konfigurasi)
+    for shift_name, s_idx, group_indices, min_val, max_val, weight in plan.preferences:
         for e_idx in group_indices:
-            total = sum(shifts[e_idx, d, s_idx] for d in range(num_days))
+            total = shifts.row_sum(e_idx, [s_idx])
             in_range = model.NewBoolVar(f'pref_in_range_e{e_idx}_{shift_name}')
             model.Add(total >= min_val).OnlyEnforceIf(in_range)
             model.Add(total <= max_val).OnlyEnforceIf(in_range)
             total_score_vars.append(in_range * weight)
 
-    for e_idx, (e_name, group) in enumerate(employees_data):
-        if s_libur_idx is not None and s_cuti_idx is not None:
-            for d in range(num_days - 5):
-                works_6_straight = model.NewBoolVar(f'e{e_idx}_works_6_d{d}')
-                work_days = []
-                for i in range(6):
-                    is_work_day = model.NewBoolVar(f'e{e_idx}_is_work_d{d+i}')
-                    model.AddBoolAnd([shifts[e_idx, d + i, s_libur_idx].Not(), shifts[e_idx, d + i, s_cuti_idx].Not()]).OnlyEnforceIf(is_work_day)
-                    work_days.append(is_work_day)
-                model.AddBoolAnd(work_days).OnlyEnforceIf(works_6_straight)
-                total_score_vars.append(works_6_straight * -30)
-            for d in range(num_days - 6):
-                works_7_straight = model.NewBoolVar(f'e{e_idx}_works_7_d{d}')
-                work_days = []
-                for i in range(7):
-                    is_work_day = model.NewBoolVar(f'e{e_idx}_is_work7_d{d+i}')
-                    model.AddBoolAnd([shifts[e_idx, d + i, s_libur_idx].Not(), shifts[e_idx, d + i, s_cuti_idx].Not()]).OnlyEnforceIf(is_work_day)
-                    work_days.append(is_work_day)
-                model.AddBoolAnd(work_days).OnlyEnforceIf(works_7_straight)
-                total_score_vars.append(works_7_straight * -60)
-
-        weekend_work_days = sum(shifts[e_idx, d, s_idx] for d in range(num_days) if day_types[d] in ['Sabtu', 'Minggu'] for s_idx in work_shift_indices)
-        if group == 'FB':
-            is_in_range = model.NewBoolVar(f'weekend_in_range_e{e_idx}_fb')
-            model.Add(weekend_work_days >= 3).OnlyEnforceIf(is_in_range)
-            model.Add(weekend_work_days <= 4).OnlyEnforceIf(is_in_range)
-            total_score_vars.append(is_in_range * 15)
-        if group == 'MB':
-            is_in_range = model.NewBoolVar(f'weekend_in_range_e{e_idx}_mb')
-            model.Add(weekend_work_days >= 4).OnlyEnforceIf(is_in_range)
-            model.Add(weekend_work_days <= 5).OnlyEnforceIf(is_in_range)
+    for e_idx, group in enumerate(plan.employee_groups):
+        for d in range(num_days - 5):
+            works_6_straight = model.NewBoolVar(f'e{e_idx}_works_6_d{d}')
+            work_days = []
+            for i in range(6):
+                is_work_day = model.NewBoolVar(f'e{e_idx}_is_work_d{d+i}')
+                model.AddBoolAnd([shifts[e_idx, d + i, s_libur_idx].Not(), shifts[e_idx, d + i, s_cuti_idx].Not()]).OnlyEnforceIf(is_work_day)
+                work_days.append(is_work_day)
+            model.AddBoolAnd(work_days).OnlyEnforceIf(works_6_straight)
+            total_score_vars.append(works_6_straight * -30)
+        for d in range(num_days - 6):
+            works_7_straight = model.NewBoolVar(f'e{e_idx}_works_7_d{d}')
+            work_days = []
+            for i in range(7):
+                is_work_day = model.NewBoolVar(f'e{e_idx}_is_work7_d{d+i}')
+                model.AddBoolAnd([shifts[e_idx, d + i, s_libur_idx].Not(), shifts[e_idx, d + i, s_cuti_idx].Not()]).OnlyEnforceIf(is_work_day)
+                work_days.append(is_work_day)
+            model.AddBoolAnd(work_days).OnlyEnforceIf(works_7_straight)
+            total_score_vars.append(works_7_straight * -60)
+
+        preferred = plan.weekend_work_preferred.get(group)
+        if preferred:
+            weekend_work_days = shifts.row_sum(e_idx, work_shift_indices, cal.weekend_days)
+            is_in_range = model.NewBoolVar(f'weekend_in_range_e{e_idx}_{group.lower()}')
+            model.Add(weekend_work_days >= preferred[0]).OnlyEnforceIf(is_in_range)
+            model.Add(weekend_work_days <= preferred[1]).OnlyEnforceIf(is_in_range)
             total_score_vars.append(is_in_range * 15)
 
-        if s_libur_idx is not None:
-            for d in range(num_days):
-                if day_types[d] in ['Sabtu', 'Minggu']:
-                    total_score_vars.append(shifts[e_idx, d, s_libur_idx])
+        for d in cal.weekend_days:
+            total_score_vars.append(shifts[e_idx, d, s_libur_idx])
 
-    groups_to_balance = {'FB': 'fb', 'MB': 'mb', 'MJ': 'mj', 'CJ': 'cj'}
-    for group_code, group_label in groups_to_balance.items():
-        group_indices = [employee_map[e[0]] for e in employees_data if e[1] == group_code]
+    for group_code, group_indices in plan.group_indices.items():
+        group_label = group_code.lower()
         if len(group_indices) > 1:
-            weekend_totals = [sum(shifts[e_idx, d, s_idx] for d in range(num_days) if day_types[d] in ['Sabtu', 'Minggu'] for s_idx in work_shift_indices) for e_idx in group_indices]
-            min_val = model.NewIntVar(0, num_days, f'min_wknd_work_{group_label}')
-            max_val = model.NewIntVar(0, num_days, f'max_wknd_work_{group_label}')
+            weekend_totals, upper = with_offsets('weekend_work', [shifts.row_sum(e_idx, work_shift_indices, cal.weekend_days) for e_idx in group_indices], group_indices)
+            min_val = model.NewIntVar(0, upper, f'min_wknd_work_{group_label}')
+            max_val = model.NewIntVar(0, upper, f'max_wknd_work_{group_label}')
             model.AddMinEquality(min_val, weekend_totals)
             model.AddMaxEquality(max_val, weekend_totals)
-            work_range = model.NewIntVar(0, num_days, f'range_wknd_work_{group_label}')
+            work_range = model.NewIntVar(0, upper, f'range_wknd_work_{group_label}')
             model.Add(work_range == max_val - min_val)
             total_score_vars.append(work_range * -20)
-            
+
+    bandung_fb_indices = plan.group_indices.get('FB', [])
+    bandung_mb_indices = plan.group_indices.get('MB', [])
     s_p6_idx = shift_map.get('P6')
     s_soc6_idx = shift_map.get('SOC6')
     if s_p6_idx is not None and s_soc6_idx is not None:
-        bandung_fb_indices = [employee_map[e[0]] for e in employees_data if e[1] == 'FB']
         if len(bandung_fb_indices) > 1:
-            combined_totals = [sum(shifts[e_idx, d, s_p6_idx] + shifts[e_idx, d, s_soc6_idx] for d in range(num_days)) for e_idx in bandung_fb_indices]
-            min_shifts, max_shifts = model.NewIntVar(0, num_days, 'min_p6soc6_fb'), model.NewIntVar(0, num_days, 'max_p6soc6_fb')
+            combined_totals, upper = with_offsets('p6_soc6', [shifts.row_sum(e_idx, [s_p6_idx, s_soc6_idx]) for e_idx in bandung_fb_indices], bandung_fb_indices)
+            min_shifts, max_shifts = model.NewIntVar(0, upper, 'min_p6soc6_fb'), model.NewIntVar(0, upper, 'max_p6soc6_fb')
             model.AddMinEquality(min_shifts, combined_totals)
             model.AddMaxEquality(max_shifts, combined_totals)
-            shift_range = model.NewIntVar(0, num_days, 'range_p6soc6_fb')
+            shift_range = model.NewIntVar(0, upper, 'range_p6soc6_fb')
             model.Add(shift_range == max_shifts - min_shifts)
             total_score_vars.append(shift_range * -5)
 
     all_soc_indices = [idx for name, idx in shift_map.items() if 'SOC' in name]
     if all_soc_indices:
-        bandung_mb_indices = [employee_map[e[0]] for e in employees_data if e[1] == 'MB']
         if len(bandung_mb_indices) > 1:
-            soc_totals = [sum(shifts[e_idx, d, s_idx] for d in range(num_days) for s_idx in all_soc_indices) for e_idx in bandung_mb_indices]
-            min_shifts, max_shifts = model.NewIntVar(0, num_days, 'min_soc_mb'), model.NewIntVar(0, num_days, 'max_soc_mb')
+            soc_totals, upper = with_offsets('soc', [shifts.row_sum(e_idx, all_soc_indices) for e_idx in bandung_mb_indices], bandung_mb_indices)
+            min_shifts, max_shifts = model.NewIntVar(0, upper, 'min_soc_mb'), model.NewIntVar(0, upper, 'max_soc_mb')
             model.AddMinEquality(min_shifts, soc_totals)
             model.AddMaxEquality(max_shifts, soc_totals)
-            shift_range = model.NewIntVar(0, num_days, 'range_soc_mb')
+            shift_range = model.NewIntVar(0, upper, 'range_soc_mb')
             model.Add(shift_range == max_shifts - min_shifts)
             total_score_vars.append(shift_range * -10)
 
-    s_m_idx = shift_map.get('M')
-    s_socm_idx = shift_map.get('SOCM')
-    if s_m_idx is not None and s_socm_idx is not None:
-        bandung_mb_indices = [employee_map[e[0]] for e in employees_data if e[1] == 'MB']
+    if len(plan.night_indices) == 2:
         if len(bandung_mb_indices) > 1:
-            night_totals = [sum(shifts[e_idx, d, s_m_idx] + shifts[e_idx, d, s_socm_idx] for d in range(num_days)) for e_idx in bandung_mb_indices]
-            min_shifts, max_shifts = model.NewIntVar(0, num_days, 'min_night_mb'), model.NewIntVar(0, num_days, 'max_night_mb')
+            night_totals, upper = with_offsets('night', [shifts.row_sum(e_idx, plan.night_indices) for e_idx in bandung_mb_indices], bandung_mb_indices)
+            min_shifts, max_shifts = model.NewIntVar(0, upper, 'min_night_mb'), model.NewIntVar(0, upper, 'max_night_mb')
             model.AddMinEquality(min_shifts, night_totals)
             model.AddMaxEquality(max_shifts, night_totals)
-            shift_range = model.NewIntVar(0, num_days, 'range_night_mb')
+            shift_range = model.NewIntVar(0, upper, 'range_night_mb')
             model.Add(shift_range == max_shifts - min_shifts)
             total_score_vars.append(shift_range * -30)
 
-    if s_p8_idx is not None and s_libur_idx is not None:
-        jakarta_indices = [employee_map[e[0]] for e in employees_data if e[1] in ['MJ', 'CJ']]
-        if len(jakarta_indices) >= 3:
-            for d in range(num_days):
-                if day_types[d] in ['Sabtu', 'Minggu']:
-                    cond1 = model.NewBoolVar(f'cond1_p8_d{d}')
-                    model.Add(sum(shifts[e_idx, d, s_p8_idx] for e_idx in jakarta_indices) == 1).OnlyEnforceIf(cond1)
-                    model.Add(sum(shifts[e_idx, d, s_p8_idx] for e_idx in jakarta_indices) != 1).OnlyEnforceIf(cond1.Not())
-                    cond2 = model.NewBoolVar(f'cond2_libur_d{d}')
-                    model.Add(sum(shifts[e_idx, d, s_libur_idx] for e_idx in jakarta_indices) == 2).OnlyEnforceIf(cond2)
-                    model.Add(sum(shifts[e_idx, d, s_libur_idx] for e_idx in jakarta_indices) != 2).OnlyEnforceIf(cond2.Not())
-                    rule_met = model.NewBoolVar(f'jakarta_rule_met_d{d}')
-                    model.AddBoolAnd([cond1, cond2]).OnlyEnforceIf(rule_met)
-                    total_score_vars.append(rule_met * 15)
-
-    if s_libur_idx is not None:
-        weekend_blocks = []
-        for d in range(num_days - 1):
-            if day_types[d] == 'Sabtu' and day_types[d + 1] == 'Minggu':
-                weekend_blocks.append([d, d + 1])
-        for e_idx in range(len(employees_data)):
-            for w in range(len(weekend_blocks) - 1):
-                weekend_A, weekend_B = weekend_blocks[w], weekend_blocks[w+1]
-                works_weekend_A = model.NewBoolVar(f'e{e_idx}_works_wkndA_{w}')
-                model.AddBoolOr([shifts[e_idx, weekend_A[0], s_libur_idx].Not(), shifts[e_idx, weekend_A[1], s_libur_idx].Not()]).OnlyEnforceIf(works_weekend_A)
-                off_on_weekend_B = model.NewBoolVar(f'e{e_idx}_off_wkndB_{w}')
-                model.AddBoolOr([shifts[e_idx, weekend_B[0], s_libur_idx], shifts[e_idx, weekend_B[1], s_libur_idx]]).OnlyEnforceIf(off_on_weekend_B)
-                rule_satisfied = model.NewBoolVar(f'e{e_idx}_weekend_break_rule_{w}')
-                model.AddBoolOr([works_weekend_A.Not(), off_on_weekend_B]).OnlyEnforceIf(rule_satisfied)
-                total_score_vars.append(rule_satisfied * 20)
-    
+    if s_p8_idx is not None:
+        jakarta_indices = plan.site_indices.get('Jakarta', [])
+        if len(jakarta_indices) >= 2:
+            for d in cal.weekend_days:
+                cond1 = model.NewBoolVar(f'cond1_p8_d{d}')
+                jakarta_p8_count = shifts.day_sum(d, [s_p8_idx], jakarta_indices)
+                model.Add(jakarta_p8_count == 1).OnlyEnforceIf(cond1)
+                model.Add(jakarta_p8_count != 1).OnlyEnforceIf(cond1.Not())
+                cond2 = model.NewBoolVar(f'cond2_libur_d{d}')
+                jakarta_libur_count = shifts.day_sum(d, [s_libur_idx], jakarta_indices)
+                model.Add(jakarta_libur_count == len(jakarta_indices) - 1).OnlyEnforceIf(cond2)
+                model.Add(jakarta_libur_count != len(jakarta_indices) - 1).OnlyEnforceIf(cond2.Not())
+                rule_met = model.NewBoolVar(f'jakarta_rule_met_d{d}')
+                model.AddBoolAnd([cond1, cond2]).OnlyEnforceIf(rule_met)
+                total_score_vars.append(rule_met * 15)
+
+    weekend_blocks = cal.weekend_blocks
+    for e_idx in range(len(plan.employees)):
+        for w in range(len(weekend_blocks) - 1):
+            weekend_A, weekend_B = weekend_blocks[w], weekend_blocks[w+1]
+            works_weekend_A = model.NewBoolVar(f'e{e_idx}_works_wkndA_{w}')
+            model.AddBoolOr([shifts[e_idx, weekend_A[0], s_libur_idx].Not(), shifts[e_idx, weekend_A[1], s_libur_idx].Not()]).OnlyEnforceIf(works_weekend_A)
+            off_on_weekend_B = model.NewBoolVar(f'e{e_idx}_off_wkndB_{w}')
+            model.AddBoolOr([shifts[e_idx, weekend_B[0], s_libur_idx], shifts[e_idx, weekend_B[1], s_libur_idx]]).OnlyEnforceIf(off_on_weekend_B)
+            rule_satisfied = model.NewBoolVar(f'e{e_idx}_weekend_break_rule_{w}')
+            model.AddBoolOr([works_weekend_A.Not(), off_on_weekend_B]).OnlyEnforceIf(rule_satisfied)
+            total_score_vars.append(rule_satisfied * 20)
+
     s_s12_idx = shift_map.get('S12')
     s_soc2_idx = shift_map.get('SOC2')
     if s_s12_idx is not None and s_soc2_idx is not None:
-        bandung_mb_indices = [employee_map[e[0]] for e in employees_data if e[1] == 'MB']
         if len(bandung_mb_indices) > 1:
-            combined_totals = [sum(shifts[e_idx, d, s_s12_idx] + shifts[e_idx, d, s_soc2_idx] for d in range(num_days)) for e_idx in bandung_mb_indices] 
-            min_shifts = model.NewIntVar(0, num_days, 'min_s12_soc2_mb')
-            max_shifts = model.NewIntVar(0, num_days, 'max_s12_soc2_mb')
+            combined_totals, upper = with_offsets('s12_soc2', [shifts.row_sum(e_idx, [s_s12_idx, s_soc2_idx]) for e_idx in bandung_mb_indices], bandung_mb_indices)
+            min_shifts = model.NewIntVar(0, upper, 'min_s12_soc2_mb')
+            max_shifts = model.NewIntVar(0, upper, 'max_s12_soc2_mb')
             model.AddMinEquality(min_shifts, combined_totals)
             model.AddMaxEquality(max_shifts, combined_totals)
-            shift_range = model.NewIntVar(0, num_days, 'range_s12_soc2_mb')
+            shift_range = model.NewIntVar(0, upper, 'range_s12_soc2_mb')
             model.Add(shift_range == max_shifts - min_shifts)
             total_score_vars.append(shift_range * -10)
 
-    return sum(total_score_vars)
+    return cp_model.LinearExpr.Sum(total_score_vars)
+
+def apply_site_compositions(model, shifts, plan, cal):
+    """
+    Komposisi tim harian per site & tipe hari dari konfigurasi ('compositions', lihat
+    rule_plan.expand_composition): satu variabel jumlah per kolom (shift / off) per hari,
+    lalu AddAllowedAssignments pada variabel jumlah tersebut. Karena setiap baris tabel
+    berjumlah sama dengan ukuran tim, anggota tim tidak bisa mendapat shift di luar kolom.
+    """
+    for site, site_indices, day_types, column_shifts, rows in plan.compositions:
+        site_label = site.lower()
+        team_size = len(site_indices)
+        for day_type in day_types:
+            for d in cal.days_by_type[day_type]:
+                counts = []
+                for name, s_indices in column_shifts:
+                    count = model.NewIntVar(0, team_size, f'comp_{site_label}_{name}_d{d}')
+                    model.Add(count == shifts.day_sum(d, s_indices, site_indices))
+                    counts.append(count)
+                model.AddAllowedAssignments(counts, rows)
+
+def apply_bandung_monthly_rules(model, shifts, plan, cal):
+    for e_idx in plan.site_indices.get('Bandung', []):
+        group = plan.employee_groups[e_idx]
+        total_work_days = shifts.row_sum(e_idx, plan.work_indices)
+        model.Add(total_work_days <= cal.max_work_days)
+        model.Add(total_work_days >= cal.min_work_days)
+
+        total_libur = shifts.row_sum(e_idx, [plan.libur_idx])
+        model.AddLinearConstraint(total_libur, cal.min_libur, cal.num_weekends)
+
+        if group == 'FB' and 'M' in plan.shift_map:
+            model.Add(shifts.row_sum(e_idx, [plan.shift_map['M']]) == 2)
+
+        for d in cal.days:
+            for s_idx in plan.forbidden_by_employee.get(e_idx, []):
+                model.Add(shifts[e_idx, d, s_idx] == 0)
+
+        night_limits = plan.monthly_night_limits.get(group)
+        if night_limits and plan.night_indices:
+            model.AddLinearConstraint(shifts.row_sum(e_idx, plan.night_indices), *night_limits)
+
+def apply_jakarta_monthly_rules(model, shifts, plan, cal):
+    s_libur_idx = plan.libur_idx
+    jakarta_indices = plan.site_indices.get('Jakarta', [])
 
-def apply_jakarta_rules(model, shifts, employees_data, days, day_types, employee_map, shift_map):
-    s_libur_idx = shift_map.get('Libur')
-    s_cuti_idx = shift_map.get('Cuti')
-    s_p7_idx = shift_map.get('P7')
-    s_p8_idx = shift_map.get('P8')
-    s_p9_idx = shift_map.get('P9')
-    s_p10_idx = shift_map.get('P10')
-    s_p11_idx = shift_map.get('P11')
-    s_m_idx = shift_map.get('M')
-    
-    jakarta_indices = [employee_map.get(e[0]) for e in employees_data if e[1] in ['MJ', 'CJ']]
-    
-    if not all([s_libur_idx, s_cuti_idx, s_p7_idx, s_p8_idx, s_p9_idx, s_p10_idx, s_p11_idx, s_m_idx]) or len(jakarta_indices) != 3:
-        print("Warning: Aturan Jakarta tidak dapat diterapkan.")
-        return
-
-    for d in days:
-        jakarta_off_count = sum(shifts[e_idx, d, s_libur_idx] + shifts[e_idx, d, s_cuti_idx] for e_idx in jakarta_indices)
-        jakarta_p7_count = sum(shifts[e_idx, d, s_p7_idx] for e_idx in jakarta_indices)
-        jakarta_p8_count = sum(shifts[e_idx, d, s_p8_idx] for e_idx in jakarta_indices)
-        jakarta_p9_count = sum(shifts[e_idx, d, s_p9_idx] for e_idx in jakarta_indices)
-        jakarta_p10_count = sum(shifts[e_idx, d, s_p10_idx] for e_idx in jakarta_indices)
-        jakarta_p11_count = sum(shifts[e_idx, d, s_p11_idx] for e_idx in jakarta_indices)
-        jakarta_m_count = sum(shifts[e_idx, d, s_m_idx] for e_idx in jakarta_indices)
-
-        model.Add(jakarta_off_count != 3)
-
-        if day_types[d] == 'Weekday':
-            model.Add(jakarta_off_count != 2)
-            trigger_1_off = model.NewBoolVar(f'jkt_1_off_d{d}')
-            model.Add(jakarta_off_count == 1).OnlyEnforceIf(trigger_1_off)
-            model.Add(jakarta_off_count != 1).OnlyEnforceIf(trigger_1_off.Not())
-            
-            combo_p7_p9 = model.NewBoolVar(f'jkt_combo_p7p9_d{d}')
-            model.Add(jakarta_p7_count == 1).OnlyEnforceIf(combo_p7_p9)
-            model.Add(jakarta_p9_count == 1).OnlyEnforceIf(combo_p7_p9)
-            model.Add(jakarta_p10_count == 0).OnlyEnforceIf(combo_p7_p9)
-            model.Add(jakarta_p8_count == 0).OnlyEnforceIf(combo_p7_p9)
-            model.Add(jakarta_p11_count == 0).OnlyEnforceIf(combo_p7_p9)
-            model.Add(jakarta_m_count == 0).OnlyEnforceIf(combo_p7_p9)
-
-            combo_p7_p10 = model.NewBoolVar(f'jkt_combo_p7p10_d{d}')
-            model.Add(jakarta_p7_count == 1).OnlyEnforceIf(combo_p7_p10)
-            model.Add(jakarta_p10_count == 1).OnlyEnforceIf(combo_p7_p10)
-            model.Add(jakarta_p9_count == 0).OnlyEnforceIf(combo_p7_p10)
-            model.Add(jakarta_p8_count == 0).OnlyEnforceIf(combo_p7_p10)
-            model.Add(jakarta_p11_count == 0).OnlyEnforceIf(combo_p7_p10)
-            model.Add(jakarta_m_count == 0).OnlyEnforceIf(combo_p7_p10)
-            
-            model.Add(combo_p7_p9 + combo_p7_p10 == 1).OnlyEnforceIf(trigger_1_off)
-
-            trigger_0_off = model.NewBoolVar(f'jkt_0_off_d{d}')
-            model.Add(jakarta_off_count == 0).OnlyEnforceIf(trigger_0_off)
-            model.Add(jakarta_off_count != 0).OnlyEnforceIf(trigger_0_off.Not())
-            
-            combo1 = model.NewBoolVar(f'jkt_combo1_d{d}') # P7, P9, M
-            combo2 = model.NewBoolVar(f'jkt_combo2_d{d}') # P7, P9, P11
-            combo3 = model.NewBoolVar(f'jkt_combo3_d{d}') # P7, P10, M
-            combo4 = model.NewBoolVar(f'jkt_combo4_d{d}') # P7, P10, P11
-            
-            model.Add(combo1 + combo2 + combo3 + combo4 == 1).OnlyEnforceIf(trigger_0_off)
-            
-            model.Add(jakarta_p7_count == 1).OnlyEnforceIf(combo1); model.Add(jakarta_p9_count == 1).OnlyEnforceIf(combo1); model.Add(jakarta_m_count == 1).OnlyEnforceIf(combo1)
-            model.Add(jakarta_p7_count == 1).OnlyEnforceIf(combo2); model.Add(jakarta_p9_count == 1).OnlyEnforceIf(combo2); model.Add(jakarta_p11_count == 1).OnlyEnforceIf(combo2)
-            model.Add(jakarta_p7_count == 1).OnlyEnforceIf(combo3); model.Add(jakarta_p10_count == 1).OnlyEnforceIf(combo3); model.Add(jakarta_m_count == 1).OnlyEnforceIf(combo3)
-            model.Add(jakarta_p7_count == 1).OnlyEnforceIf(combo4); model.Add(jakarta_p10_count == 1).OnlyEnforceIf(combo4); model.Add(jakarta_p11_count == 1).OnlyEnforceIf(combo4)
-
-        elif day_types[d] in ['Sabtu', 'Minggu']:
-            model.Add(jakarta_off_count == 2)
-            model.Add(jakarta_p8_count == 1)
-
-def apply_bandung_monthly_rules(model, shifts, employees_data, days, roles, employee_map, shift_map, max_work_days, min_work_days, num_weekends, min_libur, forbidden_shifts_by_group, code_to_nip_map):
-    target_nip = "400201"
-    target_e_idx = -1
-    for e_code, nip in code_to_nip_map.items():
-        if nip == target_nip and e_code in employee_map:
-            target_e_idx = employee_map[e_code]
-            break
-    forbidden_shifts_for_target = [shift_map.get(s) for s in ['SOC6', 'SOC2', 'SOCM', 'M']]
-
-    for e_idx, (e_name, group) in enumerate(employees_data):
-        if group in ['FB', 'MB']:
-            work_indices = [shift_map.get(s) for s in roles if s in shift_map]
-            total_work_days = sum(shifts[(e_idx, d, s_idx)] for d in days for s_idx in work_indices)
-            model.Add(total_work_days <= max_work_days)
-            model.Add(total_work_days >= min_work_days)
-            
-            total_libur = sum(shifts[(e_idx, d, shift_map.get('Libur'))] for d in days)
-            model.AddLinearConstraint(total_libur, min_libur, num_weekends)
+    for e_idx in jakarta_indices:
+        total_work_days = shifts.row_sum(e_idx, plan.work_indices)
+        model.Add(total_work_days <= cal.max_work_days)
+        model.Add(total_work_days >= cal.min_work_days)
 
-            if e_idx == target_e_idx:
-                for d in days:
-                    for s_idx in forbidden_shifts_for_target:
-                        if s_idx is not None: model.Add(shifts[e_idx, d, s_idx] == 0)
-            
-            if group == 'FB' and 'M' in shift_map:
-                model.Add(sum(shifts[(e_idx, d, shift_map['M'])] for d in days) == 2)
-            
-            forbidden_roles = forbidden_shifts_by_group.get(group, [])
-            if forbidden_roles:
-                forbidden_indices = [shift_map.get(role) for role in forbidden_roles if role in shift_map]
-                for d in days:
-                    for s_idx in forbidden_indices:
-                        if s_idx is not None: model.Add(shifts[e_idx, d, s_idx] == 0)
-            
-            if group == 'MB':
-                s_m_idx = shift_map.get('M')
-                s_socm_idx = shift_map.get('SOCM')
-                if s_m_idx is not None and s_socm_idx is not None:
-                    total_night_shifts = sum(shifts[e_idx, d, s_m_idx] + shifts[e_idx, d, s_socm_idx] for d in days)
-                    model.AddLinearConstraint(total_night_shifts, 3, 4)
-
-def apply_jakarta_monthly_rules(model, shifts, employees_data, days, day_types, employee_map, shift_map, roles, max_work_days, min_work_days, num_weekends, min_libur, forbidden_shifts_by_group):
-    s_libur_idx = shift_map.get('Libur')
-    s_cuti_idx = shift_map.get('Cuti')
-    jakarta_indices = [employee_map.get(e[0]) for e in employees_data if e[1] in ['MJ', 'CJ']]
-    
-    if s_libur_idx is None or len(jakarta_indices) != 3:
-        print("Warning: Aturan bulanan Jakarta tidak dapat diterapkan.")
-        return
+        total_libur = shifts.row_sum(e_idx, [s_libur_idx])
+        model.AddLinearConstraint(total_libur, cal.min_libur, cal.num_weekends)
 
-    for e_idx in jakarta_indices:
-        work_indices = [shift_map.get(s) for s in roles if s in shift_map]
-        total_work_days = sum(shifts[(e_idx, d, s_idx)] for d in days for s_idx in work_indices)
-        model.Add(total_work_days <= max_work_days)
-        model.Add(total_work_days >= min_work_days)
-        
-        total_libur = sum(shifts[(e_idx, d, s_libur_idx)] for d in days)
-        model.AddLinearConstraint(total_libur, min_libur, num_weekends)
-
-        group = employees_data[e_idx][1]
-        forbidden_roles = forbidden_shifts_by_group.get(group, [])
-        if forbidden_roles:
-            forbidden_indices = [shift_map.get(role) for role in forbidden_roles if role in shift_map]
-            for d in days:
-                for s_idx in forbidden_indices:
-                    if s_idx is not None:
-                        model.Add(shifts[e_idx, d, s_idx] == 0)
-
-    for d in days:
-        if day_types[d] in ['Sabtu', 'Minggu']:
-            jakarta_off_count = sum(shifts[e_idx, d, s_libur_idx] + shifts[e_idx, d, s_cuti_idx] for e_idx in jakarta_indices)
-            model.Add(jakarta_off_count == 2)
+        for d in cal.days:
+            for s_idx in plan.forbidden_by_employee.get(e_idx, []):
+                model.Add(shifts[e_idx, d, s_idx] == 0)
 
 # =================================================================================
 # FUNGSI UTAMA SOLVER
 # =================================================================================
-def solve_one_instance(employees_data, target_year, target_month, pre_assignment_requests, public_holidays, demand):
-    """Fungsi ini menjalankan solver untuk SATU KALI proses."""
-    
-    code_to_nip_map = {
-        "B1": "400192", "B2": "400091", "B3": "400193", "B4": "400210", "B5": "400204",
-        "B6": "400211", "B7": "400092", "B8": "401136", "B9": "400202", "B10": "400216",
-        "B11": "400213", "B12": "401144", "B13": "401145", "B14": "400299", "B15": "401108",
-        "B16": "401138", "B17": "400218", "B18": "400206", "B19": "401524", "B20": "400198",
-        "B21": "400196", "B22": "400217", "B23": "400087", "B24": "400093", "B25": "400209",
-        "B26": "401133", "B27": "400090", "B28": "400189", "B29": "401107", "B30": "400201",
-        "J1": "400212", "J2": "400203", "J3": "400190"
-    }
-    nip_to_code_map = {v: k for k, v in code_to_nip_map.items()}
-    
-    employees = [e[0] for e in employees_data]
-    employee_map = {name: i for i, name in enumerate(employees)}
-    _, num_days = calendar.monthrange(target_year, target_month)
-    days = range(num_days)
-    
-    holiday_dates_str = set(public_holidays)
-    day_types = {}
-    for d in days:
-        day_num = d + 1
-        current_date_str = f"{target_year}-{target_month:02d}-{day_num:02d}"
-        day_of_week = calendar.weekday(target_year, target_month, day_num)
-        if current_date_str in holiday_dates_str:
-            day_types[d] = 'Minggu'
-        elif day_of_week == 5:
-            day_types[d] = 'Sabtu'
-        elif day_of_week == 6:
-            day_types[d] = 'Minggu'
-        else:
-            day_types[d] = 'Weekday'
-    
-    month_prefix = f"{target_year}-{target_month:02d}-"
-    holidays_in_month = [h for h in public_holidays if h.startswith(month_prefix)]
-    num_weekends = len([d for d, type in day_types.items() if type in ['Sabtu', 'Minggu']])
-    max_work_days = num_days - num_weekends + len(holidays_in_month)  
-    min_work_days = num_days - num_weekends  
-    min_libur = num_weekends - len(holidays_in_month) 
-    
-    assignable_roles = ['P6', 'P7', 'P8', 'P9', 'P10', 'P11', 'S12', 'M', 'SOCM', 'SOC2', 'SOC6']
-    count_as_work_roles = assignable_roles + ['Cuti']
-    all_shifts = assignable_roles + ['Libur', 'Cuti']
-    shift_map = {name: i for i, name in enumerate(all_shifts)}
-    
-    night_shifts = ['M', 'SOCM']
-    female_employees = [e[0] for e in employees_data if e[1] in ['FB', 'CJ']]
-    male_employees = [e[0] for e in employees_data if e[1] in ['MB', 'MJ']]
-    male_bandung_indices = [employee_map.get(e[0]) for e in employees_data if e[1] == 'MB']
-    night_shift_indices = [shift_map.get(s) for s in night_shifts if s]
-    
-    forbidden_shifts_by_group = { 'FB': ['P10', 'P11', 'S12', 'SOC2', 'SOCM'], 'MJ': ['P6', 'P10', 'S12', 'SOC2', 'SOC6', 'SOCM'], 'CJ': ['P6', 'P9', 'S12', 'SOC2', 'SOC6', 'SOCM'] }
-    
-    pre_assignments = {}
-    for req in pre_assignment_requests:
-        real_nip, jenis, tanggal_str = str(req.get('nip')), req.get('jenis'), req.get('tanggal')
-        if not (real_nip and jenis and tanggal_str): continue
+class SolutionProgressCallback(cp_model.CpSolverSolutionCallback):
+    """
+    Melaporkan setiap solusi yang membaik selama proses solving ke fungsi on_progress.
+    Dengan record_trace=True, setiap solusi juga dicatat (tanpa throttle) dalam bentuk
+    deterministic time sehingga jejak solve antar run bisa dibandingkan. Dengan stop_after,
+    solve dihentikan pada solusi pertama yang ditemukan setelah batas tersebut (detik, atau
+    deterministic time jika record_trace=True) agar tidak pernah berhenti tanpa jadwal.
+    """
+
+    def __init__(self, on_progress=None, min_interval_seconds=1.0, record_trace=False, stop_after=None):
+        super().__init__()
+        self._on_progress = on_progress
+        self._min_interval = min_interval_seconds
+        self._last_report = None
+        self._solution_count = 0
+        self._stop_after = stop_after
+        self.trace = [] if record_trace else None
+
+    @property
+    def solution_count(self):
+        return self._solution_count
+
+    def on_solution_callback(self):
+        self._solution_count += 1
+        if self._stop_after is not None:
+            elapsed = self.Response().deterministic_time if self.trace is not None else self.WallTime()
+            if elapsed >= self._stop_after:
+                self.StopSearch()
+        if self.trace is not None:
+            self.trace.append({
+                "solution": self._solution_count,
+                "objective": self.ObjectiveValue(),
+                "best_bound": self.BestObjectiveBound(),
+                "deterministic_time": round(self.Response().deterministic_time, 3),
+            })
+        if self._on_progress is None:
+            return
+        wall_time = self.WallTime()
+        # Batasi frekuensi laporan agar solver tidak tersendat oleh I/O
+        if self._last_report is not None and wall_time - self._last_report < self._min_interval:
+            return
+        self._last_report = wall_time
         try:
-            internal_code = nip_to_code_map.get(real_nip)
-            if internal_code:
-                e_idx = employee_map.get(internal_code)
-                parsed_date = datetime.strptime(tanggal_str, '%Y-%m-%d')
-                if parsed_date.year == target_year and parsed_date.month == target_month and e_idx is not None:
-                    day_idx = parsed_date.day - 1
-                    pre_assignments[(e_idx, day_idx)] = jenis
-        except (ValueError, TypeError):
-            continue
-            
+            self._on_progress({
+                "objective": self.ObjectiveValue(),
+                "best_bound": self.BestObjectiveBound(),
+                "wall_time": round(wall_time, 3),
+                "solutions": self._solution_count,
+            })
+        except Exception as e:
+            print(f"Warning: Gagal melaporkan progres solusi: {e}")
+
+class ScheduleModel:
+    """Model CP-SAT satu bulan beserta indeks yang dibutuhkan untuk solve, LNS & membaca hasil."""
+
+    def __init__(self, model, shifts, plan, cal, daily_demand, demand_rows, pre_assignments, build_seconds, rule_constraints,
+                 rule_ranges, removed_constraints=0):
+        self.model = model
+        self.shifts = shifts
+        self.plan = plan
+        self.cal = cal
+        self.daily_demand = daily_demand
+        # Indeks constraint demand per (hari, s_idx), untuk mengubah batasnya tanpa build ulang
+        self.demand_rows = demand_rows
+        self.pre_assignments = pre_assignments
+        # Waktu build & jumlah constraint per fungsi aturan (untuk metrik)
+        self.build_seconds = build_seconds
+        self.rule_constraints = rule_constraints
+        # Rentang indeks constraint [awal, akhir) per fungsi aturan (lihat constraint_coverage.py)
+        self.rule_ranges = rule_ranges
+        # Jumlah constraint redundan yang dikosongkan saat build (opsi dedupe_constraints)
+        self.removed_constraints = removed_constraints
+
+def build_schedule_model(employees_data, target_year, target_month, pre_assignment_requests, public_holidays, demand, fairness_offsets=None,
+                         dedupe_constraints=False):
+    """
+    Membangun model CP-SAT (constraint + objective) untuk satu bulan. Dengan dedupe_constraints,
+    constraint duplikat / tersirat / selalu terpenuhi dikosongkan setelah build (constraint_coverage.py).
+    """
+    plan = compile_rule_plan(employees_data)
+    # Tipe hari, hari akhir pekan, blok Sabtu–Minggu & batas bulanan (di-cache per bulan)
+    cal = get_month_calendar(target_year, target_month, public_holidays)
+    daily_demand = plan.compile_demand(demand)
+    pre_assignments = parse_pre_assignments(plan, pre_assignment_requests, target_year, target_month)
+
     model = cp_model.CpModel()
-    shifts = { (employee_map[e], d, shift_map[s]): model.NewBoolVar(f's_{e}_{d}_{s}') for e in employees for d in days for s in all_shifts }
+    shifts = ShiftTensor(model, plan.employees, cal.num_days, plan.all_shifts)
     
-    s_cuti_idx = shift_map['Cuti']
+    s_cuti_idx = plan.cuti_idx
     requested_cuti_days = {(e, d) for (e, d), s in pre_assignments.items() if s == 'Cuti'}
-    for e_idx in range(len(employees)):
-        for d in days:
+    for e_idx in range(len(plan.employees)):
+        for d in cal.days:
             if (e_idx, d) not in requested_cuti_days:
                 model.Add(shifts[e_idx, d, s_cuti_idx] == 0)
 
-    apply_pre_assignments(model, shifts, pre_assignments, shift_map)
-    apply_core_constraints(model, shifts, employees, days, demand, day_types, shift_map)
-    apply_employee_monthly_rules(model, shifts, employees_data, days, count_as_work_roles, [], employee_map, shift_map, max_work_days, forbidden_shifts_by_group, num_weekends,min_work_days,min_libur,code_to_nip_map)
-    apply_night_shift_rules(model, shifts, employees_data, days, female_employees, night_shifts, employee_map, shift_map)
-    apply_additional_constraints(model, shifts, employees_data, days, day_types, employee_map, shift_map, male_employees, male_bandung_indices, night_shift_indices, public_holidays, target_year, target_month)
-    apply_jakarta_monthly_rules(model, shifts, employees_data, days, day_types, employee_map, shift_map, count_as_work_roles, max_work_days,min_work_days, num_weekends, min_libur, forbidden_shifts_by_group)
-    apply_jakarta_rules(model, shifts, employees_data, days, day_types, employee_map, shift_map)
-    apply_bandung_monthly_rules(model, shifts, employees_data, days, count_as_work_roles, employee_map, shift_map, max_work_days, min_work_days, num_weekends, min_libur, forbidden_shifts_by_group, code_to_nip_map)
-
-    objective_function = apply_soft_constraints(model, shifts, employees_data, days, day_types, employee_map, shift_map)
+    build_seconds, rule_constraints, rule_ranges = {}, {}, {}
+    def timed(rule, *args):
+        constraints_before = len(model.Proto().constraints)
+        started = time.perf_counter()
+        value = rule(model, shifts, *args)
+        build_seconds[rule.__name__] = round(time.perf_counter() - started, 4)
+        constraints_after = len(model.Proto().constraints)
+        rule_constraints[rule.__name__] = constraints_after - constraints_before
+        rule_ranges[rule.__name__] = (constraints_before, constraints_after)
+        return value
+
+    timed(apply_pre_assignments, pre_assignments, plan)
+    demand_rows = timed(apply_core_constraints, plan, cal, daily_demand)
+    timed(apply_employee_monthly_rules, plan, cal)
+    timed(apply_sequence_rules, plan, cal)
+    timed(apply_additional_constraints, plan, cal)
+    timed(apply_jakarta_monthly_rules, plan, cal)
+    timed(apply_site_compositions, plan, cal)
+    timed(apply_bandung_monthly_rules, plan, cal)
+
+    objective_function = timed(apply_soft_constraints, plan, cal, fairness_offsets)
     model.Maximize(objective_function)
+
+    removed_constraints = 0
+    if dedupe_constraints:
+        started = time.perf_counter()
+        # Baris demand dilindungi: batasnya diubah langsung di proto oleh analisis sensitivitas
+        removed_constraints = len(remove_redundant_constraints(model.Proto(), protected=demand_rows.values()))
+        build_seconds['dedupe_constraints'] = round(time.perf_counter() - started, 4)
+    return ScheduleModel(model, shifts, plan, cal, daily_demand, demand_rows, pre_assignments, build_seconds, rule_constraints,
+                         rule_ranges, removed_constraints)
+
+def schedule_from_assignment(built, assignment):
+    """Jadwal per NIP & ringkasan harian dari assignment [e][d] -> s_idx."""
+    plan = built.plan
+    final_schedule_with_nip = {}
+    daily_summary = collections.defaultdict(lambda: collections.defaultdict(int))
+    for e_idx, e_code in enumerate(plan.employees):
+        daily_schedule_list = []
+        for d, s_idx in enumerate(assignment[e_idx]):
+            if s_idx is None:
+                continue
+            s_name = plan.all_shifts[s_idx]
+            daily_schedule_list.append(s_name)
+            daily_summary[str(d + 1)][s_name] += 1
+        final_schedule_with_nip[plan.code_to_nip.get(e_code, e_code)] = daily_schedule_list
+    return final_schedule_with_nip, daily_summary
+
+def solve_one_instance(employees_data, target_year, target_month, pre_assignment_requests, public_holidays, demand, on_progress=None, time_limit_seconds=400.0, solver_options=None, on_metrics=None, on_provisional=None, fairness_offsets=None):
+    """
+    Fungsi ini menjalankan solver untuk SATU KALI proses.
+    solver_options: {"profile": nama profil CP-SAT atau 'auto' (lihat solver_profiles.py),
+                     "seed": seed acak, "deterministic": True untuk hasil yang bisa direproduksi,
+                     "quality": 'draft' / 'standard' / 'optimal' (target gap & budget waktu),
+                     "trace": True untuk menyimpan log pencarian CP-SAT yang sudah diurai,
+                     "lns": True untuk memperbaiki solusi awal dengan LNS (lihat lns_search.py),
+                     "dedupe_constraints": True untuk membuang constraint redundan saat build}
+    on_metrics: dipanggil sekali setelah solve (apa pun statusnya) dengan waktu build per
+                fungsi apply_*, jumlah constraint per aturan, wall time solve & ukuran model.
+    on_provisional: dipanggil sebelum solve dengan jadwal greedy sementara
+                    {"schedule", "summary", "unfilled_demand", "seconds"}.
+    fairness_offsets: offset ledger keadilan {metric: [offset per e_idx]} (lihat fairness_ledger.load_offsets).
+    """
+    solver_options = solver_options or {}
+    started = time.perf_counter()
+
+    built = build_schedule_model(employees_data, target_year, target_month, pre_assignment_requests, public_holidays, demand, fairness_offsets,
+                                 dedupe_constraints=bool(solver_options.get('dedupe_constraints')))
+    model = built.model
+
+    # Jadwal greedy (milidetik): dikirim ke user sebagai jadwal sementara & dipakai sebagai hint CP-SAT
+    greedy_assignment, greedy_report = construct_schedule(built)
+    built.shifts.add_hint(model, greedy_assignment)
+    if on_provisional:
+        provisional_schedule, provisional_summary = schedule_from_assignment(built, greedy_assignment)
+        try:
+            on_provisional(dict(greedy_report, schedule=provisional_schedule, summary=provisional_summary))
+        except Exception as e:
+            print(f"Warning: Gagal mengirim jadwal sementara: {e}")
     
+    model_proto = model.Proto()
+    features = problem_features(len(built.plan.employees), built.cal.num_days, len(built.pre_assignments),
+                                len(model_proto.variables), len(model_proto.constraints) - built.removed_constraints)
+    profile_name, profile_params = resolve_profile(solver_options.get('profile'), features)
+    quality = solver_options.get('quality')
+    budget_seconds, budget_inputs = compute_time_budget(features, quality, profile_params, time_limit_seconds)
+    use_lns = bool(solver_options.get('lns'))
+
     solver = cp_model.CpSolver()
-    solver.parameters.max_time_in_seconds = 400.0
+    apply_profile(solver, profile_params, budget_seconds)
+    deterministic = bool(solver_options.get('deterministic'))
+    # Sebelum batas memori: mode deterministik memakai satu worker
+    apply_seed(solver, solver_options.get('seed'), deterministic, quality)
+    # Worker dikurangi / max_memory_in_mb dipasang agar solve tidak membuat worker kehabisan memori
+    memory = apply_memory_limit(solver, features, solver_options.get('memory_limit_mb'))
+    if memory['status'] != 'ok':
+        print(f"⚠️ Memori terbatas ({memory['status']}): perkiraan {memory['estimated_mb']} MB, "
+              f"batas {memory['limit_mb']} MB, {memory['num_workers']}/{memory['requested_workers']} worker.")
+    gap_target = apply_quality(solver, quality)
     solver.parameters.log_search_progress = False
-    solver.parameters.num_search_workers = 4
-    status = solver.Solve(model)
+    trace_collector = enable_search_trace(solver) if solver_options.get('trace') else None
+    # Dengan LNS, solve penuh hanya mencari jadwal awal: berhenti di LNS_INITIAL_FRACTION budget
+    # jika sudah ada solusi, atau pada solusi pertama setelahnya; sisa budget dipakai iterasi LNS
+    stop_timer = None
+    if use_lns:
+        initial_limit = LNS_INITIAL_FRACTION * (solver.parameters.max_deterministic_time if deterministic else budget_seconds)
+        solution_callback = SolutionProgressCallback(on_progress, record_trace=deterministic, stop_after=initial_limit)
+        if not deterministic:
+            stop_timer = threading.Timer(initial_limit, lambda: solution_callback.solution_count and solver.StopSearch())
+            stop_timer.daemon = True
+            stop_timer.start()
+    else:
+        solution_callback = SolutionProgressCallback(on_progress, record_trace=deterministic) if on_progress or deterministic else None
+    try:
+        status = solver.Solve(model, solution_callback)
+    except MemoryError:
+        print(f"❌ Solve dihentikan: memori tidak cukup (batas {memory['limit_mb']} MB).")
+        return None
+    finally:
+        if stop_timer:
+            stop_timer.cancel()
+
+    if on_metrics:
+        solved = status in [cp_model.OPTIMAL, cp_model.FEASIBLE]
+        on_metrics({
+            "build_seconds": built.build_seconds,
+            "rule_constraints": built.rule_constraints,
+            "solve_seconds": solver.WallTime(),
+            "status": solver.StatusName(status),
+            "memory_status": memory['status'],
+            "num_variables": features['num_variables'],
+            "num_constraints": features['num_constraints'],
+            "objective": solver.ObjectiveValue() if solved else None,
+            "gap": abs(solver.BestObjectiveBound() - solver.ObjectiveValue()) / max(1.0, abs(solver.ObjectiveValue())) if solved else None,
+        })
     
     if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
-        temp_schedule = collections.defaultdict(list)
-        daily_summary = collections.defaultdict(lambda: collections.defaultdict(int))
-        
-        for e_code in employees:
-            e_idx = employee_map[e_code]
-            for d in days:
-                for s_name, s_idx in shift_map.items():
-                    if solver.Value(shifts[(e_idx, d, s_idx)]):
-                        day_str = str(d + 1)
-                        temp_schedule[e_code].append(s_name)
-                        daily_summary[day_str][s_name] += 1
-                        break
-        
-        final_schedule_with_nip = {}
-        for code, daily_schedule_list in temp_schedule.items():
-            real_nip = code_to_nip_map.get(code, code)
-            final_schedule_with_nip[real_nip] = daily_schedule_list
-
-        return { "schedule": final_schedule_with_nip, "summary": daily_summary }
+        assignment = built.shifts.assignment(solver)
+        objective = solver.ObjectiveValue()
+        lns_report = None
+        used_seconds = None
+        if use_lns and status != cp_model.OPTIMAL:
+            # Mode deterministik: porsi LNS tetap agar jumlah iterasinya tidak bergantung wall-time
+            lns_seconds = budget_seconds * (1 - LNS_INITIAL_FRACTION) if deterministic else budget_seconds - solver.WallTime()
+            assignment, objective, lns_report = improve_schedule(
+                built, assignment, objective,
+                time_limit_seconds=lns_seconds,
+                best_bound=solver.BestObjectiveBound(),
+                seed=solver.parameters.random_seed,
+                num_workers=solver.parameters.num_search_workers,
+                deterministic=deterministic,
+                on_progress=on_progress,
+            )
+            used_seconds = solver.WallTime() + lns_report['elapsed_seconds']
+        final_schedule_with_nip, daily_summary = schedule_from_assignment(built, assignment)
+
+        result = {
+            "schedule": final_schedule_with_nip,
+            "summary": daily_summary,
+            "status": solver.StatusName(status),
+            "objective": objective,
+            "best_bound": solver.BestObjectiveBound(),
+            "runtime_seconds": round(time.perf_counter() - started, 2) if lns_report else round(solver.WallTime(), 2),
+            "solver_profile": profile_name,
+            "time_budget": time_budget_report(solver, status, quality, budget_seconds, gap_target, objective, used_seconds, budget_inputs),
+            "memory": memory,
+            "greedy_hint": greedy_report,
+        }
+        if lns_report:
+            result["lns"] = lns_report
+        if trace_collector:
+            result["search_trace"] = build_search_trace(trace_collector)
+        if deterministic:
+            result.update({
+                "seed": solver.parameters.random_seed,
+                "deterministic_time": round(solver.ResponseProto().deterministic_time, 3),
+                "solve_trace": solution_callback.trace,
+            })
+        return result
     else:
         return None
 
-def run_simulation_for_api(base_requests, target_year, target_month, public_holidays, demand, num_runs=10):
+def run_simulation_for_api(base_requests, target_year, target_month, public_holidays, demand, num_runs=10, on_progress=None, time_limit_seconds=400.0, solver_options=None, on_metrics=None, on_provisional=None, fairness_offsets=None, employees_data=None):
+    """employees_data: roster dinamis (lihat rule_plan.normalize_roster); default roster konfigurasi."""
     print(f"Memulai simulasi untuk {num_runs} kali...")
+    employees_data = employees_data or roster_employees_data()
     successful_schedules = []
     
     for i in range(num_runs):
         print(f"--- Menjalankan Simulasi #{i+1}/{num_runs} ---")
+        run_progress = (lambda info, run=i+1: on_progress(dict(info, simulation_run=run))) if on_progress else None
+        # Jadwal sementara cukup dikirim sekali (heuristik greedy sama untuk setiap run)
+        run_provisional = on_provisional if i == 0 else None
+        run_options = solver_options
+        if solver_options and solver_options.get('seed') is not None:
+            # Setiap run memakai seed berbeda namun tetap bisa direproduksi
+            run_options = dict(solver_options, seed=solver_options['seed'] + i)
         
         schedule_result = solve_one_instance(
-            employees_data=[ (f'B{i}', 'FB') for i in range(1, 12) ] + [(f'B{i}', 'MB') for i in range(12, 31)] + [('J1', 'MJ'), ('J2', 'MJ')] + [('J3', 'CJ')],
+            employees_data=employees_data,
             target_year=target_year,
             target_month=target_month,
             pre_assignment_requests=base_requests,
             public_holidays=public_holidays,
-            demand=demand
+            demand=demand,
+            on_progress=run_progress,
+            time_limit_seconds=time_limit_seconds,
+            solver_options=run_options,
+            on_metrics=on_metrics,
+            on_provisional=run_provisional,
+            fairness_offsets=fairness_offsets
         )
         
         if schedule_result:
@@ -647,7 +650,7 @@ def run_simulation_for_api(base_requests, target_year, target_month, public_holi
 # TITIK MASUK UTAMA PROGRAM
 # =================================================================================
 if __name__ == '__main__':
-    import pandas as pd
+    from schedule_export import write_xlsx
     target_year_num = 2025
     target_month_num = 9
     
@@ -698,9 +701,5 @@ if __name__ == '__main__':
         print(f"✅ Hasil simulasi lengkap berhasil disimpan ke file: {output_filename_json}")
 
         output_filename_excel = 'hasil_jadwal.xlsx'
-        schedule_data = list_of_valid_schedules[0]['result']['schedule']
-        df = pd.DataFrame.from_dict(schedule_data, orient='index')
-        df.columns = [i + 1 for i in df.columns]
-        month_name = calendar.month_name[target_month_num]
-        df.to_excel(output_filename_excel, sheet_name=f'Jadwal Bulan {month_name}')
+        write_xlsx(list_of_valid_schedules, output_filename_excel)
         print(f"✅ Tabel jadwal berhasil disimpan ke file: {output_filename_excel}")
@@ -0,0 +1,136 @@
+# file: solver_metrics.py
+
+import json
+
+import redis
+
+from task_events import get_redis
+
+# =================================================================================
+# METRIK PROMETHEUS (DIKUMPULKAN WORKER, DISAJIKAN API)
+# =================================================================================
+# Worker menulis metrik ke hash Redis; API merender semuanya dalam format teks
+# Prometheus di GET /metrics. Setiap metrik disimpan di satu hash dengan field
+# '<label JSON>|<suffix>' sehingga beberapa worker bisa menambah nilai secara atomik.
+
+METRICS_KEY_PREFIX = 'jadwal:metrics:'
+
+HISTOGRAMS = {
+    'jadwal_queue_latency_seconds': ("Waktu tunggu tugas di antrian sebelum dikerjakan worker",
+                                     (0.5, 1, 5, 15, 30, 60, 120, 300, 600, 1800)),
+    'jadwal_model_build_seconds': ("Waktu membangun model per fungsi aturan apply_*",
+                                   (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)),
+    'jadwal_solve_seconds': ("Wall time solver.Solve",
+                             (1, 5, 10, 30, 60, 120, 240, 400, 600)),
+}
+COUNTERS = {
+    'jadwal_solve_status_total': "Jumlah solve per status CP-SAT (OPTIMAL/FEASIBLE/INFEASIBLE/UNKNOWN)",
+    'jadwal_solve_memory_status_total': "Jumlah solve per status memori (ok/degraded/memory-limited)",
+}
+GAUGES = {
+    'jadwal_model_variables': "Jumlah variabel model CP-SAT terakhir",
+    'jadwal_model_constraints': "Jumlah constraint model CP-SAT terakhir",
+    'jadwal_rule_constraints': "Jumlah constraint yang ditambahkan per fungsi aturan apply_* (model terakhir)",
+    'jadwal_last_objective': "Objective solve terakhir per kelas tugas",
+    'jadwal_last_gap': "Relative gap solve terakhir per kelas tugas",
+}
+
+
+def _field(labels, suffix):
+    return f"{json.dumps(labels or {}, sort_keys=True)}|{suffix}"
+
+
+def _format_labels(labels, extra=None):
+    merged = dict(labels, **(extra or {}))
+    if not merged:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in sorted(merged.items())) + '}'
+
+
+def observe(name, value, labels=None, pipe=None):
+    """Menambahkan satu observasi ke histogram."""
+    client = pipe if pipe is not None else get_redis()
+    key = METRICS_KEY_PREFIX + name
+    for bound in HISTOGRAMS[name][1]:
+        if value <= bound:
+            client.hincrby(key, _field(labels, f"le={bound}"), 1)
+    client.hincrby(key, _field(labels, "le=+Inf"), 1)
+    client.hincrbyfloat(key, _field(labels, "sum"), value)
+    client.hincrby(key, _field(labels, "count"), 1)
+
+
+def increment(name, labels=None, amount=1, pipe=None):
+    client = pipe if pipe is not None else get_redis()
+    client.hincrby(METRICS_KEY_PREFIX + name, _field(labels, "value"), amount)
+
+
+def set_gauge(name, value, labels=None, pipe=None):
+    client = pipe if pipe is not None else get_redis()
+    client.hset(METRICS_KEY_PREFIX + name, _field(labels, "value"), value)
+
+
+def record_queue_latency(job_class, seconds):
+    try:
+        observe('jadwal_queue_latency_seconds', seconds, {"job_class": job_class})
+    except redis.RedisError as e:
+        print(f"Warning: Gagal mencatat metrik antrian: {e}")
+
+
+def record_solve(job_class, info):
+    """
+    Mencatat metrik satu solve (dipanggil worker lewat on_metrics dari solve_one_instance).
+    info: {"build_seconds": {rule: detik}, "rule_constraints": {rule: jumlah}, "solve_seconds",
+           "status", "memory_status", "num_variables", "num_constraints", "objective", "gap"}
+    """
+    labels = {"job_class": job_class}
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for rule, seconds in info.get('build_seconds', {}).items():
+            observe('jadwal_model_build_seconds', seconds, {"rule": rule}, pipe)
+        for rule, count in info.get('rule_constraints', {}).items():
+            set_gauge('jadwal_rule_constraints', count, {"rule": rule}, pipe)
+        observe('jadwal_solve_seconds', info['solve_seconds'], labels, pipe)
+        increment('jadwal_solve_status_total', dict(labels, status=info['status']), pipe=pipe)
+        if info.get('memory_status'):
+            increment('jadwal_solve_memory_status_total', dict(labels, status=info['memory_status']), pipe=pipe)
+        set_gauge('jadwal_model_variables', info['num_variables'], labels, pipe)
+        set_gauge('jadwal_model_constraints', info['num_constraints'], labels, pipe)
+        if info.get('objective') is not None:
+            set_gauge('jadwal_last_objective', info['objective'], labels, pipe)
+            set_gauge('jadwal_last_gap', info['gap'], labels, pipe)
+        pipe.execute()
+    except redis.RedisError as e:
+        print(f"Warning: Gagal mencatat metrik solve: {e}")
+
+
+def _decode(raw):
+    return raw.decode() if isinstance(raw, bytes) else raw
+
+
+def _read_metric(name):
+    """{label JSON: {suffix: nilai}} untuk satu metrik."""
+    series = {}
+    for field, value in get_redis().hgetall(METRICS_KEY_PREFIX + name).items():
+        labels_json, suffix = _decode(field).rsplit('|', 1)
+        series.setdefault(labels_json, {})[suffix] = _decode(value)
+    return series
+
+
+def render_prometheus():
+    """Semua metrik dalam format teks Prometheus (text/plain; version=0.0.4)."""
+    lines = []
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for labels_json, values in sorted(_read_metric(name).items()):
+            labels = json.loads(labels_json)
+            for bound in [str(b) for b in buckets] + ['+Inf']:
+                count = values.get(f"le={bound}", 0)
+                lines.append(f"{name}_bucket{_format_labels(labels, {'le': bound})} {count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {values.get('sum', 0)}")
+            lines.append(f"{name}_count{_format_labels(labels)} {values.get('count', 0)}")
+    for metric_type, metrics in (('counter', COUNTERS), ('gauge', GAUGES)):
+        for name, help_text in metrics.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+            for labels_json, values in sorted(_read_metric(name).items()):
+                lines.append(f"{name}{_format_labels(json.loads(labels_json))} {values['value']}")
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,309 @@
+# file: solver_profiles.py
+
+import json
+import os
+from functools import lru_cache
+
+# =================================================================================
+# PROFIL PARAMETER CP-SAT
+# =================================================================================
+# Setiap profil mengatur jumlah worker, tingkat linearisasi, strategi branching,
+# deteksi simetri, presolve, dan batas waktu. Profil 'auto' (default) memilih profil dari
+# tabel hasil tuning offline (solver_profiles_tuned.json, lihat tune_solver_profiles.py)
+# berdasarkan ukuran masalah (karyawan × hari) dan kepadatan request.
+# ortools hanya diimpor di fungsi yang menyentuh CpSolver agar API (yang hanya
+# memvalidasi nama profil) tidak ikut memuatnya.
+SOLVER_PROFILES = {
+    # Cepat menemukan jadwal layak; cocok untuk bulan ringan & re-plan interaktif
+    'fast-feasible': {
+        'num_search_workers': 4,
+        'linearization_level': 0,
+        'search_branching': 'AUTOMATIC_SEARCH',
+        'symmetry_level': 0,
+        'cp_model_presolve': True,
+        'max_presolve_iterations': 1,
+        'max_time_in_seconds': 30.0,
+    },
+    'balanced': {
+        'num_search_workers': 4,
+        'linearization_level': 1,
+        'search_branching': 'AUTOMATIC_SEARCH',
+        'symmetry_level': 2,
+        'cp_model_presolve': True,
+        'max_presolve_iterations': 3,
+        'max_time_in_seconds': 120.0,
+    },
+    # Berusaha membuktikan optimalitas; untuk bulan padat cuti / request
+    'prove-optimal': {
+        'num_search_workers': 8,
+        'linearization_level': 2,
+        'search_branching': 'PORTFOLIO_SEARCH',
+        'symmetry_level': 4,
+        'cp_model_presolve': True,
+        'max_presolve_iterations': 3,
+        'max_time_in_seconds': 400.0,
+    },
+}
+AUTO_PROFILE = 'auto'
+DEFAULT_PROFILE = AUTO_PROFILE
+
+# Tabel pemilihan profil: aturan pertama yang cocok dipakai (None = tanpa batas). Tabel
+# default hanya dipakai jika solver_profiles_tuned.json tidak ada atau rusak.
+PROFILE_TABLE_PATH = os.environ.get(
+    'SOLVER_PROFILE_TABLE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'solver_profiles_tuned.json'))
+DEFAULT_PROFILE_TABLE = [
+    {"max_cells": 1200, "max_request_density": 0.02, "profile": 'fast-feasible'},
+    {"max_cells": None, "max_request_density": 0.10, "profile": 'balanced'},
+    {"max_cells": None, "max_request_density": None, "profile": 'prove-optimal'},
+]
+
+# =================================================================================
+# BUDGET WAKTU BERDASARKAN UKURAN MODEL & TINGKAT KUALITAS
+# =================================================================================
+# Budget = (dasar + detik per 1000 item model) × (1 + bobot × kepadatan request) × faktor
+# kualitas, dibatasi batas waktu profil dan kelas tugas. Item model = variabel + constraint;
+# jika model belum dibangun (num_variables = 0, mis. di tuner) diperkirakan dari jumlah sel
+# (karyawan × hari). Solver berhenti lebih awal begitu selisih objective terhadap bound
+# (relative gap) mencapai target kualitas.
+# Kalibrasi (benchmarks/2025-09.json: 990 sel, 26.769 variabel, 20.523 constraint, kepadatan
+# 0,015; profil balanced, 1 CPU): solusi pertama ±17 detik, objective 5.000 pada ±30 detik,
+# 5.094 pada ±57 detik dan 5.119 pada ±96 detik. Konstanta dipilih agar 'standard' mendapat
+# ±60 detik (sisa perbaikan < 1%) dan 'draft' ±24 detik (jadwal layak pertama).
+# deterministic_time: batas solve dalam mode deterministik (lihat apply_seed).
+QUALITY_LEVELS = {
+    'draft': {'relative_gap_limit': 0.05, 'budget_factor': 0.4, 'deterministic_time': 10.0},
+    'standard': {'relative_gap_limit': 0.01, 'budget_factor': 1.0, 'deterministic_time': 60.0},
+    'optimal': {'relative_gap_limit': 0.0, 'budget_factor': 3.0, 'deterministic_time': 240.0},
+}
+DEFAULT_QUALITY = 'standard'
+BUDGET_BASE_SECONDS = 5.0
+BUDGET_SECONDS_PER_1K_ITEMS = 0.85
+BUDGET_REQUEST_DENSITY_WEIGHT = 20.0
+# Perkiraan item model per sel (benchmark: 47.292 item / 990 sel)
+BUDGET_ITEMS_PER_CELL = 48
+MIN_TIME_BUDGET_SECONDS = 5.0
+
+# =================================================================================
+# MODE DETERMINISTIK
+# =================================================================================
+# CP-SAT hanya deterministik dengan satu worker atau dengan interleave_search. Pada model
+# 33 karyawan × 30 hari, pencarian interleave 4 worker belum menemukan solusi setelah ±180
+# deterministic time, sedangkan satu worker tanpa linearisasi menemukan solusi pertama
+# sebelum 5 deterministic time dan mendatar setelah ±20. Batas deterministic time per
+# kualitas dikalibrasi dari pengukuran tersebut dan tidak bergantung budget wall-time;
+# budget wall-time tetap batas atas.
+DETERMINISTIC_PARAMS = {
+    'num_search_workers': 1,
+    'linearization_level': 0,
+    'interleave_search': False,
+}
+
+# =================================================================================
+# BUDGET MEMORI
+# =================================================================================
+# Perkiraan memori puncak satu solve = dasar proses + model & presolve bersama + salinan
+# per worker CP-SAT (dikalibrasi dari model 33 karyawan × 30 hari: ±170 MB dengan 1
+# worker, ±265 MB dengan 4, ±350 MB dengan 8). Jika perkiraan melebihi batas memori
+# tugas, jumlah worker dikurangi ('degraded'); jika 1 worker pun tidak muat, solver tetap
+# berjalan dengan max_memory_in_mb dan berhenti rapi saat batas tercapai ('memory-limited').
+MEMORY_BASE_MB = 100.0
+MEMORY_MB_PER_1K_ITEMS = 1.0
+MEMORY_MB_PER_1K_ITEMS_PER_WORKER = 0.3
+
+
+def validate_profile_name(name):
+    """Memvalidasi nama profil dari payload. Melempar ValueError jika tidak dikenal."""
+    if name is None or name == AUTO_PROFILE or name in SOLVER_PROFILES:
+        return name
+    raise ValueError(f"solver_profile '{name}' tidak dikenal. Pilihan: {', '.join([AUTO_PROFILE, *SOLVER_PROFILES])}")
+
+
+def validate_quality(quality):
+    """Memvalidasi tingkat kualitas dari payload. Melempar ValueError jika tidak dikenal."""
+    if quality is None or quality in QUALITY_LEVELS:
+        return quality
+    raise ValueError(f"quality '{quality}' tidak dikenal. Pilihan: {', '.join(QUALITY_LEVELS)}")
+
+
+def problem_features(num_employees, num_days, num_requests, num_variables=0, num_constraints=0):
+    """Ciri masalah yang dipakai untuk memilih profil dan budget waktu."""
+    cells = num_employees * num_days
+    return {
+        "cells": cells,
+        "request_density": round(num_requests / cells, 4) if cells else 0.0,
+        "num_variables": num_variables,
+        "num_constraints": num_constraints,
+    }
+
+
+@lru_cache(maxsize=None)
+def load_profile_table(path=None):
+    """Tabel hasil tuning offline; kembali ke tabel default jika file belum ada."""
+    path = path or PROFILE_TABLE_PATH
+    try:
+        with open(path, encoding='utf-8') as f:
+            table = json.load(f).get('rules', [])
+    except (OSError, ValueError):
+        return DEFAULT_PROFILE_TABLE
+    return [rule for rule in table if rule.get('profile') in SOLVER_PROFILES] or DEFAULT_PROFILE_TABLE
+
+
+def _rule_matches(rule, features):
+    return all(rule.get(limit) is None or features[feature] <= rule[limit]
+               for limit, feature in (('max_cells', 'cells'), ('max_request_density', 'request_density')))
+
+
+def select_profile(features, table=None):
+    """Memilih nama profil untuk masalah dengan ciri `features`."""
+    table = table if table is not None else load_profile_table()
+    for rule in table:
+        if _rule_matches(rule, features):
+            return rule['profile']
+    # Tabel tanpa aturan penutup: pakai aturan untuk masalah terbesar
+    return table[-1]['profile']
+
+
+def resolve_profile(name, features):
+    """Mengubah nama profil (atau 'auto' / None = DEFAULT_PROFILE) menjadi (nama_profil, parameter)."""
+    name = name or DEFAULT_PROFILE
+    if name == AUTO_PROFILE:
+        name = select_profile(features)
+    return name, SOLVER_PROFILES[name]
+
+
+def apply_profile(solver, params, time_limit_seconds=None):
+    """
+    Menerapkan parameter profil ke CpSolver. Batas waktu profil tidak boleh melebihi
+    batas waktu kelas tugas (time_limit_seconds) agar Celery tidak menghentikan tugas.
+    """
+    from ortools.sat.python import cp_model
+
+    for key, value in params.items():
+        if key == 'search_branching':
+            value = getattr(cp_model, value)
+        setattr(solver.parameters, key, value)
+    if time_limit_seconds is not None:
+        solver.parameters.max_time_in_seconds = min(params['max_time_in_seconds'], time_limit_seconds)
+    return solver.parameters.max_time_in_seconds
+
+
+def compute_time_budget(features, quality=None, profile_params=None, time_limit_seconds=None):
+    """
+    Budget waktu solve (detik) untuk masalah dengan ciri `features`. Mengembalikan
+    (budget, inputs); inputs berisi ciri & faktor yang menghasilkan budget, untuk dilaporkan
+    di time_budget_report.
+    """
+    level = QUALITY_LEVELS[quality or DEFAULT_QUALITY]
+    model_items = features['num_variables'] + features['num_constraints']
+    estimated = not model_items
+    if estimated:
+        model_items = BUDGET_ITEMS_PER_CELL * features['cells']
+    size_seconds = BUDGET_BASE_SECONDS + BUDGET_SECONDS_PER_1K_ITEMS * model_items / 1000
+    density_factor = 1 + BUDGET_REQUEST_DENSITY_WEIGHT * features['request_density']
+    budget = max(MIN_TIME_BUDGET_SECONDS, size_seconds * density_factor * level['budget_factor'])
+    ceilings = [c for c in ((profile_params or {}).get('max_time_in_seconds'), time_limit_seconds) if c is not None]
+    ceiling = min(ceilings) if ceilings else None
+    inputs = {
+        "cells": features['cells'],
+        "request_density": features['request_density'],
+        "num_variables": features['num_variables'],
+        "num_constraints": features['num_constraints'],
+        "model_items": model_items,
+        "model_items_estimated": estimated,
+        "size_seconds": round(size_seconds, 2),
+        "density_factor": round(density_factor, 3),
+        "budget_factor": level['budget_factor'],
+        "uncapped_seconds": round(budget, 1),
+        "ceiling_seconds": ceiling,
+    }
+    if ceiling is not None:
+        budget = min(budget, ceiling)
+    return round(budget, 1), inputs
+
+
+def apply_quality(solver, quality=None):
+    """Solver berhenti begitu relative gap mencapai target tingkat kualitas."""
+    gap_target = QUALITY_LEVELS[quality or DEFAULT_QUALITY]['relative_gap_limit']
+    solver.parameters.relative_gap_limit = gap_target
+    return gap_target
+
+
+def time_budget_report(solver, status, quality, budget_seconds, gap_target, objective=None, used_seconds=None, inputs=None):
+    """
+    Ringkasan pemakaian budget untuk dilaporkan di hasil (perencanaan kapasitas). Setelah LNS,
+    objective akhir & total waktu (solve awal + LNS) dikirim lewat objective / used_seconds;
+    inputs adalah rincian budget dari compute_time_budget.
+    """
+    from ortools.sat.python import cp_model
+
+    objective = solver.ObjectiveValue() if objective is None else objective
+    bound = solver.BestObjectiveBound()
+    gap = abs(bound - objective) / max(1.0, abs(objective))
+    if status == cp_model.OPTIMAL:
+        stop_reason = 'optimal'
+    elif gap <= gap_target:
+        stop_reason = 'gap_target'
+    elif solver.ResponseProto().deterministic_time >= solver.parameters.max_deterministic_time:
+        stop_reason = 'deterministic_time'
+    else:
+        stop_reason = 'time_limit'
+    used_seconds = round(solver.WallTime() if used_seconds is None else used_seconds, 2)
+    return {
+        "quality": quality or DEFAULT_QUALITY,
+        "budget_seconds": budget_seconds,
+        "used_seconds": used_seconds,
+        "utilization": round(used_seconds / budget_seconds, 3) if budget_seconds else None,
+        "gap_target": gap_target,
+        "gap": round(gap, 5),
+        "stop_reason": stop_reason,
+        "inputs": inputs,
+    }
+
+
+def apply_seed(solver, seed=None, deterministic=False, quality=None):
+    """
+    Mengatur seed acak dan mode deterministik. Dalam mode deterministik CP-SAT dijalankan
+    dengan DETERMINISTIC_PARAMS dan dihentikan oleh batas 'deterministic time' tingkat
+    kualitas sehingga input & seed yang sama selalu menghasilkan jadwal yang sama. Batas
+    wall-time yang sudah terpasang (budget) tidak diubah; run yang berhenti karena batas itu
+    tidak dijamin sama antar run.
+    """
+    if seed is not None:
+        solver.parameters.random_seed = seed
+    if deterministic:
+        for key, value in DETERMINISTIC_PARAMS.items():
+            setattr(solver.parameters, key, value)
+        solver.parameters.max_deterministic_time = QUALITY_LEVELS[quality or DEFAULT_QUALITY]['deterministic_time']
+
+
+def estimate_memory_mb(features, num_workers):
+    """Perkiraan memori puncak (MB) solve dengan `num_workers` worker CP-SAT."""
+    items_k = (features['num_variables'] + features['num_constraints']) / 1000
+    return round(MEMORY_BASE_MB + items_k * (MEMORY_MB_PER_1K_ITEMS + MEMORY_MB_PER_1K_ITEMS_PER_WORKER * max(1, num_workers)), 1)
+
+
+def apply_memory_limit(solver, features, memory_limit_mb=None):
+    """
+    Menyesuaikan jumlah worker dengan batas memori tugas dan memasang max_memory_in_mb.
+    Mengembalikan laporan {status: 'ok'/'degraded'/'memory-limited', limit_mb,
+    estimated_mb, requested_workers, num_workers} untuk disertakan di hasil.
+    """
+    requested = max(1, solver.parameters.num_search_workers)
+    workers = requested
+    status = 'ok'
+    if memory_limit_mb is not None:
+        while workers > 1 and estimate_memory_mb(features, workers) > memory_limit_mb:
+            workers -= 1
+        if estimate_memory_mb(features, workers) > memory_limit_mb:
+            status = 'memory-limited'
+        elif workers < requested:
+            status = 'degraded'
+        solver.parameters.num_search_workers = workers
+        solver.parameters.max_memory_in_mb = max(1, int(memory_limit_mb))
+    return {
+        "status": status,
+        "limit_mb": memory_limit_mb,
+        "estimated_mb": estimate_memory_mb(features, workers),
+        "requested_workers": requested,
+        "num_workers": workers,
+    }
@@ -0,0 +1,103 @@
+# file: task_events.py
+
+import os
+import json
+import time
+
+import redis
+
+# =================================================================================
+# EVENT STATUS TUGAS (REDIS PUB/SUB)
+# =================================================================================
+# Worker mem-publish setiap perubahan state dan setiap solusi yang membaik ke channel
+# per task. API meneruskannya ke client lewat SSE / long-poll, sehingga client tidak
+# perlu lagi polling /check-status setiap beberapa detik.
+
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://redis:6379/0')
+
+EVENT_CHANNEL_PREFIX = 'jadwal:events:'
+LAST_EVENT_PREFIX = 'jadwal:last-event:'
+LAST_EVENT_TTL_SECONDS = 24 * 60 * 60
+PROVISIONAL_PREFIX = 'jadwal:provisional:'
+TERMINAL_EVENTS = {'SUCCESS', 'NO_SOLUTION', 'FAILURE'}
+
+_redis_client = None
+
+
+def get_redis():
+    """Koneksi Redis bersama (dibuat sekali per proses)."""
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(REDIS_URL)
+    return _redis_client
+
+
+def publish_event(task_id, event, data=None):
+    """Mengirim satu event untuk task_id. Event terakhir juga disimpan untuk subscriber yang telat."""
+    message = json.dumps({"event": event, "data": data or {}, "timestamp": time.time()})
+    try:
+        client = get_redis()
+        client.set(LAST_EVENT_PREFIX + task_id, message, ex=LAST_EVENT_TTL_SECONDS)
+        client.publish(EVENT_CHANNEL_PREFIX + task_id, message)
+    except redis.RedisError as e:
+        # Event hanya pelengkap; kegagalan publish tidak boleh menggagalkan proses solving
+        print(f"Warning: Gagal mengirim event '{event}' untuk task {task_id}: {e}")
+
+
+def publish_provisional(task_id, data):
+    """
+    Mengirim jadwal sementara (heuristik greedy) sebagai event 'PROVISIONAL'. Jadwal juga
+    disimpan terpisah karena event terakhir akan tertimpa progres solver berikutnya.
+    """
+    try:
+        get_redis().set(PROVISIONAL_PREFIX + task_id, json.dumps(data), ex=LAST_EVENT_TTL_SECONDS)
+    except redis.RedisError as e:
+        print(f"Warning: Gagal menyimpan jadwal sementara untuk task {task_id}: {e}")
+    publish_event(task_id, 'PROVISIONAL', data)
+
+
+def get_provisional(task_id):
+    """Jadwal sementara terakhir untuk task_id (atau None)."""
+    raw = get_redis().get(PROVISIONAL_PREFIX + task_id)
+    return json.loads(raw) if raw else None
+
+
+def get_last_event(task_id):
+    """Mengambil event terakhir yang pernah dikirim untuk task_id (atau None)."""
+    raw = get_redis().get(LAST_EVENT_PREFIX + task_id)
+    return json.loads(raw) if raw else None
+
+
+def iter_events(task_id, timeout, heartbeat=None):
+    """
+    Generator event untuk task_id sampai event terminal diterima atau timeout habis.
+    Jika 'heartbeat' diisi (detik), None akan di-yield secara berkala saat tidak ada event.
+    """
+    pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(EVENT_CHANNEL_PREFIX + task_id)
+    try:
+        # Event yang terkirim sebelum subscribe tidak hilang: kirim ulang event terakhir
+        last_event = get_last_event(task_id)
+        if last_event:
+            yield last_event
+            if last_event["event"] in TERMINAL_EVENTS:
+                return
+
+        deadline = time.monotonic() + timeout
+        last_yield = time.monotonic()
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            message = pubsub.get_message(timeout=min(remaining, 1.0))
+            if message and message.get('type') == 'message':
+                event = json.loads(message['data'])
+                last_yield = time.monotonic()
+                yield event
+                if event["event"] in TERMINAL_EVENTS:
+                    return
+            elif heartbeat and time.monotonic() - last_yield >= heartbeat:
+                last_yield = time.monotonic()
+                yield None
+    finally:
+        pubsub.close()
@@ -0,0 +1,61 @@
+# file: tests/test_result_codec.py
+
+import json
+import os
+
+from result_codec import count_runs, decode_runs, dense_summary, encode_runs, is_compact
+
+RESP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'resp.json')
+
+
+def _runs():
+    return [
+        {"simulation_run": 1, "result": {
+            "schedule": {"400192": ["P6", "Libur", "M"], "400091": ["Libur", "P7", "Cuti"]},
+            "summary": {"1": {"P6": 1, "Libur": 1}, "2": {"Libur": 1, "P7": 1}, "3": {"M": 1, "Cuti": 1}},
+            "objective": 42.0, "solver_profile": "balanced"}},
+        {"simulation_run": 2, "result": {
+            # Format lama: jadwal per karyawan sebagai {hari: shift}
+            "schedule": {"400192": {"2": "P8", "1": "SOCM", "3": "Libur"}, "400091": {"1": "P6", "2": "P6", "3": "P6"}},
+            "summary": {"1": {"SOCM": 1, "P6": 1}, "2": {"P8": 1, "P6": 1}, "3": {"Libur": 1, "P6": 1}}}},
+    ]
+
+
+def test_round_trip_keeps_schedule_summary_and_metadata():
+    runs = _runs()
+    payload = encode_runs(runs)
+    assert is_compact(payload)
+    assert count_runs(payload) == 2
+    decoded = decode_runs(json.loads(json.dumps(payload)))
+    assert [run["simulation_run"] for run in decoded] == [1, 2]
+    assert decoded[0]["result"] == runs[0]["result"]
+    assert decoded[1]["result"]["schedule"] == {"400192": ["SOCM", "P8", "Libur"], "400091": ["P6", "P6", "P6"]}
+    assert decoded[1]["result"]["summary"] == runs[1]["result"]["summary"]
+
+
+def test_encode_is_idempotent_and_decode_passes_verbose_through():
+    payload = encode_runs(_runs())
+    assert encode_runs(payload) is payload
+    runs = _runs()
+    assert decode_runs(runs) is runs
+    assert decode_runs(None) == []
+
+
+def test_dense_summary_matches_decoded_summary():
+    payload = encode_runs(_runs())
+    shifts = payload["shifts"]
+    for dense, run in zip(dense_summary(payload), decode_runs(payload)):
+        for d, counts in enumerate(dense):
+            assert {shifts[s]: c for s, c in enumerate(counts) if c} == run["result"]["summary"][str(d + 1)]
+
+
+def test_round_trip_on_stored_result():
+    with open(RESP_PATH, encoding='utf-8') as f:
+        runs = json.load(f)
+    decoded = decode_runs(encode_runs(runs))
+    for original, run in zip(runs, decoded):
+        # resp.json masih memakai format lama {hari: shift}; hasil decode selalu berupa list per hari
+        assert run["result"]["schedule"] == {key: [days[day] for day in sorted(days, key=int)]
+                                             for key, days in original["result"]["schedule"].items()}
+        assert run["result"]["summary"] == {day: {name: n for name, n in counts.items() if n}
+                                            for day, counts in original["result"]["summary"].items()}
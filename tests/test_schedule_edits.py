@@ -0,0 +1,145 @@
+# file: tests/test_schedule_edits.py
+
+import json
+import os
+
+import pytest
+import redis
+
+import schedule_edits
+from rule_plan import compile_rule_plan
+
+BENCHMARK_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', '2025-09.json')
+TASK_ID = 'task-edit'
+
+
+class FakeRedis:
+    """Redis di memori dengan WATCH/MULTI/EXEC optimistis (cukup untuk schedule_edits)."""
+
+    def __init__(self):
+        self.data, self.writes = {}, {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.writes[key] = self.writes.get(key, 0) + 1
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client, self.watched, self.queued = client, {}, None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def watch(self, key):
+        self.watched[key] = self.client.writes.get(key, 0)
+
+    def get(self, key):
+        return self.client.get(key)
+
+    def multi(self):
+        self.queued = []
+
+    def set(self, key, value, ex=None):
+        self.queued.append((key, value))
+
+    def execute(self):
+        if any(self.client.writes.get(key, 0) != count for key, count in self.watched.items()):
+            raise redis.WatchError()
+        for key, value in self.queued:
+            self.client.set(key, value)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(schedule_edits, 'get_redis', lambda: fake)
+    schedule_edits._evaluators.clear()
+    with open(BENCHMARK_PATH, encoding='utf-8') as f:
+        instance = json.load(f)
+    schedule_edits.save_context(TASK_ID, (instance['requests'], instance['year'], instance['month'],
+                                          instance['public_holidays'], instance['demand']))
+    return fake
+
+
+@pytest.fixture
+def nips():
+    plan = compile_rule_plan()
+    return [plan.code_to_nip[code] for code in plan.employees]
+
+
+def _runs(nips):
+    return [{"simulation_run": 1, "result": {"schedule": {nip: ['Libur'] * 30 for nip in nips}}}]
+
+
+def test_versions_increase_and_previous_shift_is_reported(client, nips):
+    first = schedule_edits.apply_edit(TASK_ID, 1, [{"nip": nips[0], "day": 3, "shift": 'P7'}], lambda: _runs(nips))
+    assert first["version"] == 1
+    assert first["changes"] == [{"nip": nips[0], "day": 3, "shift": 'P7', "previous": 'Libur'}]
+
+    # Edit berikutnya memakai sesi tersimpan, bukan hasil solver
+    second = schedule_edits.apply_edit(TASK_ID, 1, [{"nip": nips[0], "day": 3, "shift": 'P8'}], lambda: pytest.fail("load_runs"))
+    assert second["version"] == 2
+    assert second["changes"][0]["previous"] == 'P7'
+
+    current = schedule_edits.get_edited_schedule(TASK_ID, 1, lambda: pytest.fail("load_runs"))
+    assert current["version"] == 2
+    assert current["schedule"][nips[0]][2] == 'P8'
+
+
+def test_concurrent_write_raises_conflict_and_retry_uses_new_version(client, nips):
+    key = schedule_edits._session_key(TASK_ID, 1)
+    other = {nip: ['Libur'] * 30 for nip in nips}
+    other[nips[1]][0] = 'M'
+
+    def load_runs_while_other_process_saves():
+        # Proses lain menyimpan edit di antara WATCH dan EXEC
+        client.set(key, json.dumps({"version": 5, "schedule": other}))
+        return _runs(nips)
+
+    with pytest.raises(schedule_edits.EditConflictError):
+        schedule_edits.apply_edit(TASK_ID, 1, [{"nip": nips[0], "day": 1, "shift": 'P7'}], load_runs_while_other_process_saves)
+    assert (TASK_ID, 1) not in schedule_edits._evaluators
+    assert json.loads(client.get(key))["version"] == 5
+
+    retry = schedule_edits.apply_edit(TASK_ID, 1, [{"nip": nips[0], "day": 1, "shift": 'P7'}], lambda: pytest.fail("load_runs"))
+    assert retry["version"] == 6
+    saved = json.loads(client.get(key))["schedule"]
+    assert saved[nips[1]][0] == 'M' and saved[nips[0]][0] == 'P7'
+
+
+def test_stale_cached_evaluator_is_rebuilt_from_redis(client, nips):
+    schedule_edits.apply_edit(TASK_ID, 1, [{"nip": nips[0], "day": 1, "shift": 'P7'}], lambda: _runs(nips))
+    # Proses lain menyimpan versi yang lebih baru; cache proses ini (versi 1) tidak boleh dipakai
+    other = {nip: ['Libur'] * 30 for nip in nips}
+    other[nips[2]][4] = 'P9'
+    client.set(schedule_edits._session_key(TASK_ID, 1), json.dumps({"version": 3, "schedule": other}))
+    result = schedule_edits.apply_edit(TASK_ID, 1, [{"nip": nips[2], "day": 6, "shift": 'P10'}], lambda: pytest.fail("load_runs"))
+    assert result["version"] == 4
+    current = schedule_edits.get_edited_schedule(TASK_ID, 1, lambda: pytest.fail("load_runs"))
+    assert current["schedule"][nips[0]][0] == 'Libur'
+    assert current["schedule"][nips[2]][4:6] == ['P9', 'P10']
+
+
+def test_invalid_change_keeps_version_and_drops_cache(client, nips):
+    schedule_edits.apply_edit(TASK_ID, 1, [{"nip": nips[0], "day": 1, "shift": 'P7'}], lambda: _runs(nips))
+    with pytest.raises(ValueError):
+        schedule_edits.apply_edit(TASK_ID, 1, [{"nip": nips[0], "day": 31, "shift": 'P7'}], lambda: pytest.fail("load_runs"))
+    assert (TASK_ID, 1) not in schedule_edits._evaluators
+    assert json.loads(client.get(schedule_edits._session_key(TASK_ID, 1)))["version"] == 1
+
+
+def test_missing_context_or_run_is_not_found(client, nips):
+    with pytest.raises(schedule_edits.ScheduleNotFoundError):
+        schedule_edits.apply_edit(TASK_ID, 9, [{"nip": nips[0], "day": 1, "shift": 'P7'}], lambda: _runs(nips))
+    with pytest.raises(schedule_edits.ScheduleNotFoundError):
+        schedule_edits.apply_edit('unknown-task', 1, [{"nip": nips[0], "day": 1, "shift": 'P7'}], lambda: _runs(nips))
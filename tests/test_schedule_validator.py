@@ -0,0 +1,93 @@
+# file: tests/test_schedule_validator.py
+
+import json
+import os
+import random
+
+import numpy as np
+import pytest
+from ortools.sat.python import cp_model
+
+import solver_2
+from greedy_schedule import construct_schedule
+from rule_plan import roster_employees_data
+from schedule_validator import ScheduleEvaluator, assignment_to_matrix
+
+# =================================================================================
+# VALIDATOR VS CP-SAT PADA INSTANCE BENCHMARK
+# =================================================================================
+# benchmarks/2025-09.json hanya feasible tanpa apply_bandung_monthly_rules, sehingga aturan
+# itu dinonaktifkan saat model dibangun. Validator tetap memeriksanya (mb_monthly_nights).
+
+BENCHMARK_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', '2025-09.json')
+
+
+@pytest.fixture(scope='module')
+def built():
+    with open(BENCHMARK_PATH, encoding='utf-8') as f:
+        instance = json.load(f)
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(solver_2, 'apply_bandung_monthly_rules', lambda *args: None)
+        return solver_2.build_schedule_model(roster_employees_data(), instance['year'], instance['month'],
+                                             instance['requests'], instance['public_holidays'], instance['demand'])
+
+
+class _StopOnFirstSolution(cp_model.CpSolverSolutionCallback):
+    def on_solution_callback(self):
+        self.StopSearch()
+
+
+def _evaluator(built, matrix):
+    return ScheduleEvaluator(matrix, built.plan, built.cal, built.daily_demand, built.pre_assignments)
+
+
+def test_objective_matches_cp_sat_on_benchmark_solution(built):
+    model = built.model.Clone()
+    greedy, _ = construct_schedule(built)
+    built.shifts.add_hint(model, greedy)
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = 120.0
+    solver.parameters.num_search_workers = 4
+    status = solver.Solve(model, _StopOnFirstSolution())
+    assert status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    assignment = built.shifts.assignment(solver)
+
+    # Jadwal dikunci; CP-SAT hanya memilih variabel bantu objective terbaik untuk jadwal ini
+    for e_idx, row in enumerate(assignment):
+        for d, s_idx in enumerate(row):
+            model.Add(built.shifts[e_idx, d, s_idx] == 1)
+    status = solver.Solve(model)
+    assert status == cp_model.OPTIMAL
+
+    evaluator = _evaluator(built, assignment_to_matrix(assignment))
+    assert evaluator.objective() == solver.ObjectiveValue()
+    assert set(evaluator.violation_counts()) <= {'mb_monthly_nights'}
+
+
+def test_apply_changes_matches_full_evaluation(built):
+    greedy, _ = construct_schedule(built)
+    evaluator = _evaluator(built, assignment_to_matrix(greedy))
+    num_employees, num_days = evaluator.matrix.shape
+    rng = random.Random(7)
+    for _ in range(20):
+        changes = [(rng.randrange(num_employees), rng.randrange(num_days), rng.randrange(len(built.plan.all_shifts)))
+                   for _ in range(rng.randint(1, 4))]
+        result = evaluator.apply_changes(changes)
+        full = _evaluator(built, evaluator.matrix.copy())
+        assert result['objective'] == full.objective()
+        assert result['violation_counts'] == full.violation_counts()
+        assert evaluator.objective_breakdown() == full.objective_breakdown()
+        assert evaluator.report()['diagnostics'] == full.report()['diagnostics']
+
+
+def test_thresholds_come_from_rule_plan(built):
+    greedy, _ = construct_schedule(built)
+    matrix = assignment_to_matrix(greedy)
+    evaluator = _evaluator(built, matrix)
+    fb = np.flatnonzero(evaluator.groups == 'FB')
+    low, high = built.plan.weekend_work_limits['FB']
+    expected = int(((evaluator.weekend_work[fb] < low) | (evaluator.weekend_work[fb] > high)).sum())
+    fb_nips = {built.plan.code_to_nip[built.plan.employees[e_idx]] for e_idx in fb}
+    reported = [item for item in evaluator.violations().get('weekend_work_range', []) if item['nip'] in fb_nips]
+    assert len(reported) == expected
+    assert all(f"(batas {low}-{high})" in item['detail'] for item in reported)
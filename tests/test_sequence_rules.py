@@ -0,0 +1,67 @@
+# file: tests/test_sequence_rules.py
+
+from itertools import product
+
+import pytest
+
+from rule_plan import compile_rule_plan
+from sequence_rules import (CUTI, EARLY, LIBUR, NIGHT, OTHER_WORK, SHIFT_CLASS_NAMES, SOCM, compile_automaton,
+                            shift_classes)
+
+# =================================================================================
+# AUTOMATON VS ATURAN IMPLIKASI LAMA
+# =================================================================================
+# Setiap urutan kelas shift sepanjang SEQUENCE_DAYS hari diperiksa dengan automaton gabungan
+# dan dengan implikasi per hari yang dipakai sebelum apply_sequence_rules (lihat
+# apply_night_shift_rules & pola SOCM di apply_additional_constraints versi lama).
+
+SEQUENCE_DAYS = 6
+NIGHTS = (NIGHT, SOCM)
+OFF = (LIBUR, CUTI)
+
+
+def _accepted(automaton, sequence):
+    initial, finals, transitions = automaton
+    step = {(state, symbol): target for state, symbol, target in transitions}
+    state = initial
+    for symbol in sequence:
+        state = step.get((state, symbol))
+        if state is None:
+            return False
+    return state in finals
+
+
+def _implication_rules_hold(sequence, female, male_socm_pattern):
+    num_days = len(sequence)
+    night = [symbol in NIGHTS for symbol in sequence]
+    for d in range(num_days - 1):
+        if night[d] and not night[d + 1] and sequence[d + 1] != LIBUR:
+            return False
+        if female and night[d] and night[d + 1]:
+            return False
+    for d in range(num_days - 3):
+        if night[d] and night[d + 1] and (sequence[d + 2] not in OFF or sequence[d + 3] not in OFF):
+            return False
+    if male_socm_pattern:
+        for d in range(num_days - 2):
+            if sequence[d] == SOCM and sequence[d + 1] == LIBUR and sequence[d + 2] == EARLY:
+                return False
+    return True
+
+
+@pytest.mark.parametrize('female, male_socm_pattern', list(product((False, True), repeat=2)))
+def test_automaton_accepts_exactly_the_old_implication_rules(female, male_socm_pattern):
+    automaton = compile_automaton(female, male_socm_pattern)
+    for length in range(1, SEQUENCE_DAYS + 1):
+        for sequence in product(range(len(SHIFT_CLASS_NAMES)), repeat=length):
+            assert _accepted(automaton, sequence) == _implication_rules_hold(sequence, female, male_socm_pattern), \
+                [SHIFT_CLASS_NAMES[symbol] for symbol in sequence]
+
+
+def test_shift_classes_follow_rule_plan():
+    plan = compile_rule_plan()
+    classes = dict(zip(plan.all_shifts, shift_classes(plan)))
+    assert classes['Libur'] == LIBUR and classes['Cuti'] == CUTI
+    assert classes['M'] == NIGHT and classes['SOCM'] == SOCM
+    assert all(classes[name] == EARLY for name in ('P6', 'P7', 'P8', 'P9'))
+    assert all(classes[name] == OTHER_WORK for name in ('P10', 'P11', 'S12', 'SOC2', 'SOC6'))
@@ -0,0 +1,109 @@
+# file: tune_solver_profiles.py
+
+import argparse
+import calendar
+import glob
+import json
+import os
+
+from rule_plan import roster_employees_data
+from solver_2 import solve_one_instance
+from solver_profiles import PROFILE_TABLE_PATH, SOLVER_PROFILES, problem_features
+
+# =================================================================================
+# TUNER OFFLINE PROFIL CP-SAT
+# =================================================================================
+# Menjalankan setiap instance benchmark (format sama dengan payload API) dengan semua
+# profil, lalu memilih profil tercepat yang objective-nya masih dalam toleransi dari
+# objective terbaik. Hasilnya ditulis sebagai tabel aturan (ukuran & kepadatan request
+# -> profil) yang dibaca solver_profiles.select_profile saat profil 'auto'.
+#
+# Contoh: python tune_solver_profiles.py benchmarks/*.json --time-limit 120
+
+DEFAULT_BENCHMARK_GLOB = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks', '*.json')
+
+
+def load_instance(path):
+    with open(path, encoding='utf-8') as f:
+        instance = json.load(f)
+    instance.setdefault('name', os.path.splitext(os.path.basename(path))[0])
+    return instance
+
+
+def run_instance(instance, profile, time_limit_seconds):
+    result = solve_one_instance(
+        employees_data=roster_employees_data(),
+        target_year=instance['year'],
+        target_month=instance['month'],
+        pre_assignment_requests=instance['requests'],
+        public_holidays=instance['public_holidays'],
+        demand=instance['demand'],
+        time_limit_seconds=time_limit_seconds,
+        solver_options={"profile": profile},
+    )
+    if result is None:
+        return {"profile": profile, "status": 'NO_SOLUTION', "objective": None, "runtime_seconds": None}
+    return {"profile": profile, "status": result['status'], "objective": result['objective'],
+            "runtime_seconds": result['runtime_seconds']}
+
+
+def choose_profile(runs, gap_tolerance):
+    """Profil tercepat dengan objective >= (1 - toleransi) × objective terbaik (model memaksimalkan skor)."""
+    solved = [run for run in runs if run['objective'] is not None]
+    if not solved:
+        return None
+    best = max(run['objective'] for run in solved)
+    threshold = best - abs(best) * gap_tolerance
+    good_enough = [run for run in solved if run['objective'] >= threshold]
+    return min(good_enough, key=lambda run: run['runtime_seconds'])['profile']
+
+
+def build_profile_table(measurements):
+    """Satu aturan per instance (diurutkan dari masalah terkecil), ditutup aturan tanpa batas."""
+    rules = []
+    for item in sorted(measurements, key=lambda m: (m['features']['cells'], m['features']['request_density'])):
+        if item['best_profile']:
+            rules.append({"max_cells": item['features']['cells'],
+                          "max_request_density": item['features']['request_density'],
+                          "profile": item['best_profile'], "instance": item['name']})
+    fallback = rules[-1]['profile'] if rules else 'balanced'
+    rules.append({"max_cells": None, "max_request_density": None, "profile": fallback})
+    return rules
+
+
+def tune(paths, time_limit_seconds, gap_tolerance):
+    measurements = []
+    employees_count = len(roster_employees_data())
+    for path in paths:
+        instance = load_instance(path)
+        runs = []
+        for profile in SOLVER_PROFILES:
+            print(f"[{instance['name']}] profil '{profile}'...")
+            runs.append(run_instance(instance, profile, time_limit_seconds))
+            print(f"  -> {runs[-1]}")
+        num_days = calendar.monthrange(instance['year'], instance['month'])[1]
+        features = problem_features(employees_count, num_days, len(instance['requests']))
+        measurements.append({"name": instance['name'], "features": features, "runs": runs,
+                             "best_profile": choose_profile(runs, gap_tolerance)})
+    return measurements
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memilih profil CP-SAT terbaik per ukuran masalah dari instance benchmark.")
+    parser.add_argument('instances', nargs='*', help="File instance benchmark (default: benchmarks/*.json)")
+    parser.add_argument('--time-limit', type=float, default=400.0, help="Batas waktu per solve (detik)")
+    parser.add_argument('--gap-tolerance', type=float, default=0.01, help="Toleransi objective terhadap profil terbaik")
+    parser.add_argument('--output', default=PROFILE_TABLE_PATH, help="File tabel profil hasil tuning")
+    args = parser.parse_args()
+
+    paths = args.instances or sorted(glob.glob(DEFAULT_BENCHMARK_GLOB))
+    if not paths:
+        parser.error("Tidak ada instance benchmark.")
+    measurements = tune(paths, args.time_limit, args.gap_tolerance)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({"rules": build_profile_table(measurements), "measurements": measurements}, f, ensure_ascii=False, indent=2)
+    print(f"✅ Tabel profil disimpan ke {args.output}")
+
+
+if __name__ == '__main__':
+    main()